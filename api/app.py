@@ -1,17 +1,19 @@
 from flask import Flask
 from flask_cors import CORS
 
-from interfaces.college_routes import college_routes
-from interfaces.counselor_routes import counselor_routes
-from interfaces.database_routes import database_routes
-from interfaces.openai_routes import openai_routes
-from interfaces.scholarship_routes import scholarship_routes
-from interfaces.stripe_routes import stripe_routes
-from interfaces.task_routes import task_routes
-from interfaces.token_routes import token_routes
-
 
 def create_app() -> Flask:
+    # Blueprints are imported here rather than at module level, so extraction
+    # workers that re-import this module do not load every route module.
+    from interfaces.college_routes import college_routes
+    from interfaces.counselor_routes import counselor_routes
+    from interfaces.database_routes import database_routes
+    from interfaces.openai_routes import openai_routes
+    from interfaces.scholarship_routes import scholarship_routes
+    from interfaces.stripe_routes import stripe_routes
+    from interfaces.task_routes import task_routes
+    from interfaces.token_routes import token_routes
+
     app = Flask(__name__)
     CORS(app, resources={r"/*": {"origins": "*"}})
     app.register_blueprint(college_routes)
@@ -25,7 +27,10 @@ def create_app() -> Flask:
     return app
 
 
-app = create_app()
+# Spawned extraction workers re-import the entry script as __mp_main__; they
+# need the module, not a second copy of the app.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+import random
+import sys
+import timeit
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from interfaces.college_routes import normalize_colleges  # noqa: E402
+
+PAGE_SIZE = 100
+REPEAT = 9
+NUMBER = 300
+
+
+# Converters and per-row normalizer as they were before the fast paths, kept as the baseline.
+def to_float(value: Any) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_int(value: Any) -> int | None:
+    float_value = to_float(value)
+    if float_value is None:
+        return None
+    return int(float_value)
+
+
+def legacy_normalize_college(raw: dict[str, Any]) -> dict[str, Any]:
+    school_name = raw.get('school.name')
+    if not school_name:
+        return {}
+
+    return {
+        'id': to_int(raw.get('id')),
+        'latest': {
+            'school': {
+                'name': school_name,
+                'city': raw.get('school.city'),
+                'state': raw.get('school.state'),
+                'school_url': raw.get('school.school_url'),
+                'online_only': to_int(raw.get('school.online_only')),
+            },
+            'student': {'size': to_int(raw.get('latest.student.size'))},
+            'admissions': {
+                'admission_rate': {'overall': to_float(raw.get('latest.admissions.admission_rate.overall'))},
+                'sat_scores': {
+                    'percentile_75': {
+                        'critical_reading': to_int(raw.get('latest.admissions.sat_scores.75th_percentile.critical_reading')),
+                        'math': to_int(raw.get('latest.admissions.sat_scores.75th_percentile.math')),
+                    }
+                },
+                'act_scores': {
+                    'percentile_75': {
+                        'cumulative': to_int(raw.get('latest.admissions.act_scores.75th_percentile.cumulative')),
+                    }
+                },
+            },
+            'cost': {
+                'tuition': {
+                    'in_state': to_int(raw.get('latest.cost.tuition.in_state')),
+                    'out_of_state': to_int(raw.get('latest.cost.tuition.out_of_state')),
+                }
+            },
+        },
+    }
+
+
+def make_page(seed: int = 7) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+
+    def maybe(value: Any) -> Any:
+        return None if rng.random() < 0.2 else value
+
+    return [
+        {
+            'id': 100000 + index,
+            'school.name': f'College {index}',
+            'school.city': 'Springfield',
+            'school.state': rng.choice(['CA', 'NY', 'TX', 'MA']),
+            'school.school_url': f'www.college{index}.edu',
+            'school.online_only': rng.choice([0, 1]),
+            'latest.student.size': maybe(rng.randint(200, 40000)),
+            'latest.admissions.admission_rate.overall': maybe(round(rng.random(), 4)),
+            'latest.admissions.sat_scores.75th_percentile.critical_reading': maybe(rng.randint(450, 800)),
+            'latest.admissions.sat_scores.75th_percentile.math': maybe(rng.randint(450, 800)),
+            'latest.admissions.act_scores.75th_percentile.cumulative': maybe(rng.randint(18, 36)),
+            'latest.cost.tuition.in_state': maybe(rng.randint(4000, 60000)),
+            'latest.cost.tuition.out_of_state': maybe(rng.randint(8000, 65000)),
+        }
+        for index in range(PAGE_SIZE)
+    ]
+
+
+def per_page_us(statement) -> float:
+    return min(timeit.repeat(statement, repeat=REPEAT, number=NUMBER)) / NUMBER * 1e6
+
+
+def main() -> None:
+    page = make_page()
+    legacy = [college for college in (legacy_normalize_college(row) for row in page) if college]
+    assert normalize_colleges(page) == legacy
+
+    results = {
+        'legacy normalize_college': per_page_us(
+            lambda: [college for college in (legacy_normalize_college(row) for row in page) if college]
+        ),
+        'normalize_colleges (nested)': per_page_us(lambda: normalize_colleges(page)),
+        'normalize_colleges (flat)': per_page_us(lambda: normalize_colleges(page, flat=True)),
+    }
+    baseline = results['legacy normalize_college']
+    print(f'CPU time per {PAGE_SIZE}-row page (best of {REPEAT}x{NUMBER}):')
+    for label, micros in results.items():
+        print(f'  {label:<38} {micros:9.1f} us  ({baseline / micros:4.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
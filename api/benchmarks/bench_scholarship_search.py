@@ -0,0 +1,105 @@
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.scholarship_index import ScholarshipIndex  # noqa: E402
+
+CATALOG_SIZES = (1000, 10000, 50000, 100000)
+ROUNDS = 200
+QUERIES = (
+    {'query': 'stem women engineering'},
+    {'query': 'need based', 'state': 'CA'},
+    {'query': 'scholarship'},
+    {'query': 'lead', 'min_amount': 5000},
+    # Selective filters that outrun the capped candidate set.
+    {'query': 'scholarship', 'min_amount': 20000, 'deadline_before': '2026-01-10'},
+    {'query': '', 'state': 'TX', 'deadline_after': '2026-01-01'},
+)
+
+WORDS = (
+    'stem engineering nursing arts music athletics leadership service community first generation '
+    'women minority veterans rural urban teaching business computer science biology writing essay '
+    'merit need based grant award foundation memorial fund heritage hispanic black asian native'
+).split()
+STATES = ('CA', 'NY', 'TX', 'FL', 'AZ', 'WA', 'IL', 'MA')
+
+
+def make_catalog(size: int, seed: int = 11) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    catalog = []
+    for index in range(size):
+        topic = rng.sample(WORDS, 3)
+        amount = rng.choice([None, 500, 1000, 2500, 5000, 10000, 20000])
+        catalog.append(
+            {
+                'id': f'sch-{index}',
+                'name': f'{topic[0].title()} {topic[1].title()} Scholarship {index}',
+                'provider': f'{rng.choice(WORDS).title()} Foundation',
+                'amount': f'${amount:,}' if amount else 'Varies',
+                'amount_min': amount,
+                'amount_max': amount,
+                'deadline': 'Annual',
+                'deadline_date': f'2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}' if rng.random() < 0.8 else None,
+                'description': ' '.join(rng.choices(WORDS, k=20)),
+                'eligibility': ' '.join(rng.choices(WORDS, k=8)),
+                'tags': rng.sample(WORDS, 3),
+                'states': [rng.choice(STATES)] if rng.random() < 0.3 else [],
+                'apply_url': 'https://example.org/apply',
+            }
+        )
+    return catalog
+
+
+def legacy_search(catalog: list[dict[str, Any]], query: str) -> list[dict[str, Any]]:
+    # The substring scan the route used before the index.
+    query = query.lower()
+    return [
+        item
+        for item in catalog
+        if query in item['name'].lower()
+        or query in item['provider'].lower()
+        or query in item['description'].lower()
+        or any(query in tag.lower() for tag in item.get('tags', []))
+    ]
+
+
+def latencies_us(fn, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return sorted(samples)
+
+
+def main() -> None:
+    print(f'Query latency over {ROUNDS} rounds per query (microseconds):')
+    print(f'  {"catalog":>8} {"build ms":>9} {"p50":>8} {"p95":>8} {"max":>8} {"legacy p50":>11}')
+    for size in CATALOG_SIZES:
+        catalog = make_catalog(size)
+        started = time.perf_counter()
+        index = ScholarshipIndex(catalog)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        samples: list[float] = []
+        for params in QUERIES:
+            params = dict(params)
+            query = params.pop('query')
+            samples.extend(latencies_us(lambda: index.search(query, limit=20, **params), ROUNDS))
+        samples.sort()
+        legacy = latencies_us(lambda: legacy_search(catalog, 'stem'), max(5, ROUNDS // 20))
+
+        p95 = samples[int(len(samples) * 0.95)]
+        print(
+            f'  {size:>8} {build_ms:>9.0f} {statistics.median(samples):>8.0f} {p95:>8.0f} '
+            f'{samples[-1]:>8.0f} {statistics.median(legacy):>11.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import sys
+import time
+from typing import Any, Iterator
+
+import requests
+
+from interfaces.college_routes import (
+    SCORECARD_API_KEY,
+    SCORECARD_BASE_URL,
+    SCORECARD_FIELDS,
+    SCORECARD_STORE_PATH,
+)
+from utils.scorecard_store import STORE_COLUMNS, ScorecardStore
+
+PAGE_SIZE = 100
+
+
+def iter_scorecard_rows(delay_seconds: float) -> Iterator[dict[str, Any]]:
+    session = requests.Session()
+    page = 0
+    while True:
+        response = session.get(
+            SCORECARD_BASE_URL,
+            params={
+                'api_key': SCORECARD_API_KEY,
+                'fields': ','.join(SCORECARD_FIELDS),
+                'per_page': str(PAGE_SIZE),
+                'page': str(page),
+                '_sort': 'id',
+            },
+            timeout=30,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        results = payload.get('results', [])
+        yield from results
+
+        total = int((payload.get('metadata') or {}).get('total') or 0)
+        page += 1
+        if not results or page * PAGE_SIZE >= total:
+            return
+        print(f'Fetched {min(page * PAGE_SIZE, total)}/{total} schools', file=sys.stderr)
+        time.sleep(delay_seconds)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Mirror College Scorecard search fields into a local SQLite store.')
+    parser.add_argument('--path', default=SCORECARD_STORE_PATH, help='Output SQLite path.')
+    parser.add_argument('--delay', type=float, default=0.5, help='Seconds to wait between upstream pages.')
+    args = parser.parse_args()
+
+    if not SCORECARD_API_KEY:
+        print('Missing COLLEGE_SCORECARD_API_KEY in api/.env.', file=sys.stderr)
+        return 1
+    if set(SCORECARD_FIELDS) != set(STORE_COLUMNS):
+        print('SCORECARD_FIELDS and scorecard_store.STORE_COLUMNS are out of sync.', file=sys.stderr)
+        return 1
+
+    count = ScorecardStore(args.path).replace_all(iter_scorecard_rows(args.delay))
+    print(f'Stored {count} schools in {args.path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
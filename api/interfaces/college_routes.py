@@ -1,4 +1,6 @@
+import math
 import os
+import sqlite3
 from typing import Any
 from pathlib import Path
 
@@ -6,6 +8,10 @@ import requests
 from dotenv import load_dotenv
 from flask import Blueprint, jsonify, request
 
+from utils.response_cache import ResponseCache, SQLiteResponseStore
+from utils.scorecard_store import ScorecardStore
+from utils.single_flight import SingleFlightTimeout
+
 # Always load backend env from api/.env (independent of current working directory).
 API_ENV_PATH = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(API_ENV_PATH)
@@ -18,6 +24,24 @@ SCORECARD_BASE_URL = os.getenv(
     "https://api.data.gov/ed/collegescorecard/v1/schools",
 )
 
+# Scorecard data is published yearly, so search responses can live for a long time.
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("COLLEGE_SEARCH_CACHE_TTL_SECONDS", "86400"))
+SEARCH_CACHE_STALE_SECONDS = float(os.getenv("COLLEGE_SEARCH_CACHE_STALE_SECONDS", "604800"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("COLLEGE_SEARCH_CACHE_MAX_ENTRIES", "512"))
+SEARCH_CACHE_DB_PATH = os.getenv(
+    "COLLEGE_SEARCH_CACHE_DB_PATH",
+    str(Path(__file__).resolve().parent.parent / "data" / "college_search_cache.db"),
+).strip()
+SEARCH_CACHE_DB_MAX_ENTRIES = int(os.getenv("COLLEGE_SEARCH_CACHE_DB_MAX_ENTRIES", "20000"))
+# How long a request waits on an identical in-flight upstream search.
+SEARCH_SHARED_FETCH_TIMEOUT_SECONDS = float(os.getenv("COLLEGE_SEARCH_SHARED_FETCH_TIMEOUT_SECONDS", "30"))
+
+# Local mirror written by api/ingest_scorecard.py; upstream is only used when it is missing.
+SCORECARD_STORE_PATH = os.getenv(
+    "COLLEGE_SCORECARD_STORE_PATH",
+    str(Path(__file__).resolve().parent.parent / "data" / "scorecard.db"),
+).strip()
+
 # Keep payload small and stable for mobile.
 SCORECARD_FIELDS = [
     "id",
@@ -42,8 +66,20 @@ SORT_MAP = {
     "student_size": "latest.student.size",
 }
 
+# Query-string range filters: name -> (min arg, max arg, Scorecard field).
+RANGE_FILTERS = {
+    "tuition": ("min_tuition", "max_tuition", "latest.cost.tuition.in_state"),
+    "acceptance": ("min_acceptance", "max_acceptance", "latest.admissions.admission_rate.overall"),
+}
+
 
 def to_float(value: Any) -> float | None:
+    # Scorecard JSON already carries native numbers; skip the generic path for them.
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value_type is int:
+        return float(value)
     if value is None:
         return None
     try:
@@ -53,6 +89,8 @@ def to_float(value: Any) -> float | None:
 
 
 def to_int(value: Any) -> int | None:
+    if type(value) is int:
+        return value
     float_value = to_float(value)
     if float_value is None:
         return None
@@ -107,55 +145,205 @@ def normalize_college(raw: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-@college_routes.route("/search", methods=["GET"])
-def search_colleges():
-    if not SCORECARD_API_KEY:
-        return jsonify({"error": "Missing COLLEGE_SCORECARD_API_KEY in backend env."}), 500
+# Flat payload keys matching the College type the mobile client renders,
+# with the converter each Scorecard column needs.
+FLAT_FIELDS = {
+    "id": ("id", to_int),
+    "school.name": ("name", None),
+    "school.city": ("city", None),
+    "school.state": ("state", None),
+    "school.school_url": ("website", None),
+    "latest.student.size": ("studentSize", to_int),
+    "latest.admissions.admission_rate.overall": ("acceptanceRate", to_float),
+    "latest.admissions.act_scores.75th_percentile.cumulative": ("act75th", to_int),
+    "latest.cost.tuition.in_state": ("tuitionInState", to_int),
+    "latest.cost.tuition.out_of_state": ("tuitionOutOfState", to_int),
+}
+
+
+def compile_flat_plan(fields: list[str]) -> tuple[tuple[str, str, Any], ...]:
+    return tuple((field, *FLAT_FIELDS[field]) for field in fields if field in FLAT_FIELDS)
+
+
+FLAT_PLAN = compile_flat_plan(SCORECARD_FIELDS)
+
 
-    per_page = request.args.get("per_page", "100").strip()
+def flatten_college(raw: dict[str, Any]) -> dict[str, Any]:
+    if not raw.get("school.name"):
+        return {}
+
+    college = {
+        key: convert(raw.get(field)) if convert else raw.get(field)
+        for field, key, convert in FLAT_PLAN
+    }
+    sat_reading = to_int(raw.get("latest.admissions.sat_scores.75th_percentile.critical_reading")) or 0
+    sat_math = to_int(raw.get("latest.admissions.sat_scores.75th_percentile.math")) or 0
+    college["sat75th"] = sat_reading + sat_math if sat_reading > 0 or sat_math > 0 else None
+    college["onlineOnly"] = to_int(raw.get("school.online_only")) == 1
+    return college
+
+
+def normalize_colleges(raw_rows: list[dict[str, Any]], flat: bool = False) -> list[dict[str, Any]]:
+    normalize = flatten_college if flat else normalize_college
+    return [college for college in map(normalize, raw_rows) if college]
+
+
+def build_search_cache() -> ResponseCache:
+    store = None
+    if SEARCH_CACHE_DB_PATH:
+        try:
+            store = SQLiteResponseStore(SEARCH_CACHE_DB_PATH, max_entries=SEARCH_CACHE_DB_MAX_ENTRIES)
+        except (OSError, sqlite3.Error):
+            store = None
+    return ResponseCache(
+        fresh_ttl=SEARCH_CACHE_TTL_SECONDS,
+        stale_ttl=SEARCH_CACHE_STALE_SECONDS,
+        max_entries=SEARCH_CACHE_MAX_ENTRIES,
+        store=store,
+        fetch_timeout=SEARCH_SHARED_FETCH_TIMEOUT_SECONDS,
+    )
+
+
+search_cache = build_search_cache()
+scorecard_store = ScorecardStore(SCORECARD_STORE_PATH) if SCORECARD_STORE_PATH else None
+
+
+def parse_search_params(args: Any) -> dict[str, Any]:
+    # Raises ValueError for non-finite range bounds; other unparsable values
+    # fall back to their defaults.
+    per_page = args.get("per_page", "100").strip()
     try:
         per_page_int = max(1, min(int(per_page), 100))
     except ValueError:
         per_page_int = 100
 
+    try:
+        page_int = max(0, int(args.get("page", "0").strip()))
+    except ValueError:
+        page_int = 0
+
+    sort_by = args.get("sort_by", "name").strip()
+    sort_order = args.get("sort_order", "asc").strip().lower()
+
+    ranges: dict[str, tuple[float | None, float | None]] = {}
+    for range_name, (min_arg, max_arg, _) in RANGE_FILTERS.items():
+        low = to_float(args.get(min_arg))
+        high = to_float(args.get(max_arg))
+        for arg, bound in ((min_arg, low), (max_arg, high)):
+            if bound is not None and not math.isfinite(bound):
+                raise ValueError(f"{arg} must be a finite number.")
+        if low is not None or high is not None:
+            ranges[range_name] = (low, high)
+
+    return {
+        # Scorecard name matching is case-insensitive, so fold case for better cache reuse.
+        "name": " ".join(args.get("name", "").split()).lower(),
+        "state": args.get("state", "").strip().upper(),
+        "online_only": args.get("online_only", "").strip().lower() == "true",
+        "sort_by": sort_by if sort_by in SORT_MAP else "name",
+        "sort_order": "desc" if sort_order == "desc" else "asc",
+        "page": page_int,
+        "per_page": per_page_int,
+        "ranges": ranges,
+        "flat": args.get("shape", "").strip().lower() == "flat",
+    }
+
+
+def search_cache_key(search: dict[str, Any]) -> str:
+    return ResponseCache.make_key(
+        (
+            "college_search",
+            search["name"],
+            search["state"],
+            search["online_only"],
+            search["sort_by"],
+            search["sort_order"],
+            search["page"],
+            search["per_page"],
+            sorted(search["ranges"].items()),
+            search["flat"],
+        )
+    )
+
+
+def fetch_scorecard_search(search: dict[str, Any]) -> dict[str, Any]:
     params: dict[str, Any] = {
         "api_key": SCORECARD_API_KEY,
-        "per_page": str(per_page_int),
-        "page": request.args.get("page", "0"),
+        "per_page": str(search["per_page"]),
+        "page": str(search["page"]),
         "fields": ",".join(SCORECARD_FIELDS),
     }
 
-    query = request.args.get("name", "").strip()
-    state = request.args.get("state", "").strip().upper()
-    online_only = request.args.get("online_only", "").strip().lower()
-    sort_by = request.args.get("sort_by", "name").strip()
-    sort_order = request.args.get("sort_order", "asc").strip().lower()
-
-    if query:
-        params["school.name"] = query
-    if state:
-        params["school.state"] = state
-    if online_only == "true":
+    if search["name"]:
+        params["school.name"] = search["name"]
+    if search["state"]:
+        params["school.state"] = search["state"]
+    if search["online_only"]:
         params["school.online_only"] = "1"
 
-    scorecard_sort_field = SORT_MAP.get(sort_by, "school.name")
-    params["_sort"] = f"-{scorecard_sort_field}" if sort_order == "desc" else scorecard_sort_field
+    for range_name, (low, high) in search["ranges"].items():
+        field = RANGE_FILTERS[range_name][2]
+        params[f"{field}__range"] = f"{'' if low is None else low}..{'' if high is None else high}"
 
-    try:
-        response = requests.get(SCORECARD_BASE_URL, params=params, timeout=15)
-        response.raise_for_status()
-        payload = response.json()
-    except requests.RequestException as exc:
-        return jsonify({"error": f"Failed to fetch College Scorecard data: {exc}"}), 502
+    scorecard_sort_field = SORT_MAP[search["sort_by"]]
+    params["_sort"] = f"-{scorecard_sort_field}" if search["sort_order"] == "desc" else scorecard_sort_field
+
+    response = requests.get(SCORECARD_BASE_URL, params=params, timeout=15)
+    response.raise_for_status()
+    payload = response.json()
 
     raw_results = payload.get("results", [])
-    normalized_results = [
-        college for college in (normalize_college(item) for item in raw_results) if college
-    ]
-
-    return jsonify(
-        {
-            "metadata": payload.get("metadata", {}),
-            "results": normalized_results,
-        }
+    return {
+        "metadata": payload.get("metadata", {}),
+        "results": normalize_colleges(raw_results, flat=search["flat"]),
+    }
+
+
+def search_local_store(search: dict[str, Any]) -> dict[str, Any]:
+    total, rows = scorecard_store.search(
+        name=search["name"],
+        state=search["state"],
+        online_only=search["online_only"],
+        sort_by=search["sort_by"],
+        descending=search["sort_order"] == "desc",
+        page=search["page"],
+        per_page=search["per_page"],
+        ranges=search["ranges"],
     )
+    return {
+        "metadata": {"total": total, "page": search["page"], "per_page": search["per_page"]},
+        "results": normalize_colleges(rows, flat=search["flat"]),
+    }
+
+
+@college_routes.route("/search", methods=["GET"])
+def search_colleges():
+    try:
+        search = parse_search_params(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if scorecard_store and scorecard_store.is_ready():
+        try:
+            response = jsonify(search_local_store(search))
+            response.headers["X-Data-Source"] = "local"
+            return response
+        except sqlite3.Error:
+            # Fall through to upstream if the mirror is unreadable (e.g. mid-swap).
+            pass
+
+    if not SCORECARD_API_KEY:
+        return jsonify({"error": "Missing COLLEGE_SCORECARD_API_KEY in backend env."}), 500
+
+    try:
+        payload, cache_status = search_cache.get_or_fetch(
+            search_cache_key(search),
+            lambda: fetch_scorecard_search(search),
+        )
+    except (requests.RequestException, ValueError, SingleFlightTimeout) as exc:
+        return jsonify({"error": f"Failed to fetch College Scorecard data: {exc}"}), 502
+
+    response = jsonify(payload)
+    response.headers["X-Cache"] = cache_status
+    response.headers["X-Data-Source"] = "upstream"
+    return response
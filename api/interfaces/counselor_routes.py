@@ -1,18 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping
+import json
+import logging
+import os
 import secrets
 
 import requests
-from flask import Blueprint, jsonify, request
-
-from interfaces.database_routes import (
-    SUPABASE_URL,
-    get_service_headers,
-    get_token_from_header,
-    get_user_from_token,
+from dotenv import load_dotenv
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from interfaces.database_routes import get_token_from_header, get_user_from_token
+from utils.batched_query import SupabaseQueryError, iter_select_in, select_in
+from utils.keyset import (
+    decode_cursor,
+    encode_cursor,
+    keyset_params,
+    order_param,
+    paginate_rows,
+    parse_timestamp,
+    sort_key,
 )
+from utils.role_cache import cache_role, get_cached_role, invalidate_role
+from utils.student_progress import count_progress, fetch_progress
+from utils.supabase_client import SUPABASE_URL, supabase, supabase_error_message
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
 
 counselor_routes = Blueprint('counselor_routes', __name__, url_prefix='/api/counselor')
+logger = logging.getLogger(__name__)
+
+COUNSELOR_TASKS_PAGE_SIZE = int(os.getenv('COUNSELOR_TASKS_PAGE_SIZE', '200'))
+COUNSELOR_TASKS_MAX_PAGE_SIZE = int(os.getenv('COUNSELOR_TASKS_MAX_PAGE_SIZE', '1000'))
+TASK_KEYSET_COLUMNS = ('due_date', 'created_at', 'id')
+COUNSELOR_TASK_FIELDS = 'id,user_id,title,description,due_date,deadline,status,completed,priority,category,created_at,updated_at'
+COUNSELOR_DASHBOARD_WORKERS = int(os.getenv('COUNSELOR_DASHBOARD_WORKERS', '16'))
+
+# Dashboard sections run here; their in.() chunks use batched_query's own pool.
+_dashboard_executor = ThreadPoolExecutor(max_workers=max(1, COUNSELOR_DASHBOARD_WORKERS), thread_name_prefix='counselor-dashboard')
+
+
+class CounselorDataError(Exception):
+    pass
 
 
 def ensure_supabase_config() -> str | None:
@@ -21,11 +52,6 @@ def ensure_supabase_config() -> str | None:
     return None
 
 
-def supabase_error_message(response: requests.Response) -> str:
-    payload = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-    return payload.get('message') or payload.get('error') or response.text or f'HTTP {response.status_code}'
-
-
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -55,39 +81,42 @@ def get_counselor_user_id() -> tuple[str | None, tuple[Any, int] | None]:
     if isinstance(metadata, dict) and metadata.get('role') == 'counselor':
         return user_id, None
 
-    try:
-        role_response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/user_profiles',
-            headers=get_service_headers(),
-            params={
-                'id': f'eq.{user_id}',
-                'select': 'role',
-                'limit': '1',
-            },
-            timeout=15,
-        )
-        if not role_response.ok:
-            return None, (jsonify({'error': f'Failed to verify role: {supabase_error_message(role_response)}'}), 500)
+    role = get_cached_role(user_id)
+    if role is None:
+        try:
+            role_response = supabase.select(
+                'user_profiles',
+                {
+                    'id': f'eq.{user_id}',
+                    'select': 'role',
+                    'limit': '1',
+                },
+                coalesce=True,
+            )
+            if not role_response.ok:
+                return None, (jsonify({'error': f'Failed to verify role: {supabase_error_message(role_response)}'}), 500)
 
-        rows = role_response.json() if role_response.content else []
-        if not rows or rows[0].get('role') != 'counselor':
-            return None, (jsonify({'error': 'Access denied. Counselor role required.'}), 403)
-    except requests.RequestException as exc:
-        return None, (jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500)
+            rows = role_response.json() if role_response.content else []
+            role = rows[0].get('role') if rows else None
+            cache_role(user_id, role)
+        except requests.RequestException as exc:
+            return None, (jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500)
+
+    if role != 'counselor':
+        return None, (jsonify({'error': 'Access denied. Counselor role required.'}), 403)
 
     return user_id, None
 
 
 def fetch_assigned_student_ids(counselor_id: str) -> tuple[list[str] | None, tuple[Any, int] | None]:
     try:
-        response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/counselor_students',
-            headers=get_service_headers(),
-            params={
+        response = supabase.select(
+            'counselor_students',
+            {
                 'counselor_id': f'eq.{counselor_id}',
                 'select': 'student_id',
             },
-            timeout=15,
+            coalesce=True,
         )
         if not response.ok:
             return None, (jsonify({'error': f'Failed to load counselor assignments: {supabase_error_message(response)}'}), 500)
@@ -99,6 +128,83 @@ def fetch_assigned_student_ids(counselor_id: str) -> tuple[list[str] | None, tup
         return None, (jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500)
 
 
+def application_status(progress: dict[str, Any] | None) -> str:
+    if not progress or not progress.get('total_tasks'):
+        return 'Not Started'
+    if progress.get('completed_tasks') == progress.get('total_tasks'):
+        return 'Submitted'
+    return 'In Progress'
+
+
+def current_academic_year() -> int:
+    now = datetime.now(timezone.utc)
+    return now.year + (1 if now.month >= 8 else 0)
+
+
+def student_grade(grad_year: Any, academic_year: int) -> str:
+    if isinstance(grad_year, int) and grad_year - academic_year <= 0:
+        return 'Senior'
+    return 'Junior'
+
+
+def fetch_student_profiles(student_ids: list[str]) -> list[dict[str, Any]]:
+    try:
+        return select_in(
+            'user_profiles',
+            'id',
+            student_ids,
+            {'select': 'id,full_name,graduation_year,gpa,sat_score,act_score'},
+            coalesce=True,
+        )
+    except SupabaseQueryError as exc:
+        raise CounselorDataError(f'Failed to load student profiles: {exc}') from exc
+
+
+def fetch_student_progress(student_ids: list[str]) -> dict[str, dict[str, Any]]:
+    # Reads the student_progress counters, or counts tasks and saved colleges
+    # directly when the table or its RPCs are missing or failing.
+    try:
+        return fetch_progress(student_ids)
+    except (SupabaseQueryError, requests.RequestException) as exc:
+        logger.warning('student_progress unavailable, counting directly: %s', exc)
+    try:
+        return count_progress(student_ids)
+    except SupabaseQueryError as exc:
+        raise CounselorDataError(f'Failed to load student progress: {exc}') from exc
+
+
+def build_students(
+    student_ids: list[str],
+    profiles: list[dict[str, Any]],
+    progress: dict[str, dict[str, Any]],
+) -> list[dict[str, Any]]:
+    by_id = {str(row.get('id')): row for row in profiles}
+    academic_year = current_academic_year()
+    students: list[dict[str, Any]] = []
+    for sid in student_ids:
+        profile = by_id.get(sid, {})
+        counters = progress.get(sid) or {}
+        grad_year = profile.get('graduation_year')
+        students.append(
+            {
+                'student_id': sid,
+                'full_name': profile.get('full_name') or 'Unknown',
+                'email': '',
+                'grade': student_grade(grad_year, academic_year),
+                'graduation_year': grad_year,
+                'gpa': profile.get('gpa'),
+                'sat_score': profile.get('sat_score'),
+                'act_score': profile.get('act_score'),
+                'colleges_saved': counters.get('colleges_saved') or 0,
+                'essays_completed': counters.get('essays_completed') or 0,
+                'total_essays': counters.get('total_essays') or 0,
+                'application_status': application_status(counters),
+                'last_active': 'Unknown',
+            }
+        )
+    return students
+
+
 @counselor_routes.route('/students', methods=['GET'])
 def get_students():
     config_error = ensure_supabase_config()
@@ -116,98 +222,161 @@ def get_students():
         return jsonify({'students': []}), 200
 
     try:
-        profiles_response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/user_profiles',
-            headers=get_service_headers(),
-            params={
-                'id': f'in.({",".join(student_ids)})',
-                'select': 'id,full_name,graduation_year,gpa,sat_score,act_score',
-            },
-            timeout=15,
-        )
-        if not profiles_response.ok:
-            return jsonify({'error': f'Failed to load student profiles: {supabase_error_message(profiles_response)}'}), 500
-
-        profiles = profiles_response.json() if profiles_response.content else []
-        by_id = {str(row.get('id')): row for row in profiles}
-
-        students: list[dict[str, Any]] = []
-        for sid in student_ids:
-            profile = by_id.get(sid, {})
-
-            tasks_response = requests.get(
-                f'{SUPABASE_URL}/rest/v1/tasks',
-                headers=get_service_headers(),
-                params={
-                    'user_id': f'eq.{sid}',
-                    'select': 'id,category,status,completed',
-                },
-                timeout=15,
-            )
-            tasks = tasks_response.json() if tasks_response.ok and tasks_response.content else []
-
-            colleges_response = requests.get(
-                f'{SUPABASE_URL}/rest/v1/user_colleges',
-                headers=get_service_headers(),
-                params={
-                    'user_id': f'eq.{sid}',
-                    'select': 'id',
-                },
-                timeout=15,
-            )
-            colleges = colleges_response.json() if colleges_response.ok and colleges_response.content else []
-
-            essay_tasks = [task for task in tasks if task.get('category') == 'Essay']
-            essays_completed = len(
-                [
-                    task for task in essay_tasks
-                    if task.get('completed') or task.get('status') == 'completed'
-                ]
-            )
-            total_essays = len(essay_tasks)
-
-            has_started = bool(tasks)
-            all_completed = bool(tasks) and all(
-                task.get('completed') or task.get('status') == 'completed'
-                for task in tasks
-            )
-            if not has_started:
-                app_status = 'Not Started'
-            elif all_completed:
-                app_status = 'Submitted'
-            else:
-                app_status = 'In Progress'
-
-            grade = 'Junior'
-            grad_year = profile.get('graduation_year')
-            if isinstance(grad_year, int):
-                now = datetime.now(timezone.utc)
-                academic_year = now.year + (1 if now.month >= 8 else 0)
-                if grad_year - academic_year <= 0:
-                    grade = 'Senior'
-
-            students.append(
-                {
-                    'student_id': sid,
-                    'full_name': profile.get('full_name') or 'Unknown',
-                    'email': '',
-                    'grade': grade,
-                    'graduation_year': grad_year,
-                    'gpa': profile.get('gpa'),
-                    'sat_score': profile.get('sat_score'),
-                    'act_score': profile.get('act_score'),
-                    'colleges_saved': len(colleges),
-                    'essays_completed': essays_completed,
-                    'total_essays': total_essays,
-                    'application_status': app_status,
-                    'last_active': 'Unknown',
-                }
-            )
-
-        return jsonify({'students': students}), 200
+        profiles = fetch_student_profiles(student_ids)
+    except CounselorDataError as exc:
+        return jsonify({'error': str(exc)}), 500
     except requests.RequestException as exc:
         return jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500
 
+    # Without progress counts the roster is still useful; say why they are zero.
+    try:
+        progress, errors = fetch_student_progress(student_ids), {}
+    except (CounselorDataError, requests.RequestException) as exc:
+        progress, errors = {}, {'progress': section_error_message(exc)}
+    students = build_students(student_ids, profiles, progress)
+    return jsonify({'students': students, 'errors': errors}), 200
+
+
+def parse_page_size(value: str | None) -> int | None:
+    if value in (None, ''):
+        return COUNSELOR_TASKS_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except ValueError:
+        return None
+    if page_size < 1:
+        return None
+    return min(page_size, COUNSELOR_TASKS_MAX_PAGE_SIZE)
+
+
+def stream_json_rows(
+    key: str,
+    rows: Iterator[dict[str, Any]],
+    trailer: Callable[[], dict[str, Any]] | None = None,
+) -> Response:
+    # Pull the first row before the headers go out so an upstream failure can
+    # still become a normal JSON error response.
+    first = next(rows, None)
+
+    def generate() -> Iterator[str]:
+        yield f'{{"{key}":['
+        if first is not None:
+            yield json.dumps(first)
+            for row in rows:
+                yield ',' + json.dumps(row)
+        yield ']'
+        for name, value in (trailer() if trailer else {}).items():
+            yield f',{json.dumps(name)}:{json.dumps(value)}'
+        yield '}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def parse_task_query(args: Mapping[str, str], allow_cursor: bool = True) -> tuple[dict[str, Any] | None, str | None]:
+    page_size = parse_page_size(args.get('limit'))
+    if page_size is None:
+        return None, 'limit must be a positive integer.'
+
+    params: dict[str, Any] = {
+        'select': COUNSELOR_TASK_FIELDS,
+        'order': order_param(TASK_KEYSET_COLUMNS),
+        'limit': str(page_size + 1),
+    }
+
+    cursor = args.get('cursor') if allow_cursor else None
+    if cursor:
+        cursor_values = decode_cursor(cursor, TASK_KEYSET_COLUMNS)
+        if cursor_values is None:
+            return None, 'Invalid cursor.'
+        params.update(keyset_params(TASK_KEYSET_COLUMNS, cursor_values))
+
+    updated_since = args.get('updated_since')
+    if updated_since:
+        updated_since = parse_timestamp(updated_since)
+        if updated_since is None:
+            return None, 'updated_since must be an ISO 8601 timestamp.'
+        params['updated_at'] = f'gt.{updated_since}'
+
+    return {'page_size': page_size, 'params': params, 'updated_since': updated_since or None}, None
+
+
+def open_task_page(
+    student_ids: list[str],
+    query: dict[str, Any],
+) -> tuple[Iterator[dict[str, Any]], Callable[[], dict[str, Any]]]:
+    # synced_at is the newest updated_at returned (or the updated_since echoed
+    # back); clients pass the largest value seen as their next updated_since.
+    page: dict[str, Any] = {'has_more': False, 'last': None, 'synced_at': query['updated_since']}
+
+    def page_meta() -> dict[str, Any]:
+        next_cursor = encode_cursor(page['last'], TASK_KEYSET_COLUMNS) if page['has_more'] else None
+        return {'next_cursor': next_cursor, 'synced_at': page['synced_at']}
+
+    source = iter_select_in(
+        'tasks', 'user_id', student_ids, query['params'], sort_key=sort_key(TASK_KEYSET_COLUMNS), coalesce=True
+    )
+    return paginate_rows(source, query['page_size'], page), page_meta
+
+
+def load_task_page(student_ids: list[str], query: dict[str, Any]) -> dict[str, Any]:
+    rows, page_meta = open_task_page(student_ids, query)
+    try:
+        tasks = list(rows)
+    except SupabaseQueryError as exc:
+        raise CounselorDataError(f'Failed to load tasks: {exc}') from exc
+    return {'tasks': tasks, **page_meta()}
+
+
+def load_checklists(counselor_id: str, assigned_count: int) -> list[dict[str, Any]]:
+    response = supabase.select(
+        'counselor_checklists',
+        {
+            'counselor_id': f'eq.{counselor_id}',
+            'select': '*',
+            'order': 'id.asc',
+        },
+        coalesce=True,
+    )
+    if not response.ok:
+        raise CounselorDataError(f'Failed to load checklists: {supabase_error_message(response)}')
+
+    checklists = response.json() if response.content else []
+    for checklist in checklists:
+        checklist['assignedStudents'] = assigned_count
+    return checklists
+
+
+def load_documents(counselor_id: str) -> list[dict[str, Any]]:
+    response = supabase.select(
+        'counselor_documents',
+        {
+            'counselor_id': f'eq.{counselor_id}',
+            'select': '*',
+            'order': 'uploaded_at.desc.nullslast,id.desc',
+        },
+        coalesce=True,
+    )
+    if not response.ok:
+        raise CounselorDataError(f'Failed to load documents: {supabase_error_message(response)}')
+
+    documents = response.json() if response.content else []
+    for document in documents:
+        uploaded_at = document.get('uploaded_at')
+        if isinstance(uploaded_at, str) and uploaded_at:
+            document['uploadedAt'] = uploaded_at[:10]
+        file_type = document.get('file_type')
+        if file_type:
+            document['fileType'] = file_type
+    return documents
+
+
+def section_error_message(exc: Exception) -> str:
+    if isinstance(exc, CounselorDataError):
+        return str(exc)
+    if isinstance(exc, requests.RequestException):
+        return f'Unable to reach Supabase: {exc}'
+    return 'Unexpected error.'
+
 
 @counselor_routes.route('/tasks', methods=['GET'])
 def get_all_tasks():
@@ -219,28 +388,24 @@ def get_all_tasks():
     if role_response:
         return role_response
 
+    query, query_error = parse_task_query(request.args)
+    if query_error:
+        return jsonify({'error': query_error}), 400
+
     student_ids, assignment_error = fetch_assigned_student_ids(counselor_id)
     if assignment_error:
         return assignment_error
-    if not student_ids:
-        return jsonify({'tasks': []}), 200
 
     try:
-        response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/tasks',
-            headers=get_service_headers(),
-            params={
-                'user_id': f'in.({",".join(student_ids)})',
-                'select': 'id,user_id,title,description,due_date,deadline,status,completed,priority,category,created_at,updated_at',
-                'order': 'due_date.asc.nullslast,created_at.asc.nullslast',
-            },
-            timeout=15,
-        )
-        if not response.ok:
-            return jsonify({'error': f'Failed to load tasks: {supabase_error_message(response)}'}), 500
-
-        tasks = response.json() if response.content else []
-        return jsonify({'tasks': tasks}), 200
+        if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+            rows, page_meta = open_task_page(student_ids, query)
+            try:
+                return stream_json_rows('tasks', rows, page_meta)
+            except SupabaseQueryError as exc:
+                raise CounselorDataError(f'Failed to load tasks: {exc}') from exc
+        return jsonify(load_task_page(student_ids, query)), 200
+    except CounselorDataError as exc:
+        return jsonify({'error': str(exc)}), 500
     except requests.RequestException as exc:
         return jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500
 
@@ -255,38 +420,12 @@ def get_checklists():
     if role_response:
         return role_response
 
+    student_ids, assignment_error = fetch_assigned_student_ids(counselor_id)
     try:
-        checklist_response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/counselor_checklists',
-            headers=get_service_headers(),
-            params={
-                'counselor_id': f'eq.{counselor_id}',
-                'select': '*',
-                'order': 'id.asc',
-            },
-            timeout=15,
-        )
-        if not checklist_response.ok:
-            return jsonify({'error': f'Failed to load checklists: {supabase_error_message(checklist_response)}'}), 500
-
-        assignment_response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/counselor_students',
-            headers=get_service_headers(),
-            params={
-                'counselor_id': f'eq.{counselor_id}',
-                'select': 'id',
-            },
-            timeout=15,
-        )
-        assigned_count = 0
-        if assignment_response.ok and assignment_response.content:
-            assigned_count = len(assignment_response.json())
-
-        checklists = checklist_response.json() if checklist_response.content else []
-        for checklist in checklists:
-            checklist['assignedStudents'] = assigned_count
-
+        checklists = load_checklists(counselor_id, 0 if assignment_error else len(student_ids))
         return jsonify({'checklists': checklists}), 200
+    except CounselorDataError as exc:
+        return jsonify({'error': str(exc)}), 500
     except requests.RequestException as exc:
         return jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500
 
@@ -302,33 +441,66 @@ def get_documents():
         return role_response
 
     try:
-        response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/counselor_documents',
-            headers=get_service_headers(),
-            params={
-                'counselor_id': f'eq.{counselor_id}',
-                'select': '*',
-                'order': 'uploaded_at.desc.nullslast,id.desc',
-            },
-            timeout=15,
-        )
-        if not response.ok:
-            return jsonify({'error': f'Failed to load documents: {supabase_error_message(response)}'}), 500
-
-        documents = response.json() if response.content else []
-        for document in documents:
-            uploaded_at = document.get('uploaded_at')
-            if isinstance(uploaded_at, str) and uploaded_at:
-                document['uploadedAt'] = uploaded_at[:10]
-            file_type = document.get('file_type')
-            if file_type:
-                document['fileType'] = file_type
-
-        return jsonify({'documents': documents}), 200
+        return jsonify({'documents': load_documents(counselor_id)}), 200
+    except CounselorDataError as exc:
+        return jsonify({'error': str(exc)}), 500
     except requests.RequestException as exc:
         return jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500
 
 
+@counselor_routes.route('/dashboard', methods=['GET'])
+def get_dashboard():
+    config_error = ensure_supabase_config()
+    if config_error:
+        return jsonify({'error': config_error}), 500
+
+    counselor_id, role_response = get_counselor_user_id()
+    if role_response:
+        return role_response
+
+    # Accepts the same limit/updated_since as /tasks; later pages come from /tasks?cursor=.
+    task_query, query_error = parse_task_query(request.args, allow_cursor=False)
+    if query_error:
+        return jsonify({'error': query_error}), 400
+
+    student_ids, assignment_error = fetch_assigned_student_ids(counselor_id)
+    if assignment_error:
+        return assignment_error
+
+    futures = {
+        'profiles': _dashboard_executor.submit(fetch_student_profiles, student_ids),
+        'progress': _dashboard_executor.submit(fetch_student_progress, student_ids),
+        'tasks': _dashboard_executor.submit(load_task_page, student_ids, task_query),
+        'checklists': _dashboard_executor.submit(load_checklists, counselor_id, len(student_ids)),
+        'documents': _dashboard_executor.submit(load_documents, counselor_id),
+    }
+    results: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as exc:
+            errors['students' if name == 'profiles' else name] = section_error_message(exc)
+
+    task_page = results.get('tasks') or {}
+    body = {
+        'students': (
+            build_students(student_ids, results['profiles'], results.get('progress') or {})
+            if 'profiles' in results else None
+        ),
+        'tasks': task_page.get('tasks'),
+        'next_cursor': task_page.get('next_cursor'),
+        'synced_at': task_page.get('synced_at', task_query['updated_since']),
+        'checklists': results.get('checklists'),
+        'documents': results.get('documents'),
+        'errors': errors,
+    }
+    # Only a dashboard where every section failed is an error response.
+    if len(errors) == len(futures):
+        return jsonify({'error': next(iter(errors.values())), **body}), 500
+    return jsonify(body), 200
+
+
 @counselor_routes.route('/invite', methods=['POST'])
 def generate_invite_code():
     config_error = ensure_supabase_config()
@@ -341,15 +513,14 @@ def generate_invite_code():
 
     code = secrets.token_hex(4).upper()
     try:
-        response = requests.post(
-            f'{SUPABASE_URL}/rest/v1/counselor_invites',
-            headers={**get_service_headers(), 'Prefer': 'return=representation'},
-            json={
+        response = supabase.insert(
+            'counselor_invites',
+            {
                 'counselor_id': counselor_id,
                 'code': code,
                 'used': False,
             },
-            timeout=15,
+            prefer='return=representation',
         )
         if not response.ok:
             return jsonify({'error': f'Failed to generate invite code: {supabase_error_message(response)}'}), 500
@@ -369,15 +540,13 @@ def get_invite_codes():
         return role_response
 
     try:
-        response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/counselor_invites',
-            headers=get_service_headers(),
-            params={
+        response = supabase.select(
+            'counselor_invites',
+            {
                 'counselor_id': f'eq.{counselor_id}',
                 'select': '*',
                 'order': 'id.desc',
             },
-            timeout=15,
         )
         if not response.ok:
             return jsonify({'error': f'Failed to load invite codes: {supabase_error_message(response)}'}), 500
@@ -393,6 +562,12 @@ def role_check():
     if config_error:
         return jsonify({'authorized': False, 'error': config_error}), 500
 
+    # ?refresh=1 re-reads the profile role, e.g. right after a role change.
+    if request.args.get('refresh', '').lower() in ('1', 'true', 'yes'):
+        user, _ = get_authenticated_user()
+        if user and user.get('id'):
+            invalidate_role(str(user['id']))
+
     counselor_id, role_response = get_counselor_user_id()
     if role_response:
         body, status = role_response
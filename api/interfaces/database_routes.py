@@ -1,29 +1,18 @@
-import os
 from typing import Any
 
 import requests
-from dotenv import load_dotenv
 from flask import Blueprint, jsonify, request
-from pathlib import Path
 
-API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
-load_dotenv(API_ENV_PATH)
+from utils import auth_cache
+from utils.supabase_client import (
+    SUPABASE_KEY,
+    SUPABASE_URL,
+    supabase,
+    supabase_error_message,
+)
 
 database_routes = Blueprint('database_routes', __name__, url_prefix='/api/database')
 
-SUPABASE_URL = os.getenv('SUPABASE_URL', '').rstrip('/')
-SUPABASE_KEY = os.getenv('SUPABASE_KEY', '')
-SUPABASE_SECRET_KEY = os.getenv('SUPABASE_SECRET_KEY', '')
-# Allow fallback to frontend-style env names to reduce local setup friction.
-if not SUPABASE_URL:
-    SUPABASE_URL = os.getenv('EXPO_PUBLIC_SUPABASE_URL', '').rstrip('/')
-if not SUPABASE_KEY:
-    SUPABASE_KEY = os.getenv('EXPO_PUBLIC_SUPABASE_ANON_KEY', '')
-if not SUPABASE_KEY:
-    SUPABASE_KEY = os.getenv('SUPABASE_ANON_KEY', '')
-if not SUPABASE_SECRET_KEY:
-    SUPABASE_SECRET_KEY = SUPABASE_KEY
-
 
 def get_token_from_header() -> str | None:
     auth_header = request.headers.get('Authorization', '')
@@ -36,33 +25,31 @@ def get_user_from_token(token: str) -> tuple[dict[str, Any] | None, str | None]:
     if not SUPABASE_URL or not SUPABASE_KEY:
         return None, 'Backend missing Supabase env values.'
 
+    cached_user = auth_cache.get_cached_user(token)
+    if cached_user:
+        return cached_user, None
+
+    claims = auth_cache.verify_token_locally(token)
+    if claims:
+        user = auth_cache.claims_to_user(claims)
+        auth_cache.cache_user(token, user, expires_at=claims.get('exp'))
+        return user, None
+
     try:
-        response = requests.get(
-            f"{SUPABASE_URL}/auth/v1/user",
-            headers={
-                'apikey': SUPABASE_KEY,
-                'Authorization': f'Bearer {token}',
-            },
-            timeout=10,
-        )
+        response = supabase.get_auth_user(token)
         if not response.ok:
-            error_payload = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-            message = error_payload.get('msg') or error_payload.get('message') or response.text
-            return None, f'Supabase auth check failed ({response.status_code}): {message}'
+            return None, f'Supabase auth check failed ({response.status_code}): {supabase_error_message(response)}'
         payload = response.json()
         if not payload.get('id'):
             return None, 'Supabase auth payload missing user id.'
+        auth_cache.cache_user(token, payload)
         return payload, None
     except requests.RequestException as exc:
         return None, f'Unable to reach Supabase auth endpoint: {exc}'
 
 
 def get_service_headers() -> dict[str, str]:
-    return {
-        'apikey': SUPABASE_SECRET_KEY,
-        'Authorization': f'Bearer {SUPABASE_SECRET_KEY}',
-        'Content-Type': 'application/json',
-    }
+    return supabase.service_headers()
 
 
 def normalize_college_input(college_data: dict[str, Any]) -> dict[str, Any]:
@@ -112,17 +99,15 @@ def insert_college():
     user_id = user['id']
 
     try:
-        duplicate_response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/user_colleges',
-            headers=get_service_headers(),
-            params={
+        duplicate_response = supabase.select(
+            'user_colleges',
+            {
                 'user_id': f'eq.{user_id}',
                 'college_name': f"eq.{normalized['college_name']}",
                 'state': f"eq.{normalized.get('state') or ''}",
                 'select': 'id,college_name,city,state,school_url,student_size,tuition_in_state,tuition_out_of_state,admission_rate',
                 'limit': '1',
             },
-            timeout=15,
         )
         if duplicate_response.ok:
             duplicates = duplicate_response.json() if duplicate_response.content else []
@@ -130,20 +115,9 @@ def insert_college():
                 return jsonify({'message': 'College already saved', 'data': duplicates[0]}), 200
 
         insert_payload = {'user_id': user_id, **normalized}
-        insert_response = requests.post(
-            f'{SUPABASE_URL}/rest/v1/user_colleges',
-            headers={**get_service_headers(), 'Prefer': 'return=representation'},
-            json=insert_payload,
-            timeout=15,
-        )
+        insert_response = supabase.insert('user_colleges', insert_payload, prefer='return=representation')
         if not insert_response.ok:
-            error_payload = (
-                insert_response.json()
-                if insert_response.headers.get('content-type', '').startswith('application/json')
-                else {}
-            )
-            message = error_payload.get('message') or error_payload.get('error') or insert_response.text
-            return jsonify({'error': f'Failed to save college: {message}'}), 500
+            return jsonify({'error': f'Failed to save college: {supabase_error_message(insert_response)}'}), 500
 
         inserted = insert_response.json()[0] if insert_response.content else insert_payload
         return jsonify({'message': 'College saved successfully', 'data': inserted}), 201
@@ -166,20 +140,16 @@ def get_saved_colleges():
 
     user_id = user['id']
     try:
-        response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/user_colleges',
-            headers=get_service_headers(),
-            params={
+        response = supabase.select(
+            'user_colleges',
+            {
                 'user_id': f'eq.{user_id}',
                 'select': 'id,college_name,city,state,school_url,student_size,tuition_in_state,tuition_out_of_state,admission_rate',
                 'order': 'created_at.asc.nullslast,college_name.asc',
             },
-            timeout=15,
         )
         if not response.ok:
-            error_payload = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-            message = error_payload.get('message') or error_payload.get('error') or response.text
-            return jsonify({'error': f'Failed to load colleges: {message}'}), 500
+            return jsonify({'error': f'Failed to load colleges: {supabase_error_message(response)}'}), 500
 
         return jsonify({'colleges': response.json() if response.content else []})
     except requests.RequestException as exc:
@@ -201,19 +171,16 @@ def delete_saved_college(college_id: str):
 
     user_id = user['id']
     try:
-        response = requests.delete(
-            f'{SUPABASE_URL}/rest/v1/user_colleges',
-            headers={**get_service_headers(), 'Prefer': 'return=representation'},
-            params={
+        response = supabase.delete(
+            'user_colleges',
+            {
                 'id': f'eq.{college_id}',
                 'user_id': f'eq.{user_id}',
             },
-            timeout=15,
+            prefer='return=representation',
         )
         if not response.ok:
-            error_payload = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-            message = error_payload.get('message') or error_payload.get('error') or response.text
-            return jsonify({'error': f'Failed to remove college: {message}'}), 500
+            return jsonify({'error': f'Failed to remove college: {supabase_error_message(response)}'}), 500
 
         deleted_rows = response.json() if response.content else []
         if not deleted_rows:
@@ -1,27 +1,81 @@
+import hmac
 import json
 import os
-import tempfile
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from dotenv import load_dotenv
 from flask import Blueprint, jsonify, request
 from openai import OpenAI
 
-from utils.token_manager import require_tokens
+from interfaces.database_routes import get_token_from_header, get_user_from_token
+from utils.ai_cache import cache_result, completion_cache_key, get_cached_result
+from utils.governor import GovernorTimeout
+from utils.job_queue import FINISHED_STATUSES, JobQueueFull, JobRunner, SQLiteJobStore, job_view
+from utils.long_input import clean_text, needs_sections, split_sections
+from utils.openai_client import get_openai_client, is_rate_limited, openai_flight, openai_governor
+from utils.single_flight import SingleFlightTimeout
+from utils.streaming import JsonMemberStream, StreamOutcome, event_stream_response, sse_event
+from utils.text_extraction import EXTRACT_MAX_BYTES, ExtractionError, cached_document_text, extract_document_text
+from utils.token_manager import (
+  defer_token_charge,
+  require_tokens,
+  settle_token_charge,
+)
 
 API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
 load_dotenv(API_ENV_PATH)
 
 openai_routes = Blueprint('openai_routes', __name__, url_prefix='/api/openai')
 
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+RESUME_JOB_WORKERS = int(os.getenv('RESUME_JOB_WORKERS', '2'))
+RESUME_JOB_MAX_PENDING = int(os.getenv('RESUME_JOB_MAX_PENDING', '50'))
+RESUME_JOB_RETENTION_SECONDS = float(os.getenv('RESUME_JOB_RETENTION_SECONDS', '86400'))
+RESUME_JOB_EVENTS_TIMEOUT_SECONDS = float(os.getenv('RESUME_JOB_EVENTS_TIMEOUT_SECONDS', '25'))
+RESUME_JOB_DB_PATH = os.getenv(
+  'RESUME_JOB_DB_PATH',
+  str(Path(__file__).resolve().parent.parent / 'data' / 'resume_jobs.db'),
+).strip()
+RESUME_JOB_UPLOAD_DIR = Path(os.getenv(
+  'RESUME_JOB_UPLOAD_DIR',
+  str(Path(__file__).resolve().parent.parent / 'data' / 'resume_uploads'),
+).strip())
+AI_MAP_WORKERS = int(os.getenv('AI_MAP_WORKERS', '8'))
+AI_SECTION_NOTES_MAX_TOKENS = int(os.getenv('AI_SECTION_NOTES_MAX_TOKENS', '400'))
+# /metrics is off unless a key is set; callers send it as X-Metrics-Key.
+OPENAI_METRICS_KEY = os.getenv('OPENAI_METRICS_KEY', '').strip()
+
+# Map step for long inputs: every section is summarised concurrently.
+_map_executor = ThreadPoolExecutor(max_workers=AI_MAP_WORKERS, thread_name_prefix='ai-map')
+
+RESUME_SECTION_INSTRUCTIONS = (
+  'You are reviewing one section of a long student resume for a college admissions coach. '
+  'List its strengths, weaknesses and concrete edits as terse bullet points. '
+  'Quote short phrases verbatim when suggesting rewrites.'
+)
+ESSAY_SECTION_INSTRUCTIONS = (
+  'You are reviewing one section of a long college admissions essay for a grader. '
+  'For clarity, voice, structure, evidence, style, mechanics and impact, note what works and what does not '
+  'as terse bullet points, quoting short passages verbatim as examples.'
+)
+
+RUBRIC_WEIGHTS = {
+  'clarity_and_thesis': 0.18,
+  'voice_and_authenticity': 0.18,
+  'structure_and_flow': 0.18,
+  'evidence_and_specificity': 0.16,
+  'style_and_readability': 0.14,
+  'mechanics_and_grammar': 0.10,
+  'impact_and_memorability': 0.06,
+}
 
 
 def get_client() -> OpenAI:
-  if not OPENAI_API_KEY:
-    raise ValueError('Missing OPENAI_API_KEY in api/.env')
-  return OpenAI(api_key=OPENAI_API_KEY)
+  return get_openai_client()
 
 
 def build_resume_feedback_prompt(resume_text: str) -> str:
@@ -33,53 +87,248 @@ def build_resume_feedback_prompt(resume_text: str) -> str:
   )
 
 
-def analyze_resume_with_ai(resume_text: str) -> str:
-  client = get_client()
-  completion = client.chat.completions.create(
-    model=OPENAI_MODEL,
-    messages=[
+def build_resume_merge_prompt(section_notes: list[str]) -> str:
+  notes = '\n\n'.join(f'Section {index + 1} notes:\n{note}' for index, note in enumerate(section_notes))
+  return (
+    'This student resume was too long to review in one pass, so each section was reviewed separately. '
+    'Merge the section notes below into one review with practical, actionable feedback for college applications. '
+    'Focus on content impact, clarity, formatting, and what to improve immediately. '
+    'Use concise markdown with sections: Summary, Strengths, Improvements, and Priority Edits.\n\n'
+    f'{notes}'
+  )
+
+
+def cached_completion(completion_kwargs: dict, build_result) -> dict:
+  cached = get_cached_result(completion_kwargs)
+  if cached is not None:
+    return cached
+  return fetch_completion(completion_kwargs, build_result)
+
+
+def map_sections(text: str, instructions: str) -> list[str]:
+  # One concurrent round over at most AI_MAX_SECTIONS sections, each capped at
+  # AI_SECTION_NOTES_MAX_TOKENS; covered by the request's own token charge.
+  # Section notes are cached like any other completion.
+  sections = split_sections(text, OPENAI_MODEL)
+  futures = [
+    _map_executor.submit(
+      cached_completion,
+      {
+        'model': OPENAI_MODEL,
+        'messages': [
+          {'role': 'system', 'content': instructions},
+          {'role': 'user', 'content': f'Section {index + 1} of {len(sections)}:\n\n{section}'},
+        ],
+        'temperature': 0.2,
+        'max_tokens': AI_SECTION_NOTES_MAX_TOKENS,
+      },
+      lambda text: {'notes': text.strip()},
+    )
+    for index, section in enumerate(sections)
+  ]
+  return [future.result()['notes'] for future in futures]
+
+
+def resume_completion_kwargs(resume_text: str) -> dict:
+  # The full-text request; it is also the cache key when the text is long
+  # enough to go through resume_map_step.
+  return _resume_kwargs(build_resume_feedback_prompt(clean_text(resume_text)))
+
+
+def resume_map_step(resume_text: str):
+  # For long resumes, a callable that reviews each section and returns the
+  # merge request sent upstream in place of the full text; None otherwise.
+  resume_text = clean_text(resume_text)
+  if not needs_sections(resume_text, OPENAI_MODEL):
+    return None
+  return lambda: _resume_kwargs(build_resume_merge_prompt(map_sections(resume_text, RESUME_SECTION_INSTRUCTIONS)))
+
+
+def _resume_kwargs(prompt: str) -> dict:
+  return {
+    'model': OPENAI_MODEL,
+    'messages': [
       {
         'role': 'system',
         'content': 'You are an expert college admissions and resume coach. Give specific, actionable advice.',
       },
       {
         'role': 'user',
-        'content': build_resume_feedback_prompt(resume_text),
+        'content': prompt,
       },
     ],
-    temperature=0.4,
-    max_tokens=900,
-  )
-  return (completion.choices[0].message.content or '').strip()
+    'temperature': 0.4,
+    'max_tokens': 900,
+  }
 
 
-def extract_text_from_uploaded_file(file_path: str, filename: str) -> str:
-  extension = os.path.splitext(filename)[1].lower()
+def build_resume_feedback(text: str) -> dict:
+  return {'feedback': text.strip()}
 
-  if extension == '.pdf':
-    try:
-      from PyPDF2 import PdfReader
-    except Exception as exc:
-      raise ValueError('PDF support requires PyPDF2. Run api setup again.') from exc
 
-    reader = PdfReader(file_path)
-    return '\n'.join([(page.extract_text() or '') for page in reader.pages]).strip()
+def wants_stream() -> bool:
+  if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+    return True
+  return 'text/event-stream' in request.headers.get('Accept', '')
 
-  if extension == '.docx':
+
+def stream_chat_completion(completion_kwargs: dict, build_result, parse_text=None, map_step=None):
+  # Opens the upstream stream before returning so connection/auth failures
+  # still surface as a normal JSON error. Emits `delta` events (or whatever
+  # parse_text yields), then one `result` event with the non-streaming body.
+  # The governor slot is held until the stream is drained or the response closes.
+  outcome = StreamOutcome()
+  client = get_client()
+  upstream_kwargs = map_step() if map_step else completion_kwargs
+  stream = openai_governor.call(
+    lambda: client.chat.completions.create(stream=True, **upstream_kwargs),
+    hold=True,
+  )
+  released = threading.Event()
+
+  def release_slot() -> None:
+    if not released.is_set():
+      released.set()
+      openai_governor.release()
+
+  def events():
+    parts = []
     try:
-      from docx import Document
+      for chunk in stream:
+        if not chunk.choices:
+          continue
+        text = chunk.choices[0].delta.content or ''
+        if not text:
+          continue
+        parts.append(text)
+        if parse_text is None:
+          yield sse_event('delta', {'text': text})
+        else:
+          for event, data in parse_text(text):
+            yield sse_event(event, data)
+      result = build_result(''.join(parts))
+      cache_result(completion_kwargs, result)
+      yield sse_event('result', result)
+      outcome.completed = True
     except Exception as exc:
-      raise ValueError('DOCX support requires python-docx. Run api setup again.') from exc
+      yield sse_event('error', {'error': str(exc)})
+    finally:
+      stream.close()
+      release_slot()
+
+  response = event_stream_response(events(), outcome)
+  response.call_on_close(release_slot)
+  response.headers['X-Cache'] = 'MISS'
+  return response
+
+
+def cached_result_response(result: dict, stream: bool):
+  if stream:
+    outcome = StreamOutcome()
+    outcome.completed = True
+    response = event_stream_response(iter([sse_event('result', result)]), outcome)
+  else:
+    response = jsonify(result)
+  response.headers['X-Cache'] = 'HIT'
+  return response
+
+
+def fetch_completion(completion_kwargs: dict, build_result, map_step=None) -> dict:
+  # Concurrent identical requests (same cache key) wait on one upstream call.
+  # map_step, when given, builds the request actually sent (long inputs); the
+  # result is still cached under completion_kwargs.
+  def fetch() -> dict:
+    client = get_client()
+    upstream_kwargs = map_step() if map_step else completion_kwargs
+    completion = openai_governor.call(lambda: client.chat.completions.create(**upstream_kwargs))
+    result = build_result(completion.choices[0].message.content or '')
+    cache_result(completion_kwargs, result)
+    return result
+
+  result, _ = openai_flight.do(completion_cache_key(completion_kwargs), fetch)
+  return result
+
+
+def completion_error_response(exc: Exception):
+  if isinstance(exc, (GovernorTimeout, SingleFlightTimeout)) or is_rate_limited(exc):
+    return jsonify({'error': 'AI service is busy, please try again shortly.'}), 503
+  return jsonify({'error': str(exc)}), 500
+
+
+def run_completion(completion_kwargs: dict, build_result, parse_text=None, map_step=None):
+  # Identical requests (same prompt, model, temperature, weights) replay the
+  # stored result; require_tokens decides whether such hits are charged.
+  stream = wants_stream()
+  cached = get_cached_result(completion_kwargs)
+  if cached is not None:
+    return cached_result_response(cached, stream)
+
+  if stream:
+    return stream_chat_completion(completion_kwargs, build_result, parse_text, map_step)
+
+  result = fetch_completion(completion_kwargs, build_result, map_step)
+  response = jsonify(result)
+  response.headers['X-Cache'] = 'MISS'
+  return response, 200
+
+
+def cached_completion_response(completion_kwargs: dict):
+  # For require_tokens(cached_response=...): the stored result, or None.
+  cached = get_cached_result(completion_kwargs)
+  return cached_result_response(cached, wants_stream()) if cached is not None else None
+
+
+@openai_routes.route('/metrics', methods=['GET'])
+def openai_metrics():
+  if not OPENAI_METRICS_KEY:
+    return jsonify({'error': 'Not found'}), 404
+  if not hmac.compare_digest(request.headers.get('X-Metrics-Key', ''), OPENAI_METRICS_KEY):
+    return jsonify({'error': 'Invalid metrics key'}), 401
+  return jsonify({**openai_governor.metrics(), 'shared_calls': openai_flight.stats()}), 200
+
+
+def outline_completion_kwargs(payload: dict) -> dict:
+  prompt = (
+    'Generate a strong college personal statement outline from these responses. '
+    'Return concise markdown with: Hook, Core Story, Reflection, Why College, and Closing.\\n\\n'
+    f"About me: {payload.get('aboutYourself', '')}\\n"
+    f"Unique quality: {payload.get('uniqueQuality', '')}\\n"
+    f"Story about loved one: {payload.get('storyAboutLovedOne', '')}\\n"
+    f"What colleges should know: {payload.get('collegeInfo', '')}"
+  )
+  return {
+    'model': OPENAI_MODEL,
+    'messages': [
+      {
+        'role': 'system',
+        'content': 'You are an expert college admissions essay coach. Keep output practical and specific.'
+      },
+      {'role': 'user', 'content': prompt},
+    ],
+    'temperature': 0.6,
+    'max_tokens': 700,
+  }
+
 
-    document = Document(file_path)
-    return '\n'.join([paragraph.text for paragraph in document.paragraphs]).strip()
+def build_outline(payload: dict, outline_text: str) -> dict:
+  return {
+    'outline': {
+      'introduction': payload.get('aboutYourself', ''),
+      'uniqueTrait': payload.get('uniqueQuality', ''),
+      'story': payload.get('storyAboutLovedOne', ''),
+      'collegeGoal': payload.get('collegeInfo', ''),
+      'aiOutline': outline_text.strip(),
+    }
+  }
 
-  with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-    return file.read().strip()
+
+def cached_outline_response():
+  payload = request.get_json(silent=True) or {}
+  return cached_completion_response(outline_completion_kwargs(payload)) if any(payload.values()) else None
 
 
 @openai_routes.route('/generate-outline', methods=['POST'])
-@require_tokens(cost=1, feature='generate_outline')
+@require_tokens(cost=1, feature='generate_outline', cached_response=cached_outline_response)
 def generate_outline():
   payload = request.get_json(silent=True) or {}
 
@@ -87,141 +336,164 @@ def generate_outline():
     return jsonify({'error': 'Missing responses'}), 400
 
   try:
-    client = get_client()
-
-    prompt = (
-      'Generate a strong college personal statement outline from these responses. '
-      'Return concise markdown with: Hook, Core Story, Reflection, Why College, and Closing.\\n\\n'
-      f"About me: {payload.get('aboutYourself', '')}\\n"
-      f"Unique quality: {payload.get('uniqueQuality', '')}\\n"
-      f"Story about loved one: {payload.get('storyAboutLovedOne', '')}\\n"
-      f"What colleges should know: {payload.get('collegeInfo', '')}"
+    return run_completion(
+      outline_completion_kwargs(payload),
+      lambda text: build_outline(payload, text),
     )
+  except Exception as exc:
+    return completion_error_response(exc)
+
+
+def grade_completion_kwargs(essay: str, context: str, meta: dict) -> dict:
+  return _grade_kwargs({'essay': clean_text(essay)}, context, meta)
+
+
+def grade_map_step(essay: str, context: str, meta: dict):
+  # Long essays are graded from per-section notes so the request stays
+  # within budget; see resume_map_step.
+  essay = clean_text(essay)
+  if not needs_sections(essay, OPENAI_MODEL):
+    return None
+  return lambda: _grade_kwargs(
+    {
+      'essay_section_notes': map_sections(essay, ESSAY_SECTION_INSTRUCTIONS),
+      'essay_note': 'The essay was too long to include in full; grade it from these section notes.',
+    },
+    context,
+    meta,
+  )
 
-    completion = client.chat.completions.create(
-      model=OPENAI_MODEL,
-      messages=[
-        {
-          'role': 'system',
-          'content': 'You are an expert college admissions essay coach. Keep output practical and specific.'
-        },
-        {'role': 'user', 'content': prompt},
-      ],
-      temperature=0.6,
-      max_tokens=700,
-    )
 
-    outline_text = completion.choices[0].message.content or ''
-    outline = {
-      'introduction': payload.get('aboutYourself', ''),
-      'uniqueTrait': payload.get('uniqueQuality', ''),
-      'story': payload.get('storyAboutLovedOne', ''),
-      'collegeGoal': payload.get('collegeInfo', ''),
-      'aiOutline': outline_text.strip(),
-    }
+def _grade_kwargs(essay_input: dict, context: str, meta: dict) -> dict:
+  return {
+    'model': OPENAI_MODEL,
+    'response_format': {'type': 'json_object'},
+    'temperature': 0.2,
+    'max_tokens': 1200,
+    'messages': [
+      {
+        'role': 'system',
+        'content': (
+          'You are an expert college admissions essay grader. '
+          'Return only valid JSON and follow the requested schema exactly.'
+        ),
+      },
+      {
+        'role': 'user',
+        'content': json.dumps(
+          {
+            **essay_input,
+            'context': context,
+            'meta': meta,
+            'rubric_weights': RUBRIC_WEIGHTS,
+            'return_schema': {
+              'score': 'number 0-10',
+              'summary': 'string',
+              'rubric_scores': {
+                'clarity_and_thesis': {'score': 'number', 'reason': 'string'},
+                'voice_and_authenticity': {'score': 'number', 'reason': 'string'},
+                'structure_and_flow': {'score': 'number', 'reason': 'string'},
+                'evidence_and_specificity': {'score': 'number', 'reason': 'string'},
+                'style_and_readability': {'score': 'number', 'reason': 'string'},
+                'mechanics_and_grammar': {'score': 'number', 'reason': 'string'},
+                'impact_and_memorability': {'score': 'number', 'reason': 'string'},
+              },
+              'strengths': ['string'],
+              'weaknesses': ['string'],
+              'priority_fixes': [
+                {
+                  'issue': 'string',
+                  'why_it_matters': 'string',
+                  'how_to_fix': 'string',
+                  'before_example': 'string',
+                  'after_example': 'string',
+                }
+              ],
+            },
+          }
+        ),
+      },
+    ],
+  }
 
-    return jsonify({'outline': outline}), 200
-  except Exception as exc:
-    return jsonify({'error': str(exc)}), 500
 
+def build_grade_result(raw: str, meta: dict) -> dict:
+  result = json.loads(raw or '{}')
+  return {
+    'score': result.get('score', 0),
+    'summary': result.get('summary', ''),
+    'rubric_scores': result.get('rubric_scores', {}),
+    'strengths': result.get('strengths', []),
+    'weaknesses': result.get('weaknesses', []),
+    'priority_fixes': result.get('priority_fixes', []),
+    'meta': meta,
+  }
 
-@openai_routes.route('/grade-essay', methods=['POST'])
-@require_tokens(cost=1, feature='grade_essay')
-def grade_essay():
+
+def grade_stream_parser():
+  # `section` per finished rubric entry, `field` per other finished top-level key.
+  members = JsonMemberStream()
+
+  def parse(text: str):
+    for path, key, value in members.feed(text):
+      if path == ('rubric_scores',):
+        yield 'section', {'rubric': key, 'value': value}
+      elif not path and key != 'rubric_scores':
+        yield 'field', {'name': key, 'value': value}
+
+  return parse
+
+
+def grade_request() -> tuple[str, str, dict]:
   payload = request.get_json(silent=True) or {}
   essay = (payload.get('essay') or '').strip()
   context = (payload.get('context') or '').strip()
-
-  if not essay:
-    return jsonify({'error': "Missing 'essay' in request body"}), 400
-
   word_count = len([word for word in essay.split() if word])
   char_count = len(essay)
+  return essay, context, {'word_count': word_count, 'char_count': char_count}
 
-  rubric_weights = {
-    'clarity_and_thesis': 0.18,
-    'voice_and_authenticity': 0.18,
-    'structure_and_flow': 0.18,
-    'evidence_and_specificity': 0.16,
-    'style_and_readability': 0.14,
-    'mechanics_and_grammar': 0.10,
-    'impact_and_memorability': 0.06,
-  }
 
-  try:
-    client = get_client()
+def cached_grade_response():
+  essay, context, meta = grade_request()
+  return cached_completion_response(grade_completion_kwargs(essay, context, meta)) if essay else None
 
-    completion = client.chat.completions.create(
-      model=OPENAI_MODEL,
-      response_format={'type': 'json_object'},
-      temperature=0.2,
-      max_tokens=1200,
-      messages=[
-        {
-          'role': 'system',
-          'content': (
-            'You are an expert college admissions essay grader. '
-            'Return only valid JSON and follow the requested schema exactly.'
-          ),
-        },
-        {
-          'role': 'user',
-          'content': json.dumps(
-            {
-              'essay': essay,
-              'context': context,
-              'meta': {'word_count': word_count, 'char_count': char_count},
-              'rubric_weights': rubric_weights,
-              'return_schema': {
-                'score': 'number 0-10',
-                'summary': 'string',
-                'rubric_scores': {
-                  'clarity_and_thesis': {'score': 'number', 'reason': 'string'},
-                  'voice_and_authenticity': {'score': 'number', 'reason': 'string'},
-                  'structure_and_flow': {'score': 'number', 'reason': 'string'},
-                  'evidence_and_specificity': {'score': 'number', 'reason': 'string'},
-                  'style_and_readability': {'score': 'number', 'reason': 'string'},
-                  'mechanics_and_grammar': {'score': 'number', 'reason': 'string'},
-                  'impact_and_memorability': {'score': 'number', 'reason': 'string'},
-                },
-                'strengths': ['string'],
-                'weaknesses': ['string'],
-                'priority_fixes': [
-                  {
-                    'issue': 'string',
-                    'why_it_matters': 'string',
-                    'how_to_fix': 'string',
-                    'before_example': 'string',
-                    'after_example': 'string',
-                  }
-                ],
-              },
-            }
-          ),
-        },
-      ],
-    )
 
-    raw = completion.choices[0].message.content or '{}'
-    result = json.loads(raw)
+@openai_routes.route('/grade-essay', methods=['POST'])
+@require_tokens(cost=1, feature='grade_essay', cached_response=cached_grade_response)
+def grade_essay():
+  essay, context, meta = grade_request()
 
-    return jsonify(
-      {
-        'score': result.get('score', 0),
-        'summary': result.get('summary', ''),
-        'rubric_scores': result.get('rubric_scores', {}),
-        'strengths': result.get('strengths', []),
-        'weaknesses': result.get('weaknesses', []),
-        'priority_fixes': result.get('priority_fixes', []),
-        'meta': {'word_count': word_count, 'char_count': char_count},
-      }
-    ), 200
+  if not essay:
+    return jsonify({'error': "Missing 'essay' in request body"}), 400
+
+  try:
+    return run_completion(
+      grade_completion_kwargs(essay, context, meta),
+      lambda raw: build_grade_result(raw, meta),
+      grade_stream_parser(),
+      grade_map_step(essay, context, meta),
+    )
   except Exception as exc:
-    return jsonify({'error': str(exc)}), 500
+    return completion_error_response(exc)
+
+
+def cached_resume_text_response():
+  payload = request.get_json(silent=True) or {}
+  resume_text = (payload.get('resume_text') or '').strip()
+  return cached_completion_response(resume_completion_kwargs(resume_text)) if resume_text else None
+
+
+def cached_resume_upload_response():
+  # Only answers when this exact file was already extracted; nothing is parsed.
+  resume_file = request.files.get('resume') or request.files.get('file')
+  if not resume_file or not resume_file.filename:
+    return None
+  resume_text = cached_document_text(resume_file.stream, resume_file.filename)
+  return cached_completion_response(resume_completion_kwargs(resume_text)) if resume_text else None
 
 
 @openai_routes.route('/analyze-resume', methods=['POST'])
-@require_tokens(cost=1, feature='analyze_resume')
+@require_tokens(cost=1, feature='analyze_resume', cached_response=cached_resume_text_response)
 def analyze_resume():
   payload = request.get_json(silent=True) or {}
   resume_text = (payload.get('resume_text') or '').strip()
@@ -230,14 +502,17 @@ def analyze_resume():
     return jsonify({'error': "Missing 'resume_text' in request body"}), 400
 
   try:
-    feedback = analyze_resume_with_ai(resume_text)
-    return jsonify({'feedback': feedback}), 200
+    return run_completion(
+      resume_completion_kwargs(resume_text),
+      build_resume_feedback,
+      map_step=resume_map_step(resume_text),
+    )
   except Exception as exc:
-    return jsonify({'error': str(exc)}), 500
+    return completion_error_response(exc)
 
 
 @openai_routes.route('/upload-resume', methods=['POST'])
-@require_tokens(cost=1, feature='upload_resume')
+@require_tokens(cost=1, feature='upload_resume', cached_response=cached_resume_upload_response)
 def upload_resume():
   resume_file = request.files.get('resume') or request.files.get('file')
   if not resume_file:
@@ -248,20 +523,182 @@ def upload_resume():
     return jsonify({'error': 'Missing uploaded filename'}), 400
 
   try:
-    extension = os.path.splitext(resume_file.filename)[1]
-    with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as temp_file:
-      temp_file.write(resume_file.read())
-      temp_path = temp_file.name
-
-    try:
-      resume_text = extract_text_from_uploaded_file(temp_path, resume_file.filename)
-    finally:
-      os.remove(temp_path)
+    resume_text = extract_document_text(resume_file.stream, resume_file.filename)
+  except ExtractionError as exc:
+    return jsonify({'error': str(exc)}), 400
+  except Exception as exc:
+    return completion_error_response(exc)
 
+  try:
     if not resume_text:
       return jsonify({'error': 'Could not extract readable text from this file.'}), 400
 
-    feedback = analyze_resume_with_ai(resume_text)
-    return jsonify({'feedback': feedback}), 200
+    return run_completion(
+      resume_completion_kwargs(resume_text),
+      build_resume_feedback,
+      map_step=resume_map_step(resume_text),
+    )
   except Exception as exc:
+    return completion_error_response(exc)
+
+
+def run_resume_job(payload: dict) -> tuple[dict, bool]:
+  file_path = payload.get('file_path')
+  if file_path:
+    resume_text = extract_document_text(file_path, payload.get('filename') or file_path)
+  else:
+    resume_text = (payload.get('resume_text') or '').strip()
+
+  if not resume_text:
+    raise ValueError('Could not extract readable text from this file.')
+
+  completion_kwargs = resume_completion_kwargs(resume_text)
+  cached = get_cached_result(completion_kwargs)
+  if cached is not None:
+    return cached, False
+  return fetch_completion(completion_kwargs, build_resume_feedback, resume_map_step(resume_text)), True
+
+
+def finish_resume_job(job: dict, succeeded: bool, billable: bool) -> None:
+  # Runs for every finished job, including ones failed without running
+  # after too many interrupted attempts, so the spooled upload never leaks.
+  file_path = (job.get('payload') or {}).get('file_path')
+  if file_path:
+    Path(file_path).unlink(missing_ok=True)
+  settle_token_charge(job.get('charge'), succeeded, billable)
+
+
+resume_jobs = JobRunner(
+  SQLiteJobStore(RESUME_JOB_DB_PATH),
+  workers=RESUME_JOB_WORKERS,
+  max_pending=RESUME_JOB_MAX_PENDING,
+  retention_seconds=RESUME_JOB_RETENTION_SECONDS,
+  on_finish=finish_resume_job,
+  name='resume-jobs',
+)
+resume_jobs.register('resume_feedback', run_resume_job)
+
+
+def request_user_id() -> str | None:
+  token = get_token_from_header()
+  if not token:
+    return None
+  user, auth_error = get_user_from_token(token)
+  if not user or auth_error:
+    return None
+  return str(user.get('id') or '') or None
+
+
+def submit_resume_job(payload: dict, job_id: str | None = None):
+  # Charged tokens stay reserved until the job finishes: committed on
+  # success, refunded on failure (or on a cache hit).
+  try:
+    job = resume_jobs.submit(
+      'resume_feedback',
+      payload,
+      user_id=request_user_id(),
+      charge=defer_token_charge(),
+      job_id=job_id,
+    )
+  except JobQueueFull:
+    return jsonify({'error': 'Too many resumes are being processed, please try again shortly.'}), 503
+
+  body = job_view(job)
+  body['status_url'] = f"/api/openai/jobs/{job['id']}"
+  body['events_url'] = f"/api/openai/jobs/{job['id']}/events"
+  return jsonify(body), 202
+
+
+@openai_routes.route('/jobs/analyze-resume', methods=['POST'])
+@require_tokens(cost=1, feature='analyze_resume')
+def submit_analyze_resume_job():
+  payload = request.get_json(silent=True) or {}
+  resume_text = (payload.get('resume_text') or '').strip()
+
+  if not resume_text:
+    return jsonify({'error': "Missing 'resume_text' in request body"}), 400
+
+  return submit_resume_job({'resume_text': resume_text})
+
+
+@openai_routes.route('/jobs/upload-resume', methods=['POST'])
+@require_tokens(cost=1, feature='upload_resume')
+def submit_upload_resume_job():
+  resume_file = request.files.get('resume') or request.files.get('file')
+  if not resume_file:
+    available_keys = list(request.files.keys())
+    return jsonify({'error': "Missing 'resume' file in form data", 'file_keys': available_keys}), 400
+
+  if not resume_file.filename:
+    return jsonify({'error': 'Missing uploaded filename'}), 400
+
+  # Only spool the upload here; extraction and the OpenAI call run on a job worker.
+  job_id = JobRunner.new_job_id()
+  extension = re.sub(r'[^a-z0-9.]', '', os.path.splitext(resume_file.filename)[1].lower())
+  RESUME_JOB_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+  file_path = RESUME_JOB_UPLOAD_DIR / f'{job_id}{extension}'
+
+  try:
+    resume_file.save(str(file_path))
+    if file_path.stat().st_size > EXTRACT_MAX_BYTES:
+      file_path.unlink(missing_ok=True)
+      return jsonify({'error': 'This file is too large to analyze.'}), 400
+    response = submit_resume_job({'file_path': str(file_path), 'filename': resume_file.filename}, job_id=job_id)
+  except Exception as exc:
+    file_path.unlink(missing_ok=True)
     return jsonify({'error': str(exc)}), 500
+
+  if isinstance(response, tuple) and response[1] != 202:
+    file_path.unlink(missing_ok=True)
+  return response
+
+
+def load_user_job(job_id: str):
+  user_id = request_user_id()
+  if not user_id:
+    return None, (jsonify({'error': 'Authentication required'}), 401)
+  job = resume_jobs.get(job_id)
+  if not job or job['user_id'] != user_id:
+    return None, (jsonify({'error': 'Job not found'}), 404)
+  return job, None
+
+
+@openai_routes.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+  job, error = load_user_job(job_id)
+  if error:
+    return error
+  return jsonify(job_view(job)), 200
+
+
+@openai_routes.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id: str):
+  job, error = load_user_job(job_id)
+  if error:
+    return error
+
+  outcome = StreamOutcome()
+
+  def events():
+    deadline = time.monotonic() + RESUME_JOB_EVENTS_TIMEOUT_SECONDS
+    current = job
+    last_status = None
+    while True:
+      if current['status'] != last_status:
+        last_status = current['status']
+        yield sse_event('status', {'status': last_status})
+      if current['status'] in FINISHED_STATUSES:
+        view = job_view(current)
+        if 'result' in view:
+          yield sse_event('result', view['result'])
+        else:
+          yield sse_event('error', {'error': view.get('error')})
+        outcome.completed = True
+        return
+      if time.monotonic() >= deadline:
+        yield sse_event('timeout', {'status': last_status})
+        return
+      yield ': keepalive\n\n'
+      current = resume_jobs.wait(job_id, timeout=min(15.0, max(0.0, deadline - time.monotonic()))) or current
+
+  return event_stream_response(events(), outcome)
@@ -1,66 +1,35 @@
+import math
+import os
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
 from urllib.parse import quote_plus, urlparse
 
+import requests
+from dotenv import load_dotenv
 from flask import Blueprint, jsonify, request
 
+from interfaces.database_routes import get_token_from_header, get_user_from_token
+from utils.scholarship_index import CatalogIndex
+from utils.scholarship_matching import ProfileMatches
+from utils.supabase_client import supabase, supabase_error_message
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
 scholarship_routes = Blueprint('scholarship_routes', __name__, url_prefix='/api/scholarships')
 
-NATIONAL_SCHOLARSHIPS = [
-    {
-        'id': 'fafsa',
-        'name': 'FAFSA',
-        'provider': 'Federal Student Aid',
-        'amount': 'Varies',
-        'deadline': 'Federal deadline varies yearly',
-        'description': 'Required application for most federal, state, and institutional financial aid.',
-        'eligibility': 'U.S. citizens and eligible non-citizens',
-        'tags': ['financial-aid', 'federal', 'need-based'],
-        'apply_url': 'https://studentaid.gov/h/apply-for-aid/fafsa',
-    },
-    {
-        'id': 'pell-grant',
-        'name': 'Federal Pell Grant',
-        'provider': 'Federal Student Aid',
-        'amount': 'Up to federal maximum',
-        'deadline': 'Submit FAFSA first',
-        'description': 'Need-based federal grant for undergraduate students.',
-        'eligibility': 'Undergraduate students with demonstrated financial need',
-        'tags': ['financial-aid', 'grant', 'need-based'],
-        'apply_url': 'https://studentaid.gov/understand-aid/types/grants/pell',
-    },
-    {
-        'id': 'coca-cola-scholars',
-        'name': 'Coca-Cola Scholars Program',
-        'provider': 'Coca-Cola Scholars Foundation',
-        'amount': '$20,000',
-        'deadline': 'Fall (annual)',
-        'description': 'Merit scholarship for high-achieving high school seniors with leadership and service.',
-        'eligibility': 'High school seniors in the U.S.',
-        'tags': ['scholarship', 'merit', 'leadership'],
-        'apply_url': 'https://www.coca-colascholarsfoundation.org/apply/',
-    },
-    {
-        'id': 'gates-scholarship',
-        'name': 'The Gates Scholarship',
-        'provider': 'The Gates Scholarship',
-        'amount': 'Full cost not covered by other aid',
-        'deadline': 'Fall (annual)',
-        'description': 'Highly selective scholarship for exceptional minority high school seniors with financial need.',
-        'eligibility': 'Pell-eligible high school seniors meeting program criteria',
-        'tags': ['scholarship', 'need-based', 'merit'],
-        'apply_url': 'https://www.thegatesscholarship.org/scholarship',
-    },
-    {
-        'id': 'jack-kent-cooke',
-        'name': 'Cooke College Scholarship',
-        'provider': 'Jack Kent Cooke Foundation',
-        'amount': 'Up to $55,000 per year',
-        'deadline': 'Varies (annual)',
-        'description': 'Scholarship for high-achieving students with financial need.',
-        'eligibility': 'High school seniors with strong academics and financial need',
-        'tags': ['scholarship', 'need-based', 'academic'],
-        'apply_url': 'https://www.jkcf.org/our-scholarships/college-scholarship-program/',
-    },
-]
+# JSON array (or .jsonl) of scholarships; the index is rebuilt when the file changes.
+SCHOLARSHIP_CATALOG_PATH = os.getenv(
+    'SCHOLARSHIP_CATALOG_PATH',
+    str(Path(__file__).resolve().parent.parent / 'data' / 'scholarships.json'),
+).strip()
+SCHOLARSHIP_PAGE_SIZE = int(os.getenv('SCHOLARSHIP_PAGE_SIZE', '50'))
+SCHOLARSHIP_MAX_PAGE_SIZE = int(os.getenv('SCHOLARSHIP_MAX_PAGE_SIZE', '200'))
+SCHOLARSHIP_RESOURCE_CACHE_MAX_ENTRIES = int(os.getenv('SCHOLARSHIP_RESOURCE_CACHE_MAX_ENTRIES', '4096'))
+
+scholarship_catalog = CatalogIndex(SCHOLARSHIP_CATALOG_PATH)
+profile_matches = ProfileMatches(scholarship_catalog)
 
 STATE_AID_LINKS = {
     'AZ': {
@@ -109,7 +78,17 @@ def _join_url(base_url: str, path: str) -> str:
     return f"{base_url.rstrip('/')}/{path.lstrip('/')}"
 
 
+@lru_cache(maxsize=SCHOLARSHIP_RESOURCE_CACHE_MAX_ENTRIES)
+def _school_resource_urls(school_name: str, school_url: str | None) -> tuple[tuple[str, str | None], ...]:
+    return tuple(_resource_urls(school_name, school_url).items())
+
+
 def _build_school_resource_urls(school_name: str, school_url: str | None) -> dict[str, str | None]:
+    # Memoised per (name, normalised url); each caller gets its own dict.
+    return dict(_school_resource_urls(school_name.strip(), school_url))
+
+
+def _resource_urls(school_name: str, school_url: str | None) -> dict[str, str | None]:
     query_name = school_name.strip() or 'college'
 
     if not school_url:
@@ -140,35 +119,85 @@ def _build_school_resource_urls(school_name: str, school_url: str | None) -> dic
     }
 
 
+def _parse_amount(value: str | None) -> float | None:
+    if value is None or not value.strip():
+        return None
+    amount = float(value)
+    # float() accepts 'nan' and 'inf', which would make every comparison false.
+    if not math.isfinite(amount):
+        raise ValueError('amount must be a finite number')
+    return amount
+
+
+def _parse_date(value: str | None) -> str | None:
+    if value is None or not value.strip():
+        return None
+    return date.fromisoformat(value.strip()).isoformat()
+
+
+def _matches_query(item: dict, query: str) -> bool:
+    return (
+        query in item['name'].lower()
+        or query in item['provider'].lower()
+        or query in item['description'].lower()
+        or any(query in tag.lower() for tag in item.get('tags', []))
+    )
+
+
+def _institutional_entry(school_name: str, school_url: str | None, resource_urls: dict[str, str | None]) -> dict:
+    return {
+        'id': 'institutional-scholarships',
+        'name': f'{school_name} Institutional Scholarships',
+        'provider': school_name,
+        'amount': 'Varies',
+        'deadline': 'Varies by school/program',
+        'description': 'School-specific scholarships, grants, and merit opportunities.',
+        'eligibility': 'Depends on institution requirements',
+        'tags': ['scholarship', 'institutional'],
+        'apply_url': resource_urls['school_scholarship_page_url'] or school_url or 'https://studentaid.gov/',
+    }
+
+
 @scholarship_routes.route('/list', methods=['GET'])
 def list_scholarships():
     school_name = request.args.get('school_name', '').strip()
-    state = request.args.get('state', '').strip().upper()
     school_url = _normalize_school_url(request.args.get('school_url'))
+    resource_urls = _build_school_resource_urls(school_name, school_url)
+    state = request.args.get('state', '').strip().upper()
     query = request.args.get('q', '').strip().lower()
 
-    resource_urls = _build_school_resource_urls(school_name, school_url)
-    scholarships = list(NATIONAL_SCHOLARSHIPS)
+    try:
+        min_amount = _parse_amount(request.args.get('min_amount'))
+        max_amount = _parse_amount(request.args.get('max_amount'))
+        deadline_after = _parse_date(request.args.get('deadline_after'))
+        deadline_before = _parse_date(request.args.get('deadline_before'))
+        limit = int(request.args.get('limit', SCHOLARSHIP_PAGE_SIZE))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'error': 'Invalid amount, deadline (YYYY-MM-DD), limit or offset.'}), 400
+    limit = max(1, min(limit, SCHOLARSHIP_MAX_PAGE_SIZE))
+    offset = max(0, offset)
+
+    scholarships, has_more = scholarship_catalog.get().search(
+        query,
+        state=state or None,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        deadline_after=deadline_after,
+        deadline_before=deadline_before,
+        offset=offset,
+        limit=limit,
+    )
 
+    # School and state aid links lead the first page; they have no amount or
+    # date, so amount and deadline_before filters leave them out.
+    resource_entries = []
     if school_name:
-        scholarships.insert(
-            0,
-            {
-                'id': 'institutional-scholarships',
-                'name': f'{school_name} Institutional Scholarships',
-                'provider': school_name,
-                'amount': 'Varies',
-                'deadline': 'Varies by school/program',
-                'description': 'School-specific scholarships, grants, and merit opportunities.',
-                'eligibility': 'Depends on institution requirements',
-                'tags': ['scholarship', 'institutional'],
-                'apply_url': resource_urls['school_scholarship_page_url'] or school_url or 'https://studentaid.gov/',
-            },
-        )
+        resource_entries.append(_institutional_entry(school_name, school_url, resource_urls))
 
     if state in STATE_AID_LINKS:
         state_link = STATE_AID_LINKS[state]
-        scholarships.append(
+        resource_entries.append(
             {
                 'id': f"state-aid-{state.lower()}",
                 'name': state_link['name'],
@@ -182,14 +211,60 @@ def list_scholarships():
             }
         )
 
-    if query:
-        scholarships = [
-            item
-            for item in scholarships
-            if query in item['name'].lower()
-            or query in item['provider'].lower()
-            or query in item['description'].lower()
-            or any(query in tag.lower() for tag in item.get('tags', []))
-        ]
-
-    return jsonify({'scholarships': scholarships, 'resources': resource_urls})
+    if offset == 0 and min_amount is None and max_amount is None and deadline_before is None:
+        scholarships = [item for item in resource_entries if not query or _matches_query(item, query)] + scholarships
+
+    return jsonify(
+        {
+            'scholarships': scholarships,
+            'resources': resource_urls,
+            'pagination': {'offset': offset, 'limit': limit, 'has_more': has_more},
+        }
+    )
+
+
+@scholarship_routes.route('/matches', methods=['GET'])
+def list_matched_scholarships():
+    token = get_token_from_header()
+    if not token:
+        return jsonify({'error': 'No token provided'}), 401
+
+    user, auth_error = get_user_from_token(token)
+    if not user or not user.get('id'):
+        return jsonify({'error': auth_error or 'Invalid auth token'}), 401
+
+    try:
+        limit = int(request.args.get('limit', SCHOLARSHIP_PAGE_SIZE))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or offset.'}), 400
+    limit = max(1, min(limit, SCHOLARSHIP_MAX_PAGE_SIZE))
+    offset = max(0, offset)
+
+    try:
+        # select=* so optional columns (state, financial_need) are picked up
+        # when the table has them.
+        response = supabase.select(
+            'user_profiles',
+            {'id': f"eq.{user['id']}", 'select': '*', 'limit': '1'},
+            coalesce=True,
+        )
+    except requests.RequestException as exc:
+        return jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500
+    if not response.ok:
+        return jsonify({'error': f'Failed to load profile: {supabase_error_message(response)}'}), 500
+
+    rows = response.json() if response.content else []
+    matches, total = profile_matches.get(rows[0] if rows else {}, offset, limit)
+
+    return jsonify(
+        {
+            'scholarships': matches,
+            'pagination': {
+                'offset': offset,
+                'limit': limit,
+                'has_more': offset + limit < total,
+                'total': total,
+            },
+        }
+    )
@@ -3,23 +3,19 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-import requests
 import stripe
 from dotenv import load_dotenv
 from flask import Blueprint, jsonify, request
 
 from interfaces.database_routes import get_token_from_header, get_user_from_token
+from utils.subscription_cache import SUBSCRIPTION_FIELDS, get_subscription, invalidate_subscription
+from utils.supabase_client import SUPABASE_SECRET_KEY, SUPABASE_URL, supabase
 
 API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
 load_dotenv(API_ENV_PATH)
 
 stripe_routes = Blueprint('stripe_routes', __name__, url_prefix='/api/stripe')
 
-SUPABASE_URL = os.getenv('SUPABASE_URL', '').rstrip('/')
-SUPABASE_SECRET_KEY = os.getenv('SUPABASE_SECRET_KEY', '').strip()
-if not SUPABASE_SECRET_KEY:
-    SUPABASE_SECRET_KEY = os.getenv('SUPABASE_KEY', '').strip()
-
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '').strip()
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET', '').strip()
 STRIPE_PRICE_ID = os.getenv('STRIPE_PRICE_ID', '').strip()
@@ -38,41 +34,18 @@ def _ensure_config() -> str | None:
     return None
 
 
-def _supabase_headers() -> dict[str, str]:
-    return {
-        'apikey': SUPABASE_SECRET_KEY,
-        'Authorization': f'Bearer {SUPABASE_SECRET_KEY}',
-        'Content-Type': 'application/json',
-    }
-
-
 def _supabase_select_subscription_by_user(user_id: str) -> dict[str, Any] | None:
-    response = requests.get(
-        f'{SUPABASE_URL}/rest/v1/subscriptions',
-        headers=_supabase_headers(),
-        params={
-            'user_id': f'eq.{user_id}',
-            'select': 'user_id,plan,status,current_period_end,stripe_customer_id,stripe_subscription_id',
-            'limit': '1',
-        },
-        timeout=15,
-    )
-    if not response.ok:
-        return None
-    rows = response.json() if response.content else []
-    return rows[0] if rows else None
+    return get_subscription(user_id)
 
 
 def _supabase_select_subscription_by_customer(customer_id: str) -> dict[str, Any] | None:
-    response = requests.get(
-        f'{SUPABASE_URL}/rest/v1/subscriptions',
-        headers=_supabase_headers(),
-        params={
+    response = supabase.select(
+        'subscriptions',
+        {
             'stripe_customer_id': f'eq.{customer_id}',
-            'select': 'user_id,plan,status,current_period_end,stripe_customer_id,stripe_subscription_id',
+            'select': SUBSCRIPTION_FIELDS,
             'limit': '1',
         },
-        timeout=15,
     )
     if not response.ok:
         return None
@@ -81,13 +54,7 @@ def _supabase_select_subscription_by_customer(customer_id: str) -> dict[str, Any
 
 
 def _supabase_upsert_subscription(row: dict[str, Any]) -> bool:
-    response = requests.post(
-        f'{SUPABASE_URL}/rest/v1/subscriptions',
-        headers={**_supabase_headers(), 'Prefer': 'resolution=merge-duplicates,return=representation'},
-        params={'on_conflict': 'user_id'},
-        json=row,
-        timeout=15,
-    )
+    response = supabase.upsert('subscriptions', row, on_conflict='user_id')
     return response.ok
 
 
@@ -142,6 +109,7 @@ def _get_or_create_customer(user_id: str, email: str) -> str:
             'status': 'active',
         }
     )
+    invalidate_subscription(user_id)
     return customer.id
 
 
@@ -175,6 +143,7 @@ def _sync_if_expired(user_id: str, row: dict[str, Any]) -> dict[str, Any]:
             'stripe_subscription_id': sub.get('id'),
         }
         _supabase_upsert_subscription(updates)
+        invalidate_subscription(user_id)
         return {**row, **updates}
     except Exception:
         return row
@@ -208,6 +177,7 @@ def _handle_checkout_completed(session: dict[str, Any]) -> None:
             'current_period_end': period_end,
         }
     )
+    invalidate_subscription(user_id)
 
 
 def _handle_subscription_updated(subscription: dict[str, Any]) -> None:
@@ -235,6 +205,7 @@ def _handle_subscription_updated(subscription: dict[str, Any]) -> None:
             'current_period_end': period_end,
         }
     )
+    invalidate_subscription(user_id)
 
 
 def _handle_subscription_deleted(subscription: dict[str, Any]) -> None:
@@ -255,6 +226,7 @@ def _handle_subscription_deleted(subscription: dict[str, Any]) -> None:
             'stripe_subscription_id': None,
         }
     )
+    invalidate_subscription(existing.get('user_id'))
 
 
 def _handle_payment_failed(invoice: dict[str, Any]) -> None:
@@ -273,6 +245,7 @@ def _handle_payment_failed(invoice: dict[str, Any]) -> None:
             'status': 'past_due',
         }
     )
+    invalidate_subscription(existing.get('user_id'))
 
 
 @stripe_routes.route('/create-checkout-session', methods=['POST'])
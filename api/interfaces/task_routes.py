@@ -1,22 +1,35 @@
-from datetime import datetime, timezone
+import os
+from datetime import datetime
+from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
 import requests
+from dotenv import load_dotenv
 from flask import Blueprint, jsonify, request
 
-from interfaces.database_routes import (
-    SUPABASE_URL,
-    get_service_headers,
-    get_token_from_header,
-    get_user_from_token,
-)
+from interfaces.database_routes import get_token_from_header, get_user_from_token
+from utils.keyset import decode_cursor, encode_cursor, keyset_params, order_param, paginate_rows, parse_timestamp
+from utils.supabase_client import SUPABASE_URL, supabase, supabase_error_message
+from utils.task_tombstones import SupabaseTombstoneStore, TombstoneError
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
 
 task_routes = Blueprint('task_routes', __name__, url_prefix='/api/tasks')
 
 ALLOWED_STATUSES = {'pending', 'in_progress', 'completed'}
 ALLOWED_PRIORITIES = {'low', 'medium', 'high'}
 TASKS_TABLE = 'tasks'
+TASK_FIELDS = 'id,user_id,title,description,due_date,college_id,college_name,status,priority,created_at,updated_at'
+TASKS_PAGE_SIZE = int(os.getenv('TASKS_PAGE_SIZE', '200'))
+TASKS_MAX_PAGE_SIZE = int(os.getenv('TASKS_MAX_PAGE_SIZE', '1000'))
+# Full lists page in display order; delta syncs page in change order.
+LIST_KEYSET_COLUMNS = ('due_date', 'created_at', 'id')
+DELTA_KEYSET_COLUMNS = ('updated_at', 'id')
+TASK_TOMBSTONE_RETENTION_SECONDS = float(os.getenv('TASK_TOMBSTONE_RETENTION_SECONDS', str(30 * 86400)))
+
+task_tombstones = SupabaseTombstoneStore(supabase, retention_seconds=TASK_TOMBSTONE_RETENTION_SECONDS)
 
 
 def ensure_supabase_config() -> str | None:
@@ -41,10 +54,6 @@ def row_to_task(row: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
 def validate_status(status: str | None) -> str | None:
     if status is None:
         return None
@@ -53,6 +62,24 @@ def validate_status(status: str | None) -> str | None:
     return None
 
 
+def parse_page_size(value: str | None, cursor: str | None) -> int | None:
+    # Raises ValueError. None means no limit: clients that predate paging send
+    # neither limit nor cursor and expect every task.
+    if value in (None, ''):
+        return TASKS_PAGE_SIZE if cursor else None
+    page_size = int(value)
+    if page_size < 1:
+        raise ValueError('limit must be positive')
+    return min(page_size, TASKS_MAX_PAGE_SIZE)
+
+
+def latest_timestamp(*values: str | None) -> str | None:
+    present = [value for value in values if value]
+    if not present:
+        return None
+    return max(present, key=lambda value: datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+
 def validate_priority(priority: str | None) -> str | None:
     if priority is None:
         return None
@@ -77,11 +104,6 @@ def get_authenticated_user_id() -> tuple[str | None, tuple[Any, int] | None]:
     return str(user_id), None
 
 
-def supabase_error_message(response: requests.Response) -> str:
-    payload = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-    return payload.get('message') or payload.get('error') or response.text or f'HTTP {response.status_code}'
-
-
 @task_routes.route('', methods=['GET'])
 def list_tasks():
     config_error = ensure_supabase_config()
@@ -95,30 +117,77 @@ def list_tasks():
     status = request.args.get('status')
     college_id = request.args.get('college_id')
 
-    params = {
-        'user_id': f'eq.{user_id}',
-        'select': 'id,user_id,title,description,due_date,college_id,college_name,status,priority,created_at,updated_at',
-        'order': 'due_date.asc.nullslast,created_at.asc.nullslast',
-    }
+    cursor = request.args.get('cursor')
+    try:
+        page_size = parse_page_size(request.args.get('limit'), cursor)
+    except ValueError:
+        return jsonify({'error': 'limit must be a positive integer.'}), 400
+
+    # updated_since returns only tasks changed after it plus ids deleted
+    # after it. Clients pass the synced_at of their last complete sync; one
+    # older than the tombstone horizon gets a full list (full=true) instead.
+    updated_since = request.args.get('updated_since')
+    if updated_since:
+        updated_since = parse_timestamp(updated_since)
+        if updated_since is None:
+            return jsonify({'error': 'updated_since must be an ISO 8601 timestamp.'}), 400
+        try:
+            horizon = task_tombstones.horizon()
+        except TombstoneError as exc:
+            return jsonify({'error': str(exc)}), 500
+        if latest_timestamp(updated_since, horizon) != updated_since:
+            updated_since = None
+    columns = DELTA_KEYSET_COLUMNS if updated_since else LIST_KEYSET_COLUMNS
+
+    filters: dict[str, Any] = {'user_id': f'eq.{user_id}'}
     if status:
-        params['status'] = f'eq.{status}'
+        filters['status'] = f'eq.{status}'
     if college_id:
-        params['college_id'] = f'eq.{college_id}'
+        filters['college_id'] = f'eq.{college_id}'
+    if updated_since:
+        filters['updated_at'] = f'gt.{updated_since}'
+
+    params = {**filters, 'select': TASK_FIELDS, 'order': order_param(columns)}
+    if page_size is not None:
+        params['limit'] = str(page_size + 1)
+    if cursor:
+        cursor_values = decode_cursor(cursor, columns)
+        if cursor_values is None:
+            return jsonify({'error': 'Invalid cursor.'}), 400
+        params.update(keyset_params(columns, cursor_values))
 
     try:
-        response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/{TASKS_TABLE}',
-            headers=get_service_headers(),
-            params=params,
-            timeout=15,
-        )
+        response = supabase.select(TASKS_TABLE, params)
         if not response.ok:
             return jsonify({'error': f'Failed to load tasks: {supabase_error_message(response)}'}), 500
 
         rows = response.json() if response.content else []
-        return jsonify({'tasks': [row_to_task(row) for row in rows]}), 200
+        # Deletes are reported once, on the first page of a delta sync.
+        deleted = task_tombstones.deleted_since(user_id, updated_since) if updated_since and not cursor else []
     except requests.RequestException as exc:
         return jsonify({'error': f'Unable to reach Supabase: {exc}'}), 500
+    except TombstoneError as exc:
+        return jsonify({'error': str(exc)}), 500
+
+    page: dict[str, Any] = {'has_more': False, 'last': None, 'synced_at': updated_since}
+    tasks = [row_to_task(row) for row in paginate_rows(iter(rows), page_size, page)]
+    synced_at = latest_timestamp(page['synced_at'], *(item['deleted_at'] for item in deleted))
+
+    body = jsonify(
+        {
+            'tasks': tasks,
+            'deleted': deleted,
+            'full': updated_since is None,
+            'next_cursor': encode_cursor(page['last'], columns) if page['has_more'] else None,
+            'synced_at': synced_at,
+            'user_id': user_id,
+        }
+    )
+    # The ETag is a hash of the body, so checking it costs no extra query;
+    # an unchanged list still answers If-None-Match with an empty 304.
+    body.add_etag()
+    body.headers['Cache-Control'] = 'private, no-cache'
+    return body.make_conditional(request)
 
 
 @task_routes.route('', methods=['POST'])
@@ -148,7 +217,8 @@ def create_task():
     if priority_error:
         return jsonify({'error': priority_error}), 400
 
-    timestamp = now_iso()
+    # created_at and updated_at come from the database clock, like the
+    # tombstones' deleted_at, so delta syncs compare like with like.
     task = {
         'id': str(uuid4()),
         'user_id': user_id,
@@ -159,17 +229,10 @@ def create_task():
         'college_name': payload.get('college_name') or None,
         'status': status,
         'priority': priority,
-        'created_at': timestamp,
-        'updated_at': timestamp,
     }
 
     try:
-        response = requests.post(
-            f'{SUPABASE_URL}/rest/v1/{TASKS_TABLE}',
-            headers={**get_service_headers(), 'Prefer': 'return=representation'},
-            json=task,
-            timeout=15,
-        )
+        response = supabase.insert(TASKS_TABLE, task, prefer='return=representation')
         if not response.ok:
             return jsonify({'error': f'Failed to create task: {supabase_error_message(response)}'}), 500
 
@@ -202,16 +265,14 @@ def update_task(task_id: str):
             return jsonify({'error': priority_error}), 400
 
     try:
-        fetch_response = requests.get(
-            f'{SUPABASE_URL}/rest/v1/{TASKS_TABLE}',
-            headers=get_service_headers(),
-            params={
+        fetch_response = supabase.select(
+            TASKS_TABLE,
+            {
                 'id': f'eq.{task_id}',
                 'user_id': f'eq.{user_id}',
-                'select': 'id,user_id,title,description,due_date,college_id,college_name,status,priority,created_at,updated_at',
+                'select': TASK_FIELDS,
                 'limit': '1',
             },
-            timeout=15,
         )
         if not fetch_response.ok:
             return jsonify({'error': f'Failed to load task: {supabase_error_message(fetch_response)}'}), 500
@@ -230,16 +291,13 @@ def update_task(task_id: str):
                 else:
                     target[key] = value
 
-        target['updated_at'] = now_iso()
-
-        update_response = requests.patch(
-            f'{SUPABASE_URL}/rest/v1/{TASKS_TABLE}',
-            headers={**get_service_headers(), 'Prefer': 'return=representation'},
-            params={
+        update_response = supabase.update(
+            TASKS_TABLE,
+            {
                 'id': f'eq.{task_id}',
                 'user_id': f'eq.{user_id}',
             },
-            json={
+            {
                 'title': target['title'],
                 'description': target['description'],
                 'due_date': target['due_date'],
@@ -247,9 +305,8 @@ def update_task(task_id: str):
                 'college_name': target['college_name'],
                 'status': target['status'],
                 'priority': target['priority'],
-                'updated_at': target['updated_at'],
             },
-            timeout=15,
+            prefer='return=representation',
         )
         if not update_response.ok:
             return jsonify({'error': f'Failed to update task: {supabase_error_message(update_response)}'}), 500
@@ -274,14 +331,13 @@ def delete_task(task_id: str):
         return auth_response
 
     try:
-        response = requests.delete(
-            f'{SUPABASE_URL}/rest/v1/{TASKS_TABLE}',
-            headers={**get_service_headers(), 'Prefer': 'return=representation'},
-            params={
+        response = supabase.delete(
+            TASKS_TABLE,
+            {
                 'id': f'eq.{task_id}',
                 'user_id': f'eq.{user_id}',
             },
-            timeout=15,
+            prefer='return=representation',
         )
         if not response.ok:
             return jsonify({'error': f'Failed to delete task: {supabase_error_message(response)}'}), 500
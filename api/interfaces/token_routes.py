@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify
 
 from interfaces.database_routes import get_token_from_header, get_user_from_token
+from utils.token_ledger import LedgerUnavailable
 from utils.token_manager import get_token_status
 
 token_routes = Blueprint('token_routes', __name__, url_prefix='/api/tokens')
@@ -20,4 +21,7 @@ def token_status():
     if not user_id:
         return jsonify({'error': 'Supabase auth payload missing user id.'}), 401
 
-    return jsonify(get_token_status(str(user_id))), 200
+    try:
+        return jsonify(get_token_status(str(user_id))), 200
+    except LedgerUnavailable:
+        return jsonify({'error': 'Unable to load token usage, please try again shortly.'}), 503
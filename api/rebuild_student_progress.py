@@ -0,0 +1,33 @@
+import argparse
+import sys
+
+import requests
+
+from utils.student_progress import rebuild_progress
+from utils.supabase_client import supabase, supabase_error_message
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Recompute student_progress counters from tasks and user_colleges.')
+    parser.add_argument('--user-id', action='append', dest='user_ids', help='Rebuild only this user (repeatable).')
+    args = parser.parse_args()
+
+    if not supabase.is_configured:
+        print('Missing SUPABASE_URL or SUPABASE_SECRET_KEY in api/.env.', file=sys.stderr)
+        return 1
+
+    try:
+        rows = rebuild_progress(args.user_ids)
+    except requests.HTTPError as exc:
+        print(f'Rebuild failed: {supabase_error_message(exc.response)}', file=sys.stderr)
+        return 1
+    except requests.RequestException as exc:
+        print(f'Unable to reach Supabase: {exc}', file=sys.stderr)
+        return 1
+
+    print(f'Rebuilt progress for {len(rows)} students')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
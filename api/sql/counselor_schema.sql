@@ -38,3 +38,10 @@ create table if not exists public.counselor_invites (
   created_at timestamptz default now(),
   updated_at timestamptz default now()
 );
+
+-- Keyset pagination and updated_since delta sync for /api/counselor/tasks
+create index if not exists tasks_user_due_created_id_idx
+  on public.tasks (user_id, due_date, created_at, id);
+
+create index if not exists tasks_user_updated_at_idx
+  on public.tasks (user_id, updated_at);
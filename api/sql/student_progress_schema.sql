@@ -0,0 +1,141 @@
+-- Per-student progress counters read by /api/counselor/students.
+-- Maintained by triggers on tasks and user_colleges, in the same transaction
+-- as the write, whichever API process or client makes it. Students without a
+-- row are seeded on first read; rebuild everyone with
+-- `npm run api:rebuild-progress` (or `select public.rebuild_student_progress();`).
+
+create table if not exists public.student_progress (
+  user_id uuid primary key references auth.users(id) on delete cascade,
+  total_tasks integer not null default 0,
+  completed_tasks integer not null default 0,
+  total_essays integer not null default 0,
+  essays_completed integer not null default 0,
+  colleges_saved integer not null default 0,
+  updated_at timestamptz default now()
+);
+
+-- Recompute counters from tasks and user_colleges. NULL rebuilds every user.
+create or replace function public.rebuild_student_progress(p_user_ids uuid[] default null)
+returns setof public.student_progress
+language sql
+security definer
+set search_path = public
+as $$
+  with ids as (
+    select id as user_id from auth.users
+    where p_user_ids is null or id = any(p_user_ids)
+  ),
+  task_counts as (
+    select
+      user_id,
+      count(*) as total_tasks,
+      count(*) filter (where coalesce(completed, false) or status = 'completed') as completed_tasks,
+      count(*) filter (where category = 'Essay') as total_essays,
+      count(*) filter (
+        where category = 'Essay' and (coalesce(completed, false) or status = 'completed')
+      ) as essays_completed
+    from public.tasks
+    where p_user_ids is null or user_id = any(p_user_ids)
+    group by user_id
+  ),
+  college_counts as (
+    select user_id, count(*) as colleges_saved
+    from public.user_colleges
+    where p_user_ids is null or user_id = any(p_user_ids)
+    group by user_id
+  )
+  insert into public.student_progress as sp (
+    user_id, total_tasks, completed_tasks, total_essays, essays_completed, colleges_saved, updated_at
+  )
+  select
+    ids.user_id,
+    coalesce(t.total_tasks, 0),
+    coalesce(t.completed_tasks, 0),
+    coalesce(t.total_essays, 0),
+    coalesce(t.essays_completed, 0),
+    coalesce(c.colleges_saved, 0),
+    now()
+  from ids
+  left join task_counts t using (user_id)
+  left join college_counts c using (user_id)
+  on conflict (user_id) do update set
+    total_tasks = excluded.total_tasks,
+    completed_tasks = excluded.completed_tasks,
+    total_essays = excluded.total_essays,
+    essays_completed = excluded.essays_completed,
+    colleges_saved = excluded.colleges_saved,
+    updated_at = excluded.updated_at
+  returning sp.*;
+$$;
+
+-- Replaced by the triggers below.
+drop function if exists public.adjust_student_progress(uuid, integer, integer, integer, integer, integer);
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one task's contribution. Rows that
+-- do not exist yet are left alone; seeding counts the task anyway.
+create or replace function public.apply_task_progress(p_task public.tasks, p_sign integer)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  update public.student_progress set
+    total_tasks = greatest(total_tasks + p_sign, 0),
+    completed_tasks = greatest(completed_tasks + p_sign * counts.done, 0),
+    total_essays = greatest(total_essays + p_sign * counts.essay, 0),
+    essays_completed = greatest(essays_completed + p_sign * counts.essay * counts.done, 0),
+    updated_at = now()
+  from (
+    select
+      (coalesce(p_task.completed, false) or coalesce(p_task.status = 'completed', false))::int as done,
+      coalesce(p_task.category = 'Essay', false)::int as essay
+  ) as counts
+  where user_id = p_task.user_id::uuid;
+$$;
+
+create or replace function public.track_task_progress()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    perform public.apply_task_progress(old, -1);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    perform public.apply_task_progress(new, 1);
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists tasks_track_progress on public.tasks;
+create trigger tasks_track_progress
+  after insert or update of user_id, status, completed, category or delete on public.tasks
+  for each row execute function public.track_task_progress();
+
+create or replace function public.track_college_progress()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  if tg_op = 'DELETE' then
+    update public.student_progress
+    set colleges_saved = greatest(colleges_saved - 1, 0), updated_at = now()
+    where user_id = old.user_id::uuid;
+  else
+    update public.student_progress
+    set colleges_saved = colleges_saved + 1, updated_at = now()
+    where user_id = new.user_id::uuid;
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists user_colleges_track_progress on public.user_colleges;
+create trigger user_colleges_track_progress
+  after insert or delete on public.user_colleges
+  for each row execute function public.track_college_progress();
@@ -0,0 +1,69 @@
+-- Delta sync support for GET /api/tasks?updated_since=...: deleted task ids
+-- written by a trigger on every delete from public.tasks (whichever API
+-- process or client made it), and database-set task timestamps.
+-- api/utils/task_tombstones.py prunes tombstones older than
+-- TASK_TOMBSTONE_RETENTION_SECONDS.
+
+create table if not exists public.task_tombstones (
+  user_id uuid not null references auth.users(id) on delete cascade,
+  task_id uuid not null,
+  deleted_at timestamptz not null default now(),
+  primary key (user_id, task_id)
+);
+
+create index if not exists task_tombstones_user_deleted_at_idx
+  on public.task_tombstones (user_id, deleted_at);
+
+-- When tombstones started being recorded: syncs from before then may have
+-- missed deletes and get a full list.
+create table if not exists public.task_tombstones_meta (
+  id boolean primary key default true check (id),
+  started_at timestamptz not null default now()
+);
+
+insert into public.task_tombstones_meta default values on conflict (id) do nothing;
+
+create or replace function public.record_task_tombstone()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  insert into public.task_tombstones (user_id, task_id, deleted_at)
+  values (old.user_id::uuid, old.id::uuid, now())
+  on conflict (user_id, task_id) do update set deleted_at = excluded.deleted_at;
+  return old;
+end;
+$$;
+
+drop trigger if exists tasks_record_tombstone on public.tasks;
+create trigger tasks_record_tombstone
+  after delete on public.tasks
+  for each row execute function public.record_task_tombstone();
+
+-- Task timestamps come from the database clock too, so updated_at and
+-- deleted_at can be compared in one delta sync whichever host wrote them.
+alter table public.tasks alter column created_at set default now();
+alter table public.tasks alter column updated_at set default now();
+
+create or replace function public.touch_task_updated_at()
+returns trigger
+language plpgsql
+set search_path = public
+as $$
+begin
+  if tg_op = 'INSERT' then
+    new.created_at := now();
+  else
+    new.created_at := old.created_at;
+  end if;
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+drop trigger if exists tasks_touch_updated_at on public.tasks;
+create trigger tasks_touch_updated_at
+  before insert or update on public.tasks
+  for each row execute function public.touch_task_updated_at();
@@ -0,0 +1,20 @@
+-- Daily token counters used by api/utils/token_manager.py. Usage is only ever
+-- added in place, so API processes sharing a row never overwrite each other.
+
+create or replace function public.add_user_tokens(
+  p_user_id uuid,
+  p_usage_date date,
+  p_amount integer,
+  p_tokens_limit integer
+)
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  insert into public.user_tokens as ut (user_id, usage_date, tokens_used, tokens_limit)
+  values (p_user_id, p_usage_date, p_amount, p_tokens_limit)
+  on conflict (user_id, usage_date) do update set
+    tokens_used = ut.tokens_used + excluded.tokens_used
+  returning ut.tokens_used;
+$$;
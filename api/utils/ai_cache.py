@@ -0,0 +1,51 @@
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+from utils.response_cache import ResponseCache, SQLiteResponseStore
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+AI_CACHE_TTL_SECONDS = float(os.getenv('AI_CACHE_TTL_SECONDS', str(30 * 86400)))
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', '256'))
+AI_CACHE_DB_PATH = os.getenv(
+    'AI_CACHE_DB_PATH',
+    str(Path(__file__).resolve().parent.parent / 'data' / 'ai_result_cache.db'),
+).strip()
+AI_CACHE_DB_MAX_ENTRIES = int(os.getenv('AI_CACHE_DB_MAX_ENTRIES', '5000'))
+
+# Bump when the shape of cached result bodies changes.
+AI_CACHE_VERSION = 1
+
+
+def build_ai_cache() -> ResponseCache:
+    store = None
+    if AI_CACHE_DB_PATH:
+        try:
+            store = SQLiteResponseStore(AI_CACHE_DB_PATH, max_entries=AI_CACHE_DB_MAX_ENTRIES)
+        except sqlite3.Error:
+            store = None
+    return ResponseCache(fresh_ttl=AI_CACHE_TTL_SECONDS, max_entries=AI_CACHE_MAX_ENTRIES, store=store)
+
+
+ai_result_cache = build_ai_cache()
+
+
+def completion_cache_key(completion_kwargs: dict[str, Any]) -> str:
+    # The kwargs carry everything that shapes the answer: model, temperature,
+    # max_tokens, response_format and the prompt (inputs and rubric weights).
+    material = ResponseCache.make_key({'v': AI_CACHE_VERSION, 'request': completion_kwargs})
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def get_cached_result(completion_kwargs: dict[str, Any]) -> Any | None:
+    return ai_result_cache.get(completion_cache_key(completion_kwargs))
+
+
+def cache_result(completion_kwargs: dict[str, Any], result: Any) -> None:
+    ai_result_cache.set(completion_cache_key(completion_kwargs), result)
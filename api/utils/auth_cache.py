@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+from utils.cache import TTLCache
+from utils.supabase_client import SUPABASE_URL
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET', '').strip()
+SUPABASE_JWKS_URL = os.getenv('SUPABASE_JWKS_URL', '').strip()
+if not SUPABASE_JWKS_URL and SUPABASE_URL:
+    SUPABASE_JWKS_URL = f'{SUPABASE_URL}/auth/v1/.well-known/jwks.json'
+SUPABASE_JWT_AUDIENCE = os.getenv('SUPABASE_JWT_AUDIENCE', 'authenticated').strip()
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv('AUTH_CACHE_TTL_SECONDS', '300'))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv('AUTH_CACHE_MAX_ENTRIES', '4096'))
+
+# Shared by every blueprint through interfaces.database_routes.get_user_from_token.
+_verified_users = TTLCache(max_entries=AUTH_CACHE_MAX_ENTRIES, ttl_seconds=AUTH_CACHE_TTL_SECONDS)
+_jwks_client = None
+
+
+def token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _cache_ttl(expires_at: Any) -> float:
+    try:
+        remaining = float(expires_at) - time.time()
+    except (TypeError, ValueError):
+        return AUTH_CACHE_TTL_SECONDS
+    return min(AUTH_CACHE_TTL_SECONDS, remaining)
+
+
+def get_cached_user(token: str) -> dict[str, Any] | None:
+    return _verified_users.get(token_cache_key(token))
+
+
+def cache_user(token: str, user: dict[str, Any], expires_at: Any = None) -> None:
+    if expires_at is None:
+        expires_at = (read_unverified_claims(token) or {}).get('exp')
+    _verified_users.set(token_cache_key(token), user, ttl_seconds=_cache_ttl(expires_at))
+
+
+def invalidate_token(token: str) -> None:
+    _verified_users.pop(token_cache_key(token))
+
+
+def read_unverified_claims(token: str) -> dict[str, Any] | None:
+    try:
+        payload_segment = token.split('.')[1]
+        padded = payload_segment + '=' * (-len(payload_segment) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (IndexError, ValueError, UnicodeError):
+        return None
+    return claims if isinstance(claims, dict) else None
+
+
+def _get_jwks_client():
+    global _jwks_client
+    if _jwks_client is None and SUPABASE_JWKS_URL:
+        import jwt
+
+        _jwks_client = jwt.PyJWKClient(SUPABASE_JWKS_URL, cache_keys=True)
+    return _jwks_client
+
+
+def verify_token_locally(token: str) -> dict[str, Any] | None:
+    # Returns verified claims, or None when the token cannot be checked locally
+    # (no secret/JWKS configured, PyJWT missing, or an invalid/expired token).
+    try:
+        import jwt
+    except Exception:
+        return None
+
+    try:
+        algorithm = jwt.get_unverified_header(token).get('alg')
+        if algorithm == 'HS256':
+            if not SUPABASE_JWT_SECRET:
+                return None
+            key: Any = SUPABASE_JWT_SECRET
+        else:
+            jwks_client = _get_jwks_client()
+            if not jwks_client:
+                return None
+            key = jwks_client.get_signing_key_from_jwt(token).key
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=SUPABASE_JWT_AUDIENCE or None,
+            options={'require': ['exp', 'sub']},
+        )
+    except Exception:
+        return None
+
+
+def claims_to_user(claims: dict[str, Any]) -> dict[str, Any]:
+    # Mirror the fields of GET /auth/v1/user that the blueprints read.
+    return {
+        'id': claims.get('sub'),
+        'aud': claims.get('aud'),
+        'role': claims.get('role'),
+        'email': claims.get('email'),
+        'phone': claims.get('phone'),
+        'app_metadata': claims.get('app_metadata') or {},
+        'user_metadata': claims.get('user_metadata') or {},
+        'is_anonymous': claims.get('is_anonymous', False),
+    }
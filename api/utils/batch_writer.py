@@ -0,0 +1,152 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedInsertWriter:
+    # Bounded queue drained by one worker thread that bulk-inserts rows.
+    # Batches go out when batch_size rows are waiting or flush_interval has
+    # passed. Rows that cannot be delivered (or do not fit in the queue) are
+    # appended to spill_path as JSON lines and replayed after the next
+    # successful insert.
+    def __init__(
+        self,
+        insert_batch: Callable[[list[dict[str, Any]]], bool],
+        spill_path: str | Path | None = None,
+        max_queue: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        name: str = 'batch-writer',
+    ) -> None:
+        self._insert_batch = insert_batch
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.name = name
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max(1, max_queue))
+        self._spill_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: threading.Thread | None = None
+
+    def submit(self, row: dict[str, Any]) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._spill([row])
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._worker.start()
+        atexit.register(self.close)
+
+    def _next_batch(self) -> list[dict[str, Any]]:
+        batch: list[dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self) -> list[dict[str, Any]]:
+        batch: list[dict[str, Any]] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._deliver(batch)
+        while True:
+            batch = self._drain()
+            if not batch:
+                break
+            self._deliver(batch)
+
+    def _send(self, batch: list[dict[str, Any]]) -> bool:
+        try:
+            return bool(self._insert_batch(batch))
+        except Exception:
+            return False
+
+    def _deliver(self, batch: list[dict[str, Any]]) -> None:
+        if self._send(batch):
+            self._replay_spill()
+        else:
+            self._spill(batch)
+
+    def _spill(self, rows: list[dict[str, Any]]) -> None:
+        if not self.spill_path:
+            return
+        with self._spill_lock:
+            try:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as spill_file:
+                    for row in rows:
+                        spill_file.write(json.dumps(row, separators=(',', ':')) + '\n')
+            except OSError:
+                pass
+
+    def _replay_spill(self) -> None:
+        # Only the worker thread replays; the replay file survives a crash mid-replay.
+        if not self.spill_path:
+            return
+        replay_path = self.spill_path.with_name(f'{self.spill_path.name}.replay')
+        try:
+            with self._spill_lock:
+                if self.spill_path.exists():
+                    with open(self.spill_path, 'r', encoding='utf-8') as spill_file, open(
+                        replay_path, 'a', encoding='utf-8'
+                    ) as replay_file:
+                        replay_file.write(spill_file.read())
+                    os.remove(self.spill_path)
+            if not replay_path.exists():
+                return
+            with open(replay_path, 'r', encoding='utf-8') as replay_file:
+                rows = [json.loads(line) for line in replay_file if line.strip()]
+        except (OSError, ValueError):
+            return
+
+        for start in range(0, len(rows), self.batch_size):
+            if not self._send(rows[start:start + self.batch_size]):
+                try:
+                    with open(replay_path, 'w', encoding='utf-8') as replay_file:
+                        replay_file.writelines(json.dumps(row, separators=(',', ':')) + '\n' for row in rows[start:])
+                except OSError as exc:
+                    # The old file is replayed again in full next time.
+                    logger.warning('%s: could not rewrite %s: %s', self.name, replay_path, exc)
+                return
+        try:
+            os.remove(replay_path)
+        except OSError as exc:
+            logger.warning('%s: could not remove %s: %s', self.name, replay_path, exc)
+
+    def close(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            worker.join(timeout=timeout)
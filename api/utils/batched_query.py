@@ -0,0 +1,92 @@
+import heapq
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+import requests
+from dotenv import load_dotenv
+
+from utils.supabase_client import SupabaseClient, supabase, supabase_error_message
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+# ~100 UUIDs keeps each request URL under 4KB.
+SUPABASE_IN_CHUNK_SIZE = int(os.getenv('SUPABASE_IN_CHUNK_SIZE', '100'))
+SUPABASE_QUERY_WORKERS = int(os.getenv('SUPABASE_QUERY_WORKERS', '8'))
+
+_executor = ThreadPoolExecutor(max_workers=max(1, SUPABASE_QUERY_WORKERS), thread_name_prefix='supabase-in')
+
+
+class SupabaseQueryError(Exception):
+    def __init__(self, response: requests.Response) -> None:
+        super().__init__(supabase_error_message(response))
+        self.response = response
+
+
+def chunk_ids(ids: Iterable[Any], chunk_size: int) -> list[list[str]]:
+    unique = list(dict.fromkeys(str(value) for value in ids if value))
+    size = max(1, chunk_size)
+    return [unique[start:start + size] for start in range(0, len(unique), size)]
+
+
+def _select_chunk(
+    client: SupabaseClient,
+    table: str,
+    column: str,
+    chunk: list[str],
+    params: dict[str, Any],
+    coalesce: bool,
+) -> list[dict[str, Any]]:
+    response = client.select(table, {**params, column: f'in.({",".join(chunk)})'}, coalesce=coalesce)
+    if not response.ok:
+        raise SupabaseQueryError(response)
+    return response.json() if response.content else []
+
+
+def iter_select_in(
+    table: str,
+    column: str,
+    ids: Iterable[Any],
+    params: dict[str, Any],
+    *,
+    sort_key: Callable[[dict[str, Any]], Any] | None = None,
+    chunk_size: int | None = None,
+    client: SupabaseClient | None = None,
+    coalesce: bool = False,
+) -> Iterator[dict[str, Any]]:
+    # Splits `column=in.(...)` across chunks fetched concurrently on a shared,
+    # bounded pool. Rows come back in chunk order; pass sort_key (matching the
+    # server-side `order` param) to merge the per-chunk sorted results instead.
+    # Raises SupabaseQueryError on the first failed chunk.
+    client = client or supabase
+    chunks = chunk_ids(ids, chunk_size or SUPABASE_IN_CHUNK_SIZE)
+    if not chunks:
+        return
+    if len(chunks) == 1:
+        yield from _select_chunk(client, table, column, chunks[0], params, coalesce)
+        return
+
+    futures: list[Future] = [
+        _executor.submit(_select_chunk, client, table, column, chunk, params, coalesce) for chunk in chunks
+    ]
+    try:
+        if sort_key is None:
+            for future in futures:
+                yield from future.result()
+        else:
+            yield from heapq.merge(*(future.result() for future in futures), key=sort_key)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def select_in(
+    table: str,
+    column: str,
+    ids: Iterable[Any],
+    params: dict[str, Any],
+    **kwargs: Any,
+) -> list[dict[str, Any]]:
+    return list(iter_select_in(table, column, ids, params, **kwargs))
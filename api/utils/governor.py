@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+
+class GovernorTimeout(Exception):
+    pass
+
+
+class ConcurrencyGovernor:
+    # Caps in-flight calls to a rate-limited upstream. Callers queue for a slot
+    # until their deadline. A throttled call (429) pauses new calls for the
+    # upstream's retry-after (or an exponential backoff) and halves the
+    # effective limit; each window of clean calls then raises it by one, back
+    # up to max_in_flight.
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        max_queue: int = 64,
+        queue_timeout: float = 30.0,
+        max_attempts: int = 3,
+        min_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        is_throttled: Callable[[Exception], bool] | None = None,
+        retry_after: Callable[[Exception], float | None] | None = None,
+    ) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._is_throttled = is_throttled or (lambda exc: getattr(exc, 'status_code', None) == 429)
+        self._retry_after = retry_after or (lambda exc: None)
+
+        self._condition = threading.Condition()
+        self._limit = self.max_in_flight
+        self._in_flight = 0
+        self._waiting = 0
+        self._paused_until = 0.0
+        self._clean_calls = 0
+        self._consecutive_throttles = 0
+        self._waits: deque[float] = deque(maxlen=512)
+        self._counters = {'acquired': 0, 'throttled': 0, 'timeouts': 0, 'rejected': 0}
+
+    def acquire(self, deadline: float) -> None:
+        with self._condition:
+            if self._waiting >= self.max_queue and not self._can_start(time.monotonic()):
+                self._counters['rejected'] += 1
+                raise GovernorTimeout('Too many requests are already waiting.')
+
+            started = time.monotonic()
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._can_start(now):
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise GovernorTimeout('Timed out waiting for an upstream slot.')
+                    if now < self._paused_until:
+                        remaining = min(remaining, self._paused_until - now)
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            self._in_flight += 1
+            self._counters['acquired'] += 1
+            self._waits.append(time.monotonic() - started)
+
+    def _can_start(self, now: float) -> bool:
+        return self._in_flight < self._limit and now >= self._paused_until
+
+    def release(self, throttled: bool = False, retry_after: float | None = None) -> None:
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            if throttled:
+                self._counters['throttled'] += 1
+                self._consecutive_throttles += 1
+                self._clean_calls = 0
+                self._limit = max(1, self._limit // 2)
+                if retry_after is None:
+                    retry_after = self.min_backoff * (2 ** (self._consecutive_throttles - 1))
+                delay = min(self.max_backoff, max(0.0, retry_after))
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            else:
+                self._consecutive_throttles = 0
+                self._clean_calls += 1
+                if self._limit < self.max_in_flight and self._clean_calls >= self._limit:
+                    self._limit += 1
+                    self._clean_calls = 0
+            self._condition.notify_all()
+
+    def call(self, fn: Callable[[], Any], hold: bool = False) -> Any:
+        # Runs fn in a slot, retrying throttled attempts within the queue
+        # deadline. With hold=True the slot stays taken (e.g. for a stream) and
+        # the caller must release() it.
+        deadline = time.monotonic() + self.queue_timeout
+        for attempt in range(self.max_attempts):
+            self.acquire(deadline)
+            try:
+                result = fn()
+            except Exception as exc:
+                throttled = self._is_throttled(exc)
+                self.release(throttled=throttled, retry_after=self._retry_after(exc) if throttled else None)
+                if not throttled or attempt == self.max_attempts - 1:
+                    raise
+                continue
+            if not hold:
+                self.release()
+            return result
+        raise GovernorTimeout('Upstream kept throttling.')
+
+    def metrics(self) -> dict[str, Any]:
+        with self._condition:
+            waits = sorted(self._waits)
+            now = time.monotonic()
+            return {
+                'in_flight': self._in_flight,
+                'limit': self._limit,
+                'max_in_flight': self.max_in_flight,
+                'waiting': self._waiting,
+                'paused_for_seconds': round(max(0.0, self._paused_until - now), 3),
+                **self._counters,
+                'queue_wait_ms': {
+                    'samples': len(waits),
+                    'avg': round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                    'p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0,
+                    'max': round(waits[-1] * 1000, 1) if waits else 0.0,
+                },
+            }
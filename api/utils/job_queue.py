@@ -0,0 +1,325 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class SQLiteJobStore:
+    # Job rows live on disk so queued work and finished results survive a
+    # restart. Claiming a job is a conditional update, so two processes
+    # sharing the file never run the same job.
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                '''
+                create table if not exists jobs (
+                    id text primary key,
+                    kind text not null,
+                    user_id text,
+                    status text not null,
+                    payload text not null,
+                    charge text,
+                    result text,
+                    error text,
+                    attempts integer not null default 0,
+                    created_at real not null,
+                    updated_at real not null,
+                    finished_at real
+                )
+                '''
+            )
+            self._connection.execute('create index if not exists idx_jobs_status on jobs(status, updated_at)')
+
+    @staticmethod
+    def _decode(row: sqlite3.Row | None) -> dict[str, Any] | None:
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ('payload', 'charge', 'result'):
+            job[field] = json.loads(job[field]) if job[field] is not None else None
+        return job
+
+    def create(self, job_id: str, kind: str, user_id: str | None, payload: Any, charge: Any = None) -> dict[str, Any]:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                '''
+                insert into jobs (id, kind, user_id, status, payload, charge, created_at, updated_at)
+                values (?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                (
+                    job_id,
+                    kind,
+                    user_id,
+                    JOB_QUEUED,
+                    json.dumps(payload, separators=(',', ':')),
+                    json.dumps(charge, separators=(',', ':')) if charge is not None else None,
+                    now,
+                    now,
+                ),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._connection.execute('select * from jobs where id = ?', (job_id,)).fetchone()
+        return self._decode(row)
+
+    def claim(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock, self._connection:
+            claimed = self._connection.execute(
+                '''
+                update jobs set status = ?, attempts = attempts + 1, updated_at = ?
+                where id = ? and status = ?
+                ''',
+                (JOB_RUNNING, time.time(), job_id, JOB_QUEUED),
+            ).rowcount
+        return self.get(job_id) if claimed else None
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: str | None = None) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                '''
+                update jobs set status = ?, result = ?, error = ?, updated_at = ?, finished_at = ?
+                where id = ?
+                ''',
+                (
+                    status,
+                    json.dumps(result, separators=(',', ':')) if result is not None else None,
+                    error,
+                    now,
+                    now,
+                    job_id,
+                ),
+            )
+
+    def heartbeat(self, job_ids: list[str]) -> None:
+        if not job_ids:
+            return
+        with self._lock, self._connection:
+            self._connection.execute(
+                f'update jobs set updated_at = ? where status = ? and id in ({",".join("?" for _ in job_ids)})',
+                (time.time(), JOB_RUNNING, *job_ids),
+            )
+
+    def requeue_stale(self, stale_after: float) -> list[str]:
+        # Running jobs whose owner stopped sending heartbeats for stale_after
+        # seconds belonged to a process that died; put them back in the queue.
+        now = time.time()
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                'select id from jobs where status = ? and updated_at < ? order by created_at',
+                (JOB_RUNNING, now - stale_after),
+            ).fetchall()
+            job_ids = [row['id'] for row in rows]
+            self._connection.executemany(
+                'update jobs set status = ?, updated_at = ? where id = ? and status = ?',
+                [(JOB_QUEUED, now, job_id, JOB_RUNNING) for job_id in job_ids],
+            )
+        return job_ids
+
+    def queued(self) -> list[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                'select id from jobs where status = ? order by created_at',
+                (JOB_QUEUED,),
+            ).fetchall()
+        return [row['id'] for row in rows]
+
+    def delete_finished_before(self, cutoff: float) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                f'delete from jobs where status in ({",".join("?" for _ in FINISHED_STATUSES)}) and finished_at < ?',
+                (*FINISHED_STATUSES, cutoff),
+            )
+
+
+class JobRunner:
+    # Bounded worker pool over a SQLiteJobStore. Handlers are registered per
+    # kind and return (result, billable); on_finish(job, succeeded, billable)
+    # runs once per job after its final status is stored. Jobs left over from a
+    # previous process are picked up when the runner first starts. While a job
+    # runs its row gets a heartbeat every stale_after / 3 seconds, and a
+    # watcher requeues running jobs whose heartbeat stopped (their process
+    # died), so a restart never leaves a job stuck in `running`.
+    def __init__(
+        self,
+        store: SQLiteJobStore,
+        workers: int = 2,
+        max_pending: int = 100,
+        max_attempts: int = 2,
+        retention_seconds: float = 86400,
+        stale_after: float = 60,
+        on_finish: Callable[[dict[str, Any], bool, bool], None] | None = None,
+        name: str = 'jobs',
+    ) -> None:
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.max_attempts = max(1, max_attempts)
+        self.retention_seconds = retention_seconds
+        self.stale_after = stale_after
+        self.name = name
+        self._on_finish = on_finish
+        self._handlers: dict[str, Callable[[Any], tuple[Any, bool]]] = {}
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pruned_at = 0.0
+        self._running: set[str] = set()
+
+    def register(self, kind: str, handler: Callable[[Any], tuple[Any, bool]]) -> None:
+        self._handlers[kind] = handler
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+
+    def _ensure_started(self) -> ThreadPoolExecutor:
+        if self._executor is not None:
+            return self._executor
+        with self._start_lock:
+            if self._executor is not None:
+                return self._executor
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            self._prune()
+            self.store.requeue_stale(self.stale_after)
+            leftover = self.store.queued()
+            self._executor = executor
+            threading.Thread(target=self._watch, name=f'{self.name}-watch', daemon=True).start()
+        for job_id in leftover:
+            self._enqueue(job_id)
+        return executor
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(max(1.0, self.stale_after / 3))
+            try:
+                with self._condition:
+                    running = list(self._running)
+                self.store.heartbeat(running)
+                requeued = self.store.requeue_stale(self.stale_after)
+            except sqlite3.Error:
+                continue
+            for job_id in requeued:
+                self._enqueue(job_id)
+
+    def _prune(self) -> None:
+        self._pruned_at = time.monotonic()
+        try:
+            self.store.delete_finished_before(time.time() - self.retention_seconds)
+        except sqlite3.Error:
+            pass
+
+    def _enqueue(self, job_id: str) -> None:
+        with self._condition:
+            self._pending += 1
+        self._ensure_started().submit(self._run, job_id)
+
+    def submit(
+        self,
+        kind: str,
+        payload: Any,
+        user_id: str | None = None,
+        charge: Any = None,
+        job_id: str | None = None,
+    ) -> dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        self._ensure_started()
+        if time.monotonic() - self._pruned_at > 3600:
+            self._prune()
+        with self._condition:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull('Too many jobs are already queued.')
+        job = self.store.create(job_id or self.new_job_id(), kind, user_id, payload, charge)
+        self._enqueue(job['id'])
+        return job
+
+    def _run(self, job_id: str) -> None:
+        try:
+            job = self.store.claim(job_id)
+            if job is None:
+                return
+            with self._condition:
+                self._running.add(job_id)
+            succeeded = False
+            billable = False
+            try:
+                if job['attempts'] > self.max_attempts:
+                    raise RuntimeError('Job was interrupted too many times.')
+                result, billable = self._handlers[job['kind']](job['payload'])
+            except Exception as exc:
+                self.store.finish(job_id, JOB_FAILED, error=str(exc) or exc.__class__.__name__)
+            else:
+                self.store.finish(job_id, JOB_SUCCEEDED, result=result)
+                succeeded = True
+            if self._on_finish is not None:
+                try:
+                    self._on_finish(job, succeeded, billable)
+                except Exception:
+                    pass
+        finally:
+            with self._condition:
+                self._running.discard(job_id)
+                self._pending = max(0, self._pending - 1)
+                self._condition.notify_all()
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        # Polling after a restart is enough to resume leftover jobs.
+        self._ensure_started()
+        return self.store.get(job_id)
+
+    def wait(self, job_id: str, timeout: float) -> dict[str, Any] | None:
+        # Blocks until the job finishes or timeout passes; returns the latest row.
+        deadline = time.monotonic() + timeout
+        self._ensure_started()
+        while True:
+            job = self.store.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job['status'] in FINISHED_STATUSES or remaining <= 0:
+                return job
+            with self._condition:
+                self._condition.wait(min(remaining, 1.0))
+
+    def pending(self) -> int:
+        with self._condition:
+            return self._pending
+
+
+def job_view(job: dict[str, Any]) -> dict[str, Any]:
+    view = {
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+        'finished_at': job['finished_at'],
+    }
+    if job['status'] == JOB_SUCCEEDED:
+        view['result'] = job['result']
+    elif job['status'] == JOB_FAILED:
+        view['error'] = job['error']
+    return view
@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Sequence
+
+# Keyset pagination helpers for PostgREST. Every column is ordered
+# `asc.nullslast`; the last column must be unique and non-null (usually id).
+
+
+def order_param(columns: Sequence[str]) -> str:
+    return ','.join(f'{column}.asc.nullslast' for column in columns)
+
+
+def sort_key(columns: Sequence[str]) -> Callable[[dict[str, Any]], tuple]:
+    # Python equivalent of order_param, used to merge chunked results.
+    def key(row: dict[str, Any]) -> tuple:
+        parts: list[Any] = []
+        for column in columns:
+            value = row.get(column)
+            parts.append(value is None)
+            parts.append('' if value is None else value)
+        return tuple(parts)
+
+    return key
+
+
+def encode_cursor(row: dict[str, Any], columns: Sequence[str]) -> str:
+    raw = json.dumps([row.get(column) for column in columns], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, columns: Sequence[str]) -> list[Any] | None:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != len(columns):
+        return None
+    if not all(value is None or isinstance(value, (str, int, float)) for value in values):
+        return None
+    if values[-1] is None:
+        return None
+    return values
+
+
+def _quote(value: Any) -> str:
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _after(columns: Sequence[str], values: Sequence[Any]) -> str:
+    column, value = columns[0], values[0]
+    rest_columns, rest_values = columns[1:], values[1:]
+    if value is None:
+        # Only other NULLs sort after a NULL under nullslast.
+        return f'and({column}.is.null,{_after(rest_columns, rest_values)})'
+    if not rest_columns:
+        return f'{column}.gt.{_quote(value)}'
+    return (
+        f'or({column}.gt.{_quote(value)},{column}.is.null,'
+        f'and({column}.eq.{_quote(value)},{_after(rest_columns, rest_values)}))'
+    )
+
+
+def keyset_params(columns: Sequence[str], values: Sequence[Any]) -> dict[str, str]:
+    # PostgREST filter selecting rows strictly after `values` in order_param(columns).
+    if len(columns) == 1:
+        return {columns[0]: f'gt.{values[0]}'}
+    operator, _, body = _after(columns, values).partition('(')
+    return {operator: f'({body}'}
+
+
+def parse_timestamp(value: str) -> str | None:
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.isoformat()
+
+
+def paginate_rows(rows: Iterator[dict[str, Any]], page_size: int | None, page: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    # Yields at most page_size rows (all of them for None); callers fetch
+    # page_size + 1 so the extra row tells us whether another page exists.
+    for index, row in enumerate(rows):
+        if index == page_size:
+            page['has_more'] = True
+            return
+        page['last'] = row
+        updated_at = row.get('updated_at')
+        if updated_at and (page['synced_at'] is None or str(updated_at) > page['synced_at']):
+            page['synced_at'] = str(updated_at)
+        yield row
@@ -0,0 +1,163 @@
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+# Inputs up to AI_INPUT_MAX_TOKENS go out as one prompt. Longer ones are split
+# into at most AI_MAX_SECTIONS sections (of at least AI_SECTION_TOKENS each),
+# so map-reduce is always one concurrent round plus one merge call.
+AI_INPUT_MAX_TOKENS = int(os.getenv('AI_INPUT_MAX_TOKENS', '3000'))
+AI_SECTION_TOKENS = int(os.getenv('AI_SECTION_TOKENS', '1500'))
+AI_MAX_SECTIONS = int(os.getenv('AI_MAX_SECTIONS', '8'))
+# Lines at the top and bottom of each PDF page checked for headers/footers.
+PAGE_EDGE_LINES = 2
+
+_PAGE_NUMBER = re.compile(r'^\s*(page\s*)?\d+(\s*(of|/)\s*\d+)?\s*$', re.IGNORECASE)
+_INVISIBLE = re.compile('[\u00ad\u200b\u200c\u200d\u2060\ufeff]')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    # tiktoken is optional; without it we fall back to a ~4 chars/token estimate.
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('o200k_base')
+
+
+def count_tokens(text: str, model: str = 'gpt-4o-mini') -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _clean_line(line: str) -> str:
+    return re.sub(r'[ \t\v]+', ' ', _INVISIBLE.sub('', line)).strip()
+
+
+def _is_page_number(line: str, page_count: int) -> bool:
+    match = _PAGE_NUMBER.match(line)
+    if not match:
+        return False
+    # A bare number (a year, a count) only passes for a plausible page number.
+    return bool(match.group(1) or match.group(3)) or int(line) <= page_count
+
+
+def _page_edges(page: list[str]) -> set[int]:
+    # Indexes of the first and last PAGE_EDGE_LINES non-empty lines.
+    filled = [index for index, line in enumerate(page) if line]
+    return set(filled[:PAGE_EDGE_LINES] + filled[-PAGE_EDGE_LINES:])
+
+
+def clean_text(text: str) -> str:
+    # Drops invisible characters and runs of whitespace. Extracted PDFs mark
+    # page breaks with form feeds; only there are page numbers and running
+    # headers/footers (the same edge line on several pages) removed, so
+    # pasted text keeps every line it was given.
+    pages = [[_clean_line(line) for line in page.splitlines()] for page in text.split('\f')]
+
+    drop: set[tuple[int, int]] = set()
+    if len(pages) > 1:
+        edges = [_page_edges(page) for page in pages]
+        repeated = Counter(
+            line
+            for page, page_edges in zip(pages, edges)
+            for line in {page[index] for index in page_edges}
+            if len(line) <= 80
+        )
+        threshold = min(3, len(pages))
+        for number, (page, page_edges) in enumerate(zip(pages, edges)):
+            for index in page_edges:
+                if repeated[page[index]] >= threshold or _is_page_number(page[index], len(pages)):
+                    drop.add((number, index))
+
+    kept: list[str] = []
+    for number, page in enumerate(pages):
+        if number and kept and kept[-1]:
+            kept.append('')
+        for index, line in enumerate(page):
+            if (number, index) in drop:
+                continue
+            if not line and (not kept or not kept[-1]):
+                continue
+            kept.append(line)
+    return '\n'.join(kept).strip()
+
+
+def _split_oversized(paragraph: str, max_tokens: int, model: str) -> list[str]:
+    pieces: list[str] = []
+    current = ''
+    for sentence in _SENTENCE_END.split(paragraph):
+        while count_tokens(sentence, model) > max_tokens:
+            # A run-on "sentence": cut at a word boundary near the budget, or
+            # mid-word when there is none.
+            cut = sentence.rfind(' ', 0, max_tokens * 4)
+            if cut <= 0:
+                cut = max_tokens * 4
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        candidate = f'{current} {sentence}'.strip()
+        if current and count_tokens(candidate, model) > max_tokens:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_sections(text: str, model: str = 'gpt-4o-mini') -> list[str]:
+    # Packs paragraphs greedily into sections. The section size grows with the
+    # input so the number of sections never exceeds AI_MAX_SECTIONS.
+    total = count_tokens(text, model)
+    max_tokens = max(AI_SECTION_TOKENS, math.ceil(total / max(1, AI_MAX_SECTIONS)))
+
+    paragraphs: list[str] = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph, model) > max_tokens:
+            paragraphs.extend(_split_oversized(paragraph, max_tokens, model))
+        else:
+            paragraphs.append(paragraph)
+
+    sections: list[str] = []
+    current = ''
+    for paragraph in paragraphs:
+        candidate = f'{current}\n\n{paragraph}' if current else paragraph
+        if current and count_tokens(candidate, model) > max_tokens:
+            sections.append(current)
+            current = paragraph
+        else:
+            current = candidate
+    if current:
+        sections.append(current)
+
+    while len(sections) > AI_MAX_SECTIONS:
+        # Rounding can leave one section too many; fold the two smallest
+        # neighbours together.
+        index = min(range(len(sections) - 1), key=lambda i: len(sections[i]) + len(sections[i + 1]))
+        sections[index:index + 2] = [f'{sections[index]}\n\n{sections[index + 1]}']
+    return sections
+
+
+def needs_sections(text: str, model: str = 'gpt-4o-mini') -> bool:
+    return count_tokens(text, model) > AI_INPUT_MAX_TOKENS
@@ -0,0 +1,77 @@
+import os
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from openai import OpenAI, RateLimitError
+
+from utils.governor import ConcurrencyGovernor
+from utils.single_flight import SingleFlight
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+OPENAI_MAX_IN_FLIGHT = int(os.getenv('OPENAI_MAX_IN_FLIGHT', '8'))
+OPENAI_MAX_QUEUE = int(os.getenv('OPENAI_MAX_QUEUE', '64'))
+OPENAI_QUEUE_TIMEOUT_SECONDS = float(os.getenv('OPENAI_QUEUE_TIMEOUT_SECONDS', '30'))
+OPENAI_MAX_ATTEMPTS = int(os.getenv('OPENAI_MAX_ATTEMPTS', '3'))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv('OPENAI_TIMEOUT_SECONDS', '60'))
+OPENAI_SHARED_CALL_TIMEOUT_SECONDS = float(os.getenv('OPENAI_SHARED_CALL_TIMEOUT_SECONDS', '120'))
+
+_client: OpenAI | None = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    # One client (and connection pool) per process. SDK retries are off:
+    # 429s are retried by the governor so backoff is shared across requests.
+    global _client
+    if not OPENAI_API_KEY:
+        raise ValueError('Missing OPENAI_API_KEY in api/.env')
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0, timeout=OPENAI_TIMEOUT_SECONDS)
+    return _client
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    return isinstance(exc, RateLimitError) or getattr(exc, 'status_code', None) == 429
+
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+openai_governor = ConcurrencyGovernor(
+    max_in_flight=OPENAI_MAX_IN_FLIGHT,
+    max_queue=OPENAI_MAX_QUEUE,
+    queue_timeout=OPENAI_QUEUE_TIMEOUT_SECONDS,
+    max_attempts=OPENAI_MAX_ATTEMPTS,
+    is_throttled=is_rate_limited,
+    retry_after=retry_after_seconds,
+)
+
+# Identical completions requested at the same time share one upstream call.
+openai_flight = SingleFlight(timeout=OPENAI_SHARED_CALL_TIMEOUT_SECONDS)
@@ -0,0 +1,172 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from utils.cache import TTLCache
+from utils.single_flight import SingleFlight
+
+
+class SQLiteResponseStore:
+    # On-disk tier: survives restarts and is shared by every worker process on the host.
+    def __init__(self, path: str | Path, max_entries: int = 10000) -> None:
+        self.path = Path(path)
+        self.max_entries = max(1, int(max_entries))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                '''
+                create table if not exists response_cache (
+                    cache_key text primary key,
+                    stored_at real not null,
+                    payload text not null
+                )
+                '''
+            )
+            self._connection.execute(
+                'create index if not exists idx_response_cache_stored_at on response_cache(stored_at)'
+            )
+
+    def get(self, key: str) -> tuple[float, Any] | None:
+        with self._lock:
+            row = self._connection.execute(
+                'select stored_at, payload from response_cache where cache_key = ?',
+                (key,),
+            ).fetchone()
+        if not row:
+            return None
+        return float(row[0]), json.loads(row[1])
+
+    def set(self, key: str, stored_at: float, value: Any) -> None:
+        payload = json.dumps(value, separators=(',', ':'))
+        with self._lock, self._connection:
+            self._connection.execute(
+                'insert or replace into response_cache (cache_key, stored_at, payload) values (?, ?, ?)',
+                (key, stored_at, payload),
+            )
+            self._connection.execute(
+                '''
+                delete from response_cache where cache_key in (
+                    select cache_key from response_cache order by stored_at desc limit -1 offset ?
+                )
+                ''',
+                (self.max_entries,),
+            )
+
+    def delete_older_than(self, cutoff: float) -> None:
+        with self._lock, self._connection:
+            self._connection.execute('delete from response_cache where stored_at < ?', (cutoff,))
+
+
+class ResponseCache:
+    # Two-tier (memory LRU + optional SQLite) cache with stale-while-revalidate.
+    # Entries younger than fresh_ttl are served as-is; entries inside the stale
+    # window are served immediately while one background refresh runs per key.
+    # Concurrent misses for the same key share one fetch.
+    def __init__(
+        self,
+        fresh_ttl: float,
+        stale_ttl: float = 0,
+        max_entries: int = 512,
+        store: SQLiteResponseStore | None = None,
+        refresh_workers: int = 2,
+        fetch_timeout: float | None = None,
+    ) -> None:
+        self.fresh_ttl = float(fresh_ttl)
+        self.stale_ttl = max(0.0, float(stale_ttl))
+        self.store = store
+        self._memory = TTLCache(max_entries=max_entries, ttl_seconds=self.fresh_ttl + self.stale_ttl)
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._flight = SingleFlight(timeout=fetch_timeout)
+        self._refresh_pool = ThreadPoolExecutor(max_workers=max(1, refresh_workers), thread_name_prefix='cache-refresh')
+        if self.store is not None:
+            try:
+                self.store.delete_older_than(time.time() - self.fresh_ttl - self.stale_ttl)
+            except sqlite3.Error:
+                pass
+
+    @staticmethod
+    def make_key(parts: Any) -> str:
+        return json.dumps(parts, separators=(',', ':'), sort_keys=True, default=str)
+
+    def _lookup(self, key: str) -> tuple[float, Any] | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            return entry
+        if self.store is None:
+            return None
+        try:
+            entry = self.store.get(key)
+        except sqlite3.Error:
+            return None
+        if entry is None:
+            return None
+        remaining = entry[0] + self.fresh_ttl + self.stale_ttl - time.time()
+        if remaining <= 0:
+            return None
+        self._memory.set(key, entry, ttl_seconds=remaining)
+        return entry
+
+    def _store(self, key: str, value: Any) -> None:
+        entry = (time.time(), value)
+        self._memory.set(key, entry)
+        if self.store is not None:
+            try:
+                self.store.set(key, entry[0], value)
+            except sqlite3.Error:
+                pass
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]) -> None:
+        try:
+            self._store(key, fetch())
+        except Exception:
+            # Keep serving the stale copy; the next stale hit retries.
+            pass
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], Any]) -> None:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresh_pool.submit(self._refresh, key, fetch)
+
+    def get(self, key: str) -> Any | None:
+        # Fresh or stale value without scheduling a refresh.
+        entry = self._lookup(key)
+        if entry is None or time.time() - entry[0] >= self.fresh_ttl + self.stale_ttl:
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        self._store(key, value)
+
+    def _fetch_and_store(self, key: str, fetch: Callable[[], Any]) -> Any:
+        value = fetch()
+        self._store(key, value)
+        return value
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> tuple[Any, str]:
+        # Returns (value, cache_status) where cache_status is HIT, STALE, MISS,
+        # or SHARED when the value came from another caller's in-flight fetch.
+        entry = self._lookup(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if age < self.fresh_ttl:
+                return value, 'HIT'
+            if age < self.fresh_ttl + self.stale_ttl:
+                self._schedule_refresh(key, fetch)
+                return value, 'STALE'
+
+        value, shared = self._flight.do(key, lambda: self._fetch_and_store(key, fetch))
+        return value, 'SHARED' if shared else 'MISS'
@@ -0,0 +1,34 @@
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from utils.cache import TTLCache
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+ROLE_CACHE_TTL_SECONDS = float(os.getenv('ROLE_CACHE_TTL_SECONDS', '60'))
+ROLE_CACHE_MAX_ENTRIES = int(os.getenv('ROLE_CACHE_MAX_ENTRIES', '4096'))
+
+# user_profiles.role by user id. Only roles that are set are cached: roles are
+# granted outside the API, so a missing one is re-read each time and a newly
+# promoted counselor gets access on their next request.
+_roles = TTLCache(max_entries=ROLE_CACHE_MAX_ENTRIES, ttl_seconds=ROLE_CACHE_TTL_SECONDS)
+
+
+def get_cached_role(user_id: str) -> str | None:
+    return _roles.get(user_id)
+
+
+def cache_role(user_id: str, role: str | None) -> None:
+    if role:
+        _roles.set(user_id, role)
+
+
+def invalidate_role(user_id: str) -> None:
+    _roles.pop(user_id)
+
+
+def clear_roles() -> None:
+    _roles.clear()
@@ -0,0 +1,265 @@
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# Field weights for BM25F-style term frequencies.
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'tags': 2.0,
+    'provider': 1.5,
+    'description': 1.0,
+    'eligibility': 1.0,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# A query token that is a prefix of indexed terms expands to at most this many.
+MAX_PREFIX_EXPANSIONS = 32
+# Postings are stored highest-impact first. A query first scores at most this
+# many postings in total (split across its tokens and prefix expansions), so
+# query time stays flat as the catalog grows; the long tail of very common
+# terms carries little weight anyway. Queries whose filters or offset need
+# more candidates than that fall back to scoring every posting.
+MAX_SCORED_POSTINGS = 2000
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def load_catalog(path: str | Path) -> list[dict[str, Any]]:
+    # A JSON array, or JSON lines when the file ends in .jsonl.
+    path = Path(path)
+    with path.open('r', encoding='utf-8') as file:
+        if path.suffix == '.jsonl':
+            return [json.loads(line) for line in file if line.strip()]
+        return json.load(file)
+
+
+def to_number(value: Any) -> float | None:
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ScholarshipIndex:
+    # Inverted index over a scholarship catalog. Each posting carries the
+    # document's precomputed BM25 impact for that term, so a query is a sum
+    # over postings with no per-query length normalisation. State, amount and
+    # deadline filters run against per-document arrays.
+    def __init__(self, records: Iterable[dict[str, Any]]) -> None:
+        self.records = [record for record in records if record.get('id') and record.get('name')]
+        self._national: list[int] = []
+        self._by_state: dict[str, list[int]] = defaultdict(list)
+        self._states: list[frozenset[str]] = []
+        self._amount_min: list[float | None] = []
+        self._amount_max: list[float | None] = []
+        self._deadline: list[str | None] = []
+
+        term_freqs: list[dict[str, float]] = []
+        lengths: list[float] = []
+        for doc_id, record in enumerate(self.records):
+            freqs: dict[str, float] = defaultdict(float)
+            for field, weight in FIELD_WEIGHTS.items():
+                value = record.get(field) or ''
+                text = ' '.join(value) if isinstance(value, list) else str(value)
+                for token in tokenize(text):
+                    freqs[token] += weight
+            term_freqs.append(freqs)
+            lengths.append(sum(freqs.values()))
+
+            states = frozenset(str(state).upper() for state in record.get('states') or [])
+            self._states.append(states)
+            if states:
+                for state in states:
+                    self._by_state[state].append(doc_id)
+            else:
+                self._national.append(doc_id)
+            self._amount_min.append(to_number(record.get('amount_min')))
+            self._amount_max.append(to_number(record.get('amount_max')))
+            self._deadline.append(record.get('deadline_date') or None)
+
+        count = len(self.records)
+        average_length = (sum(lengths) / count) if count else 1.0
+        document_frequency: dict[str, int] = defaultdict(int)
+        for freqs in term_freqs:
+            for term in freqs:
+                document_frequency[term] += 1
+
+        postings: dict[str, list[tuple[float, int]]] = defaultdict(list)
+        for doc_id, freqs in enumerate(term_freqs):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / average_length)
+            for term, tf in freqs.items():
+                idf = math.log(1 + (count - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                postings[term].append((-idf * tf * (BM25_K1 + 1) / (tf + norm), doc_id))
+
+        # term -> (doc ids, impacts), highest impact first.
+        self._postings: dict[str, tuple[tuple[int, ...], tuple[float, ...]]] = {}
+        for term, entries in postings.items():
+            entries.sort()
+            self._postings[term] = (
+                tuple(doc_id for _, doc_id in entries),
+                tuple(-impact for impact, _ in entries),
+            )
+        self._vocabulary = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _expand(self, token: str, prefix: bool) -> list[str]:
+        if not prefix:
+            return [token] if token in self._postings else []
+        start = bisect.bisect_left(self._vocabulary, token)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def _matches(
+        self,
+        doc_id: int,
+        min_amount: float | None,
+        max_amount: float | None,
+        deadline_after: str | None,
+        deadline_before: str | None,
+    ) -> bool:
+        if min_amount is not None:
+            amount = self._amount_max[doc_id]
+            if amount is None or amount < min_amount:
+                return False
+        if max_amount is not None:
+            amount = self._amount_min[doc_id] if self._amount_min[doc_id] is not None else self._amount_max[doc_id]
+            if amount is None or amount > max_amount:
+                return False
+        deadline = self._deadline[doc_id]
+        # Rolling / "varies" deadlines (no date) have not passed, but cannot be
+        # promised to fall before a date.
+        if deadline_after and deadline is not None and deadline < deadline_after:
+            return False
+        if deadline_before and (deadline is None or deadline > deadline_before):
+            return False
+        return True
+
+    def _score(self, tokens: list[str], exhaustive: bool = False) -> tuple[dict[int, float], bool]:
+        # Returns (scores, truncated); truncated means postings were left out.
+        expansions = [
+            self._expand(token, prefix=position == len(tokens) - 1) for position, token in enumerate(tokens)
+        ]
+        depth = None if exhaustive else max(50, MAX_SCORED_POSTINGS // max(1, sum(len(terms) for terms in expansions)))
+        truncated = False
+
+        scores: dict[int, float] = {}
+        for terms in expansions:
+            if depth is not None:
+                truncated = truncated or any(len(self._postings[term][0]) > depth for term in terms)
+            if len(terms) == 1:
+                ids, impacts = self._postings[terms[0]]
+                best = dict(zip(ids[:depth], impacts[:depth]))
+            else:
+                # A prefix counts once per document, with its best expansion.
+                best = {}
+                for term in terms:
+                    ids, impacts = self._postings[term]
+                    for doc_id, impact in zip(ids[:depth], impacts[:depth]):
+                        if impact > best.get(doc_id, 0.0):
+                            best[doc_id] = impact
+            if not scores:
+                scores = best
+                continue
+            for doc_id, impact in best.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + impact
+        return scores, truncated
+
+    def _allowed(self, doc_id: int, state: str | None) -> bool:
+        return not state or not self._states[doc_id] or state in self._states[doc_id]
+
+    def _state_docs(self, state: str | None) -> Iterator[int]:
+        if not state:
+            return iter(range(len(self.records)))
+        return heapq.merge(self._national, self._by_state.get(state, []))
+
+    def _ranked(self, scores: dict[int, float], state: str | None, filters: tuple, wanted: int) -> list[int]:
+        page = []
+        # Filters only run until the page is full.
+        for doc_id in sorted(scores, key=scores.__getitem__, reverse=True):
+            if self._allowed(doc_id, state) and self._matches(doc_id, *filters):
+                page.append(doc_id)
+                if len(page) >= wanted:
+                    break
+        return page
+
+    def search(
+        self,
+        query: str = '',
+        *,
+        state: str | None = None,
+        min_amount: float | None = None,
+        max_amount: float | None = None,
+        deadline_after: str | None = None,
+        deadline_before: str | None = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        # Returns (page, has_more). Without a query, matches come back in
+        # catalog order; with one, by BM25 score (all tokens are optional, the
+        # last one also matches as a prefix for search-as-you-type).
+        state = state.upper() if state else None
+        wanted = offset + limit + 1
+        filters = (min_amount, max_amount, deadline_after, deadline_before)
+        tokens = tokenize(query)
+
+        if not tokens:
+            page: list[int] = []
+            for doc_id in self._state_docs(state):
+                if self._matches(doc_id, *filters):
+                    page.append(doc_id)
+                    if len(page) >= wanted:
+                        break
+        else:
+            tokens = list(dict.fromkeys(tokens))
+            scores, truncated = self._score(tokens)
+            page = self._ranked(scores, state, filters, wanted)
+            if truncated and len(page) < wanted:
+                # The cut-off postings may hold the rest of this page (or
+                # the next one); score everything rather than stop short.
+                scores, _ = self._score(tokens, exhaustive=True)
+                page = self._ranked(scores, state, filters, wanted)
+
+        has_more = len(page) > offset + limit
+        return [self.records[doc_id] for doc_id in page[offset:offset + limit]], has_more
+
+
+class CatalogIndex:
+    # Rebuilds the index when the catalog file changes on disk.
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._index: ScholarshipIndex | None = None
+        self._mtime: float | None = None
+
+    def get(self) -> ScholarshipIndex:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if self._index is not None and mtime == self._mtime:
+            return self._index
+        with self._lock:
+            if self._index is None or mtime != self._mtime:
+                records = load_catalog(self.path) if mtime is not None else []
+                self._index = ScholarshipIndex(records)
+                self._mtime = mtime
+            return self._index
@@ -0,0 +1,258 @@
+import bisect
+import hashlib
+import json
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable
+
+from dotenv import load_dotenv
+
+from utils.cache import TTLCache
+from utils.scholarship_index import CatalogIndex, ScholarshipIndex, to_number
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+SCHOLARSHIP_MATCH_LIMIT = int(os.getenv('SCHOLARSHIP_MATCH_LIMIT', '200'))
+SCHOLARSHIP_MATCH_CACHE_MAX_ENTRIES = int(os.getenv('SCHOLARSHIP_MATCH_CACHE_MAX_ENTRIES', '4096'))
+SCHOLARSHIP_MATCH_CACHE_TTL_SECONDS = float(os.getenv('SCHOLARSHIP_MATCH_CACHE_TTL_SECONDS', '86400'))
+
+# user_profiles columns read by the matcher; state and financial_need are used
+# when the table has them.
+PROFILE_FIELDS = ('gpa', 'sat_score', 'act_score', 'graduation_year', 'state', 'financial_need')
+
+# Catalog rule -> profile field for minimum-score rules.
+THRESHOLD_RULES = {
+    'min_gpa': 'gpa',
+    'min_sat': 'sat_score',
+    'min_act': 'act_score',
+}
+
+
+def _to_year(value: Any) -> int | None:
+    number = to_number(value)
+    return int(number) if number is not None else None
+
+
+def profile_fingerprint(profile: dict[str, Any]) -> str:
+    # Only the fields that affect eligibility; edits to anything else keep the
+    # cached matches.
+    relevant = {field: profile.get(field) for field in PROFILE_FIELDS}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _mask(positions: Iterable[int], size: int) -> int:
+    # Setting bits one at a time on an int copies it every time.
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class _Threshold:
+    # Scholarships requiring at most a given score, as prefix bitmasks over the
+    # sorted distinct thresholds.
+    def __init__(self, free: int, requirements: dict[float, int]) -> None:
+        self.free = free
+        self.values = sorted(requirements)
+        self.prefix: list[int] = []
+        mask = 0
+        for value in self.values:
+            mask |= requirements[value]
+            self.prefix.append(mask)
+
+    def eligible(self, score: float | None, everything: int) -> int:
+        # A missing score does not rule anything out.
+        if score is None:
+            return everything
+        position = bisect.bisect_right(self.values, score) - 1
+        return self.free | self.prefix[position] if position >= 0 else self.free
+
+
+class ScholarshipMatcher:
+    # Eligibility rules compiled into bitmasks, one bit per scholarship. Bits
+    # are assigned in rank order (targeted scholarships first, then larger
+    # awards, then earlier deadlines), so a student's matches are the AND of a
+    # few precomputed masks read from the lowest bit up.
+    #
+    # Optional rules on catalog records: min_gpa, min_sat, min_act,
+    # graduation_years (list) and need_based, plus the existing states list.
+    def __init__(self, index: ScholarshipIndex) -> None:
+        self.index = index
+        records = index.records
+
+        def rule_count(doc_id: int) -> int:
+            record = records[doc_id]
+            rules = sum(1 for rule in THRESHOLD_RULES if to_number(record.get(rule)) is not None)
+            return rules + bool(record.get('graduation_years')) + bool(record.get('need_based')) + bool(record.get('states'))
+
+        self._order = sorted(
+            range(len(records)),
+            key=lambda doc_id: (
+                -rule_count(doc_id),
+                -(to_number(records[doc_id].get('amount_max')) or 0),
+                records[doc_id].get('deadline_date') or '9999-12-31',
+                doc_id,
+            ),
+        )
+        self.everything = (1 << len(records)) - 1
+
+        free: dict[str, list[int]] = {rule: [] for rule in THRESHOLD_RULES}
+        requirements: dict[str, dict[float, list[int]]] = {rule: {} for rule in THRESHOLD_RULES}
+        years_free: list[int] = []
+        by_year: dict[int, list[int]] = {}
+        need_free: list[int] = []
+        national: list[int] = []
+        by_state: dict[str, list[int]] = {}
+        deadlines: dict[str, list[int]] = {}
+
+        for position, doc_id in enumerate(self._order):
+            record = records[doc_id]
+            for rule in THRESHOLD_RULES:
+                value = to_number(record.get(rule))
+                if value is None:
+                    free[rule].append(position)
+                else:
+                    requirements[rule].setdefault(value, []).append(position)
+
+            years = {_to_year(year) for year in record.get('graduation_years') or []} - {None}
+            if years:
+                for year in years:
+                    by_year.setdefault(year, []).append(position)
+            else:
+                years_free.append(position)
+
+            if not record.get('need_based'):
+                need_free.append(position)
+
+            states = {str(state).upper() for state in record.get('states') or []}
+            if states:
+                for state in states:
+                    by_state.setdefault(state, []).append(position)
+            else:
+                national.append(position)
+
+            if record.get('deadline_date'):
+                deadlines.setdefault(str(record['deadline_date']), []).append(position)
+
+        size = len(records)
+        self._thresholds = {
+            rule: _Threshold(
+                _mask(free[rule], size),
+                {value: _mask(positions, size) for value, positions in requirements[rule].items()},
+            )
+            for rule in THRESHOLD_RULES
+        }
+        self._years_free = _mask(years_free, size)
+        self._by_year = {year: _mask(positions, size) for year, positions in by_year.items()}
+        self._need_free = _mask(need_free, size)
+        self._national = _mask(national, size)
+        self._by_state = {state: _mask(positions, size) for state, positions in by_state.items()}
+
+        # Scholarships whose deadline is on or before each distinct date.
+        self._deadline_values = sorted(deadlines)
+        self._deadline_prefix: list[int] = []
+        passed = 0
+        for deadline in self._deadline_values:
+            passed |= _mask(deadlines[deadline], size)
+            self._deadline_prefix.append(passed)
+
+    def _open(self, today: str) -> int:
+        position = bisect.bisect_left(self._deadline_values, today) - 1
+        return self.everything ^ self._deadline_prefix[position] if position >= 0 else self.everything
+
+    def eligible_mask(self, profile: dict[str, Any], today: str) -> int:
+        mask = self._open(today)
+        for rule, field in THRESHOLD_RULES.items():
+            mask &= self._thresholds[rule].eligible(to_number(profile.get(field)), self.everything)
+
+        year = _to_year(profile.get('graduation_year'))
+        if year is not None:
+            mask &= self._years_free | self._by_year.get(year, 0)
+
+        need = profile.get('financial_need')
+        if need is not None and not need:
+            mask &= self._need_free
+
+        state = str(profile.get('state') or '').strip().upper()
+        if state:
+            mask &= self._national | self._by_state.get(state, 0)
+        return mask
+
+    def ranked(self, mask: int, limit: int, offset: int = 0) -> list[int]:
+        # Walks the mask a byte at a time, so skipping to a deep offset only
+        # counts bits.
+        doc_ids: list[int] = []
+        skip = offset
+        for byte_index, byte in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, 'little')):
+            if not byte:
+                continue
+            if skip >= byte.bit_count():
+                skip -= byte.bit_count()
+                continue
+            for bit in range(8):
+                if byte >> bit & 1:
+                    if skip:
+                        skip -= 1
+                        continue
+                    doc_ids.append(self._order[byte_index * 8 + bit])
+                    if len(doc_ids) >= limit:
+                        return doc_ids
+        return doc_ids
+
+    def match_many(self, profiles: Iterable[dict[str, Any]], limit: int, today: str | None = None) -> list[tuple[list[int], int]]:
+        # (ranked doc ids, total eligible) per profile; identical profiles are
+        # evaluated once.
+        today = today or date.today().isoformat()
+        seen: dict[str, tuple[list[int], int]] = {}
+        results = []
+        for profile in profiles:
+            fingerprint = profile_fingerprint(profile)
+            if fingerprint not in seen:
+                mask = self.eligible_mask(profile, today)
+                seen[fingerprint] = (self.ranked(mask, limit), mask.bit_count())
+            results.append(seen[fingerprint])
+        return results
+
+
+class ProfileMatches:
+    # The first `limit` ranked matches and the total per distinct profile,
+    # cached until the relevant profile fields, the catalog or the date
+    # change. Pages past the cached prefix are ranked from a fresh mask.
+    def __init__(self, catalog: CatalogIndex, limit: int = SCHOLARSHIP_MATCH_LIMIT) -> None:
+        self.catalog = catalog
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._matcher: ScholarshipMatcher | None = None
+        self._generation = 0
+        self._cache = TTLCache(
+            max_entries=SCHOLARSHIP_MATCH_CACHE_MAX_ENTRIES,
+            ttl_seconds=SCHOLARSHIP_MATCH_CACHE_TTL_SECONDS,
+        )
+
+    def _current(self) -> tuple[ScholarshipMatcher, int]:
+        index = self.catalog.get()
+        with self._lock:
+            if self._matcher is None or self._matcher.index is not index:
+                self._matcher = ScholarshipMatcher(index)
+                self._generation += 1
+            return self._matcher, self._generation
+
+    def get(self, profile: dict[str, Any], offset: int = 0, limit: int | None = None) -> tuple[list[dict[str, Any]], int]:
+        # Returns (ranked scholarships[offset:offset + limit], total eligible).
+        limit = self.limit if limit is None else limit
+        matcher, generation = self._current()
+        today = date.today().isoformat()
+        key = (generation, today, profile_fingerprint(profile))
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = matcher.match_many([profile], self.limit, today)[0]
+            self._cache.set(key, cached)
+        doc_ids, total = cached
+        if offset + limit <= len(doc_ids) or len(doc_ids) >= total:
+            page = doc_ids[offset:offset + limit]
+        else:
+            page = matcher.ranked(matcher.eligible_mask(profile, today), limit, offset)
+        return [matcher.index.records[doc_id] for doc_id in page], total
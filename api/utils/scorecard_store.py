@@ -0,0 +1,166 @@
+import os
+import re
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Iterable
+
+# Scorecard field -> (column, sqlite type). Mirrors college_routes.SCORECARD_FIELDS.
+STORE_COLUMNS = {
+    'id': ('id', 'integer primary key'),
+    'school.name': ('name', 'text not null'),
+    'school.city': ('city', 'text'),
+    'school.state': ('state', 'text'),
+    'school.school_url': ('school_url', 'text'),
+    'school.online_only': ('online_only', 'integer'),
+    'latest.student.size': ('student_size', 'integer'),
+    'latest.admissions.admission_rate.overall': ('admission_rate', 'real'),
+    'latest.admissions.sat_scores.75th_percentile.critical_reading': ('sat_reading_75', 'integer'),
+    'latest.admissions.sat_scores.75th_percentile.math': ('sat_math_75', 'integer'),
+    'latest.admissions.act_scores.75th_percentile.cumulative': ('act_75', 'integer'),
+    'latest.cost.tuition.in_state': ('tuition_in_state', 'integer'),
+    'latest.cost.tuition.out_of_state': ('tuition_out_of_state', 'integer'),
+}
+
+SORT_COLUMNS = {
+    'name': 'name',
+    'acceptance': 'admission_rate',
+    'tuition_in_state': 'tuition_in_state',
+    'student_size': 'student_size',
+}
+
+RANGE_COLUMNS = {
+    'tuition': 'tuition_in_state',
+    'acceptance': 'admission_rate',
+}
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def _fts_query(name: str) -> str | None:
+    tokens = _TOKEN_PATTERN.findall(name.lower())
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _like_pattern(value: str) -> str:
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+class ScorecardStore:
+    # Read-only local mirror of the College Scorecard fields we serve. The
+    # ingest job writes a fresh file and swaps it in atomically, and every
+    # search opens its own connection, so readers pick up new snapshots.
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def is_ready(self) -> bool:
+        return self.path.is_file()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, timeout=2)
+
+    def replace_all(self, rows: Iterable[dict[str, Any]]) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f'{self.path.name}.tmp')
+        if temp_path.exists():
+            temp_path.unlink()
+
+        columns = list(STORE_COLUMNS.values())
+        column_names = [column for column, _ in columns]
+        connection = sqlite3.connect(str(temp_path))
+        try:
+            connection.execute(
+                f"create table colleges ({', '.join(f'{column} {kind}' for column, kind in columns)})"
+            )
+            connection.execute(
+                "create virtual table colleges_fts using fts5(name, content='colleges', content_rowid='id')"
+            )
+            placeholders = ', '.join('?' for _ in column_names)
+            count = 0
+            for raw in rows:
+                if raw.get('id') is None or not raw.get('school.name'):
+                    continue
+                connection.execute(
+                    f"insert or replace into colleges ({', '.join(column_names)}) values ({placeholders})",
+                    [raw.get(field) for field in STORE_COLUMNS],
+                )
+                count += 1
+
+            connection.execute("insert into colleges_fts(colleges_fts) values ('rebuild')")
+            connection.execute('create index idx_colleges_state on colleges(state)')
+            for column in set(SORT_COLUMNS.values()) | set(RANGE_COLUMNS.values()):
+                connection.execute(f'create index if not exists idx_colleges_{column} on colleges({column})')
+            connection.commit()
+        finally:
+            connection.close()
+
+        os.replace(temp_path, self.path)
+        return count
+
+    def search(
+        self,
+        name: str = '',
+        state: str = '',
+        online_only: bool = False,
+        sort_by: str = 'name',
+        descending: bool = False,
+        page: int = 0,
+        per_page: int = 100,
+        ranges: dict[str, tuple[float | None, float | None]] | None = None,
+    ) -> tuple[int, list[dict[str, Any]]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+
+        if state:
+            clauses.append('state = ?')
+            params.append(state)
+        if online_only:
+            clauses.append('online_only = 1')
+        for key, (low, high) in (ranges or {}).items():
+            column = RANGE_COLUMNS[key]
+            if low is not None:
+                clauses.append(f'{column} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{column} <= ?')
+                params.append(high)
+
+        sort_column = SORT_COLUMNS.get(sort_by, 'name')
+        direction = 'desc' if descending else 'asc'
+        order_by = f'{sort_column} is null, {sort_column} {direction}, id asc'
+        select_columns = ', '.join(column for column, _ in STORE_COLUMNS.values())
+
+        with closing(self._connect()) as connection:
+            name_filters: list[tuple[str, list[Any]]] = []
+            fts_query = _fts_query(name) if name else None
+            if fts_query:
+                name_filters.append(
+                    ('id in (select rowid from colleges_fts where colleges_fts match ?)', [fts_query])
+                )
+            if name:
+                # Substring fallback for fragments that do not start a word.
+                name_filters.append(("name like ? escape '\\'", [_like_pattern(name)]))
+            if not name_filters:
+                name_filters.append(('', []))
+
+            for name_clause, name_params in name_filters:
+                where_parts = clauses + ([name_clause] if name_clause else [])
+                where_sql = f"where {' and '.join(where_parts)}" if where_parts else ''
+                query_params = params + name_params
+                total = connection.execute(f'select count(*) from colleges {where_sql}', query_params).fetchone()[0]
+                if total:
+                    break
+
+            rows = []
+            if total:
+                cursor = connection.execute(
+                    f'select {select_columns} from colleges {where_sql} order by {order_by} limit ? offset ?',
+                    query_params + [per_page, page * per_page],
+                )
+                fields = list(STORE_COLUMNS)
+                rows = [dict(zip(fields, row)) for row in cursor.fetchall()]
+
+        return total, rows
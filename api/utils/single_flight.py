@@ -0,0 +1,67 @@
+import threading
+from typing import Any, Callable, Hashable
+
+
+class SingleFlightTimeout(TimeoutError):
+    pass
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error', 'followers')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+        self.followers = 0
+
+
+class SingleFlight:
+    # Coalesces concurrent calls with the same key: the first caller runs fn,
+    # later callers wait for that call and get its value (or its exception).
+    # Nothing is kept once the call finishes, so a call that starts after that
+    # always goes upstream again; caching is the caller's job.
+    def __init__(self, timeout: float | None = None) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._stats = {'leaders': 0, 'shared': 0, 'timeouts': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: float | None = None) -> tuple[Any, bool]:
+        # Returns (value, shared); shared is True when another caller's result
+        # was reused. timeout only bounds how long a follower waits.
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['leaders'] += 1
+                leader = True
+            else:
+                call.followers += 1
+                self._stats['shared'] += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(timeout if timeout is not None else self.timeout):
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                raise SingleFlightTimeout('Timed out waiting for an identical in-flight request.')
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.value, False
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, 'in_flight': len(self._calls)}
@@ -0,0 +1,98 @@
+import json
+import re
+from typing import Any, Iterable
+
+from flask import Response
+
+_KEY_PATTERN = re.compile(r'\s*("(?:[^"\\]|\\.)*")\s*:')
+
+
+class StreamOutcome:
+    # Set by the event generator once the final event has been produced.
+    # require_tokens reads it when the response closes to commit or refund.
+    __slots__ = ('completed',)
+
+    def __init__(self) -> None:
+        self.completed = False
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def event_stream_response(events: Iterable[str], outcome: StreamOutcome) -> Response:
+    response = Response(events, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.stream_outcome = outcome
+    return response
+
+
+class JsonMemberStream:
+    # Incrementally scans a streamed JSON object and reports each member as
+    # soon as it is complete: top-level members with path (), and members of
+    # objects nested directly under the top level with path (parent_key,).
+    def __init__(self) -> None:
+        self._buffer = ''
+        self._pos = 0
+        self._stack: list[str] = []
+        self._member_start: dict[int, int] = {}
+        self._parent_key: str | None = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> list[tuple[tuple[str, ...], str, Any]]:
+        self._buffer += text
+        members: list[tuple[tuple[str, ...], str, Any]] = []
+        buffer = self._buffer
+        for index in range(self._pos, len(buffer)):
+            char = buffer[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if char == '{' and self._stack == ['{']:
+                    self._parent_key = self._read_key(buffer[self._member_start[1]:index])
+                self._stack.append(char)
+                if char == '{':
+                    self._member_start[len(self._stack)] = index + 1
+            elif char in '}]':
+                if char == '}':
+                    self._emit(members, buffer, index)
+                if self._stack:
+                    self._stack.pop()
+            elif char == ',' and self._stack and self._stack[-1] == '{':
+                self._emit(members, buffer, index)
+                self._member_start[len(self._stack)] = index + 1
+        self._pos = len(buffer)
+        return members
+
+    def _emit(self, members: list, buffer: str, end: int) -> None:
+        if self._stack == ['{']:
+            path: tuple[str, ...] = ()
+        elif self._stack == ['{', '{'] and self._parent_key is not None:
+            path = (self._parent_key,)
+        else:
+            return
+        fragment = buffer[self._member_start[len(self._stack)]:end]
+        if not fragment.strip():
+            return
+        try:
+            member = json.loads('{' + fragment + '}')
+        except ValueError:
+            return
+        for key, value in member.items():
+            members.append((path, key, value))
+
+    @staticmethod
+    def _read_key(fragment: str) -> str | None:
+        match = _KEY_PATTERN.match(fragment)
+        return json.loads(match.group(1)) if match else None
@@ -0,0 +1,61 @@
+from typing import Any, Iterable
+
+from utils.batched_query import select_in
+from utils.supabase_client import supabase
+
+PROGRESS_TABLE = 'student_progress'
+PROGRESS_FIELDS = ('total_tasks', 'completed_tasks', 'total_essays', 'essays_completed', 'colleges_saved')
+
+
+def is_task_completed(task: dict[str, Any]) -> bool:
+    return bool(task.get('completed')) or task.get('status') == 'completed'
+
+
+def task_progress(task: dict[str, Any] | None) -> dict[str, int]:
+    if not task:
+        return {}
+    done = is_task_completed(task)
+    essay = task.get('category') == 'Essay'
+    return {
+        'total_tasks': 1,
+        'completed_tasks': int(done),
+        'total_essays': int(essay),
+        'essays_completed': int(essay and done),
+    }
+
+
+def rebuild_progress(user_ids: Iterable[str] | None = None) -> list[dict[str, Any]]:
+    response = supabase.rpc(
+        'rebuild_student_progress',
+        {'p_user_ids': list(user_ids) if user_ids is not None else None},
+        timeout=300,
+    )
+    response.raise_for_status()
+    return response.json() if response.content else []
+
+
+def fetch_progress(user_ids: list[str]) -> dict[str, dict[str, Any]]:
+    # Students without a row yet (e.g. before the first rebuild) are seeded in one call.
+    rows = select_in(PROGRESS_TABLE, 'user_id', user_ids, {'select': f'user_id,{",".join(PROGRESS_FIELDS)}'})
+    by_user = {str(row.get('user_id')): row for row in rows}
+    missing = [user_id for user_id in user_ids if user_id not in by_user]
+    if missing:
+        for row in rebuild_progress(missing):
+            by_user[str(row.get('user_id'))] = row
+    return by_user
+
+
+def count_progress(user_ids: list[str]) -> dict[str, dict[str, Any]]:
+    # Counts straight from tasks and user_colleges; the slow path for when the
+    # counters table or its RPCs are unavailable.
+    by_user = {user_id: {'user_id': user_id, **{field: 0 for field in PROGRESS_FIELDS}} for user_id in user_ids}
+    for task in select_in('tasks', 'user_id', user_ids, {'select': 'user_id,category,status,completed'}):
+        counters = by_user.get(str(task.get('user_id')))
+        if counters is not None:
+            for field, value in task_progress(task).items():
+                counters[field] += value
+    for row in select_in('user_colleges', 'user_id', user_ids, {'select': 'user_id'}):
+        counters = by_user.get(str(row.get('user_id')))
+        if counters is not None:
+            counters['colleges_saved'] += 1
+    return by_user
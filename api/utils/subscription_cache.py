@@ -0,0 +1,78 @@
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+from utils.cache import TTLCache
+from utils.supabase_client import supabase
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+SUBSCRIPTION_CACHE_TTL_SECONDS = float(os.getenv('SUBSCRIPTION_CACHE_TTL_SECONDS', '300'))
+SUBSCRIPTION_CACHE_MAX_ENTRIES = int(os.getenv('SUBSCRIPTION_CACHE_MAX_ENTRIES', '10000'))
+SUBSCRIPTION_FIELDS = 'user_id,plan,status,current_period_end,stripe_customer_id,stripe_subscription_id'
+
+# Users without a subscriptions row are cached too, as this marker.
+_NO_SUBSCRIPTION: dict[str, Any] = {}
+_subscriptions = TTLCache(max_entries=SUBSCRIPTION_CACHE_MAX_ENTRIES, ttl_seconds=SUBSCRIPTION_CACHE_TTL_SECONDS)
+
+
+def _seconds_until_period_end(row: dict[str, Any]) -> float | None:
+    period_end_str = row.get('current_period_end')
+    if not period_end_str:
+        return None
+    try:
+        period_end = datetime.fromisoformat(str(period_end_str))
+    except (ValueError, TypeError):
+        return None
+    if period_end.tzinfo is None:
+        period_end = period_end.replace(tzinfo=timezone.utc)
+    return (period_end - datetime.now(tz=timezone.utc)).total_seconds()
+
+
+def _ttl_for(row: dict[str, Any]) -> float:
+    # Never serve an active premium row past current_period_end: renewals and
+    # expiries must be re-read and re-synced with Stripe. Canceled, past-due
+    # and free rows often carry a past period end and use the normal TTL.
+    remaining = _seconds_until_period_end(row) if is_premium_subscription(row) else None
+    if remaining is None:
+        return SUBSCRIPTION_CACHE_TTL_SECONDS
+    return min(SUBSCRIPTION_CACHE_TTL_SECONDS, remaining)
+
+
+def get_subscription(user_id: str) -> dict[str, Any] | None:
+    cached = _subscriptions.get(user_id)
+    if cached is not None:
+        return cached or None
+
+    response = supabase.select(
+        'subscriptions',
+        {
+            'user_id': f'eq.{user_id}',
+            'select': SUBSCRIPTION_FIELDS,
+            'limit': '1',
+        },
+    )
+    if not response.ok:
+        return None
+    rows = response.json() if response.content else []
+    row = rows[0] if rows else None
+    if row is None:
+        _subscriptions.set(user_id, _NO_SUBSCRIPTION)
+    else:
+        _subscriptions.set(user_id, row, ttl_seconds=_ttl_for(row))
+    return row
+
+
+def invalidate_subscription(user_id: Any) -> None:
+    if user_id:
+        _subscriptions.pop(str(user_id))
+
+
+def is_premium_subscription(row: dict[str, Any] | None) -> bool:
+    if not row:
+        return False
+    return row.get('plan') == 'premium' and row.get('status') in ('active', 'trialing')
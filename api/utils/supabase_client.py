@@ -0,0 +1,189 @@
+import os
+from pathlib import Path
+from typing import Any
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.single_flight import SingleFlight, SingleFlightTimeout
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', '').rstrip('/')
+SUPABASE_KEY = os.getenv('SUPABASE_KEY', '').strip()
+SUPABASE_SECRET_KEY = os.getenv('SUPABASE_SECRET_KEY', '').strip()
+# Allow fallback to frontend-style env names to reduce local setup friction.
+if not SUPABASE_URL:
+    SUPABASE_URL = os.getenv('EXPO_PUBLIC_SUPABASE_URL', '').rstrip('/')
+if not SUPABASE_KEY:
+    SUPABASE_KEY = os.getenv('EXPO_PUBLIC_SUPABASE_ANON_KEY', '').strip()
+if not SUPABASE_KEY:
+    SUPABASE_KEY = os.getenv('SUPABASE_ANON_KEY', '').strip()
+if not SUPABASE_SECRET_KEY:
+    SUPABASE_SECRET_KEY = SUPABASE_KEY
+
+SUPABASE_POOL_SIZE = int(os.getenv('SUPABASE_POOL_SIZE', '20'))
+SUPABASE_MAX_RETRIES = int(os.getenv('SUPABASE_MAX_RETRIES', '3'))
+SUPABASE_RETRY_BACKOFF = float(os.getenv('SUPABASE_RETRY_BACKOFF', '0.3'))
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv('SUPABASE_TIMEOUT_SECONDS', '15'))
+SUPABASE_SHARED_READ_TIMEOUT_SECONDS = float(os.getenv('SUPABASE_SHARED_READ_TIMEOUT_SECONDS', '30'))
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class SupabaseClient:
+    # One keep-alive connection pool for PostgREST and GoTrue, shared by every blueprint.
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        service_key: str,
+        pool_size: int = 20,
+        max_retries: int = 3,
+        backoff_factor: float = 0.3,
+        timeout: float = 15,
+        shared_read_timeout: float | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.service_key = service_key
+        self.timeout = timeout
+        self._reads = SingleFlight(timeout=shared_read_timeout)
+
+        # Only reads are retried on 5xx/read errors: a PATCH or DELETE retried
+        # after it already succeeded would report an empty result. Connection
+        # failures are retried for every method since nothing reached the server.
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size), max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.base_url and self.service_key)
+
+    def service_headers(self, prefer: str | None = None) -> dict[str, str]:
+        headers = {
+            'apikey': self.service_key,
+            'Authorization': f'Bearer {self.service_key}',
+            'Content-Type': 'application/json',
+        }
+        if prefer:
+            headers['Prefer'] = prefer
+        return headers
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any = None,
+        headers: dict[str, str] | None = None,
+        prefer: str | None = None,
+        timeout: float | None = None,
+    ) -> requests.Response:
+        return self.session.request(
+            method,
+            f'{self.base_url}{path}',
+            params=params,
+            json=json,
+            headers=headers if headers is not None else self.service_headers(prefer),
+            timeout=timeout or self.timeout,
+        )
+
+    def select(self, table: str, params: dict[str, Any], coalesce: bool = False, **kwargs: Any) -> requests.Response:
+        # coalesce=True lets identical service-role reads that are already in
+        # flight share one response. Only use it for read-mostly views: a caller
+        # joining a read that started before its own write can see the old rows.
+        if not coalesce or kwargs:
+            return self.request('GET', f'/rest/v1/{table}', params=params, **kwargs)
+        key = (table, tuple(sorted((name, str(value)) for name, value in params.items())))
+        try:
+            response, _ = self._reads.do(key, lambda: self.request('GET', f'/rest/v1/{table}', params=params))
+        except SingleFlightTimeout as exc:
+            # Callers already handle requests exceptions.
+            raise requests.Timeout(str(exc)) from exc
+        return response
+
+    def insert(self, table: str, payload: Any, **kwargs: Any) -> requests.Response:
+        return self.request('POST', f'/rest/v1/{table}', json=payload, **kwargs)
+
+    def upsert(
+        self,
+        table: str,
+        payload: Any,
+        on_conflict: str,
+        returning: str = 'representation',
+        **kwargs: Any,
+    ) -> requests.Response:
+        return self.request(
+            'POST',
+            f'/rest/v1/{table}',
+            params={'on_conflict': on_conflict},
+            json=payload,
+            prefer=f'resolution=merge-duplicates,return={returning}',
+            **kwargs,
+        )
+
+    def update(self, table: str, params: dict[str, Any], payload: Any, **kwargs: Any) -> requests.Response:
+        return self.request('PATCH', f'/rest/v1/{table}', params=params, json=payload, **kwargs)
+
+    def delete(self, table: str, params: dict[str, Any], **kwargs: Any) -> requests.Response:
+        return self.request('DELETE', f'/rest/v1/{table}', params=params, **kwargs)
+
+    def rpc(self, function_name: str, payload: dict[str, Any], **kwargs: Any) -> requests.Response:
+        return self.request('POST', f'/rest/v1/rpc/{function_name}', json=payload, **kwargs)
+
+    def get_auth_user(self, access_token: str, timeout: float = 10) -> requests.Response:
+        return self.request(
+            'GET',
+            '/auth/v1/user',
+            headers={'apikey': self.api_key, 'Authorization': f'Bearer {access_token}'},
+            timeout=timeout,
+        )
+
+
+def supabase_error_message(response: requests.Response) -> str:
+    payload: Any = {}
+    if response.headers.get('content-type', '').startswith('application/json'):
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+    if not isinstance(payload, dict):
+        payload = {}
+    return (
+        payload.get('message')
+        or payload.get('msg')
+        or payload.get('error_description')
+        or payload.get('error')
+        or response.text
+        or f'HTTP {response.status_code}'
+    )
+
+
+supabase = SupabaseClient(
+    SUPABASE_URL,
+    api_key=SUPABASE_KEY,
+    service_key=SUPABASE_SECRET_KEY,
+    pool_size=SUPABASE_POOL_SIZE,
+    max_retries=SUPABASE_MAX_RETRIES,
+    backoff_factor=SUPABASE_RETRY_BACKOFF,
+    timeout=SUPABASE_TIMEOUT_SECONDS,
+    shared_read_timeout=SUPABASE_SHARED_READ_TIMEOUT_SECONDS,
+)
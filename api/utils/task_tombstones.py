@@ -0,0 +1,75 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from utils.supabase_client import SupabaseClient, supabase, supabase_error_message
+
+TOMBSTONES_TABLE = 'task_tombstones'
+TOMBSTONES_META_TABLE = 'task_tombstones_meta'
+
+
+class TombstoneError(Exception):
+    pass
+
+
+def _to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+class SupabaseTombstoneStore:
+    # Deleted task ids per user, recorded in Supabase by a trigger on tasks
+    # (api/sql/task_tombstones_schema.sql) and kept for retention_seconds so
+    # delta syncs can report deletes. A client whose updated_since is older
+    # than horizon() may have missed pruned tombstones and needs a full reload.
+    def __init__(self, client: SupabaseClient = supabase, retention_seconds: float = 30 * 86400) -> None:
+        self.client = client
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._started_at: float | None = None
+        self._last_prune = 0.0
+
+    def _rows(self, table: str, params: dict[str, str]) -> list[dict]:
+        try:
+            response = self.client.select(table, params)
+        except requests.RequestException as exc:
+            raise TombstoneError(f'Unable to reach Supabase: {exc}') from exc
+        if not response.ok:
+            raise TombstoneError(f'Failed to load deleted tasks: {supabase_error_message(response)}')
+        return response.json() if response.content else []
+
+    def _tracking_since(self) -> float:
+        if self._started_at is None:
+            rows = self._rows(TOMBSTONES_META_TABLE, {'select': 'started_at', 'limit': '1'})
+            if not rows:
+                raise TombstoneError('Task tombstones are not set up. Apply api/sql/task_tombstones_schema.sql.')
+            self._started_at = datetime.fromisoformat(str(rows[0]['started_at']).replace('Z', '+00:00')).timestamp()
+        return self._started_at
+
+    def _prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < 3600:
+                return
+            self._last_prune = now
+        try:
+            self.client.delete(TOMBSTONES_TABLE, {'deleted_at': f'lt.{_to_iso(now - self.retention_seconds)}'})
+        except requests.RequestException:
+            pass
+
+    def horizon(self) -> str:
+        self._prune()
+        return _to_iso(max(self._tracking_since(), time.time() - self.retention_seconds))
+
+    def deleted_since(self, user_id: str, since: str) -> list[dict[str, str]]:
+        rows = self._rows(
+            TOMBSTONES_TABLE,
+            {
+                'user_id': f'eq.{user_id}',
+                'deleted_at': f'gt.{since}',
+                'select': 'task_id,deleted_at',
+                'order': 'deleted_at.asc,task_id.asc',
+            },
+        )
+        return [{'id': str(row['task_id']), 'deleted_at': row['deleted_at']} for row in rows]
@@ -0,0 +1,205 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import IO
+
+from dotenv import load_dotenv
+
+from utils.cache import TTLCache
+
+API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+load_dotenv(API_ENV_PATH)
+
+EXTRACT_MAX_BYTES = int(os.getenv('EXTRACT_MAX_BYTES', str(10 * 1024 * 1024)))
+EXTRACT_MAX_PAGES = int(os.getenv('EXTRACT_MAX_PAGES', '50'))
+EXTRACT_MAX_CHARS = int(os.getenv('EXTRACT_MAX_CHARS', '200000'))
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv('EXTRACT_TIMEOUT_SECONDS', '20'))
+# 0 extracts in the calling thread (no time budget, no isolation).
+EXTRACT_PROCESS_WORKERS = int(os.getenv('EXTRACT_PROCESS_WORKERS', str(min(4, os.cpu_count() or 1))))
+EXTRACT_MIN_PAGES_PER_TASK = int(os.getenv('EXTRACT_MIN_PAGES_PER_TASK', '4'))
+# Files up to this size (a typical one- or two-page resume) are parsed in the
+# calling thread; the hand-off to a worker costs more than the parse.
+EXTRACT_INLINE_MAX_BYTES = int(os.getenv('EXTRACT_INLINE_MAX_BYTES', str(256 * 1024)))
+EXTRACT_CACHE_MAX_ENTRIES = int(os.getenv('EXTRACT_CACHE_MAX_ENTRIES', '128'))
+EXTRACT_CACHE_TTL_SECONDS = float(os.getenv('EXTRACT_CACHE_TTL_SECONDS', '86400'))
+
+_text_cache = TTLCache(max_entries=EXTRACT_CACHE_MAX_ENTRIES, ttl_seconds=EXTRACT_CACHE_TTL_SECONDS)
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+class ExtractionError(ValueError):
+    pass
+
+
+def _open_source(source: bytes | str):
+    # Workers get either a path (spooled upload) or the raw bytes.
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _pdf_page_count(source: bytes | str) -> int:
+    try:
+        from PyPDF2 import PdfReader
+    except Exception as exc:
+        raise ValueError('PDF support requires PyPDF2. Run api setup again.') from exc
+    return len(PdfReader(_open_source(source)).pages)
+
+
+def _pdf_page_range(source: bytes | str, start: int, stop: int) -> str:
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(_open_source(source))
+    # Form feeds mark page breaks for clean_text.
+    return '\f'.join([(reader.pages[index].extract_text() or '') for index in range(start, stop)])
+
+
+def _docx_text(source: bytes | str) -> str:
+    try:
+        from docx import Document
+    except Exception as exc:
+        raise ValueError('DOCX support requires python-docx. Run api setup again.') from exc
+    document = Document(_open_source(source))
+    return '\n'.join([paragraph.text for paragraph in document.paragraphs])
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server can deadlock the child.
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                max_tasks_per_child=100,
+            )
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor) -> None:
+    # A worker stuck on a pathological file cannot be cancelled, only killed.
+    # The next extraction starts a fresh pool.
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for process in list(getattr(pool, '_processes', {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed_out() -> ExtractionError:
+    return ExtractionError('This file took too long to read. Try a smaller or simpler file.')
+
+
+def _run_tasks(tasks: list[tuple], deadline: float) -> list[str]:
+    if EXTRACT_PROCESS_WORKERS <= 0:
+        return [fn(*args) for fn, *args in tasks]
+
+    while True:
+        pool = _get_pool()
+        try:
+            futures = [pool.submit(fn, *args) for fn, *args in tasks]
+            done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_EXCEPTION)
+            if pending:
+                failed = [future for future in done if future.exception() is not None]
+                if failed:
+                    for future in pending:
+                        future.cancel()
+                    raise failed[0].exception()
+                _reset_pool(pool)
+                raise _timed_out()
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            # Another file's timeout killed the pool under us; retry on the
+            # new one while this file still has time left.
+            _reset_pool(pool)
+            if time.monotonic() >= deadline:
+                raise _timed_out()
+
+
+def _read_source(source: bytes | str | Path | IO[bytes]) -> tuple[bytes | str, str]:
+    # Returns (source for workers, sha256) without buffering spooled files.
+    if isinstance(source, (str, Path)):
+        path = str(source)
+        if os.path.getsize(path) > EXTRACT_MAX_BYTES:
+            raise ExtractionError('This file is too large to analyze.')
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        return path, digest.hexdigest()
+
+    if not isinstance(source, bytes):
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        if size > EXTRACT_MAX_BYTES:
+            raise ExtractionError('This file is too large to analyze.')
+        source.seek(0)
+        source = source.read()
+    if len(source) > EXTRACT_MAX_BYTES:
+        raise ExtractionError('This file is too large to analyze.')
+    return source, hashlib.sha256(source).hexdigest()
+
+
+def _source_size(source: bytes | str) -> int:
+    return len(source) if isinstance(source, bytes) else os.path.getsize(source)
+
+
+def _extract(source: bytes | str, extension: str) -> str:
+    # One EXTRACT_TIMEOUT_SECONDS deadline covers every step of a file.
+    deadline = time.monotonic() + EXTRACT_TIMEOUT_SECONDS
+    inline = _source_size(source) <= EXTRACT_INLINE_MAX_BYTES
+
+    def run(tasks: list[tuple]) -> list[str]:
+        return [fn(*args) for fn, *args in tasks] if inline else _run_tasks(tasks, deadline)
+
+    if extension == '.pdf':
+        page_count = run([(_pdf_page_count, source)])[0]
+        if page_count > EXTRACT_MAX_PAGES:
+            raise ExtractionError(f'PDFs over {EXTRACT_MAX_PAGES} pages are not supported.')
+        # At most one range per worker, so in-memory sources are shipped to
+        # each worker once.
+        workers = 1 if inline else max(1, EXTRACT_PROCESS_WORKERS)
+        step = max(1, EXTRACT_MIN_PAGES_PER_TASK, -(-page_count // workers))
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        return '\f'.join(run([(_pdf_page_range, source, start, stop) for start, stop in ranges]))
+
+    if extension == '.docx':
+        return run([(_docx_text, source)])[0]
+
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            source = file.read()
+    return source.decode('utf-8', errors='ignore')
+
+
+def cached_document_text(source: bytes | str | Path | IO[bytes], filename: str) -> str | None:
+    # Hashes the file and returns its extracted text only if it is cached.
+    extension = os.path.splitext(filename)[1].lower()
+    try:
+        _, digest = _read_source(source)
+    except ExtractionError:
+        return None
+    return _text_cache.get((digest, extension))
+
+
+def extract_document_text(source: bytes | str | Path | IO[bytes], filename: str) -> str:
+    # Small files are parsed in-thread; larger PDF page ranges and DOCX files
+    # go to a shared process pool under one EXTRACT_TIMEOUT_SECONDS budget per
+    # file. Results are cached by content hash.
+    extension = os.path.splitext(filename)[1].lower()
+    source, digest = _read_source(source)
+    cache_key = (digest, extension)
+    cached = _text_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    text = _extract(source, extension).strip()[:EXTRACT_MAX_CHARS]
+    _text_cache.set(cache_key, text)
+    return text
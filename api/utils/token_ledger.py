@@ -0,0 +1,185 @@
+import atexit
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable
+
+
+@dataclass(frozen=True)
+class Reservation:
+    user_id: str
+    usage_date: str
+    cost: int
+
+
+class LedgerUnavailable(Exception):
+    pass
+
+
+class _Account:
+    __slots__ = ('used', 'limit', 'reserved', 'loaded_at')
+
+    def __init__(self, used: int, limit: int) -> None:
+        self.used = used
+        self.limit = limit
+        self.reserved = 0
+        self.loaded_at = time.monotonic()
+
+
+class TokenLedger:
+    # In-process daily token counters with reserve/commit/refund semantics.
+    # Reads hit Supabase once per user/day (or after refresh_seconds when idle).
+    # Committed usage is queued as increments and applied by a background
+    # thread (tokens_used = tokens_used + n), so processes sharing a row add to
+    # it rather than overwrite it. A user whose row cannot be read gets no
+    # reservation until it can.
+    def __init__(
+        self,
+        load_row: Callable[[str, str], dict[str, Any] | None],
+        add_usage: Callable[[str, str, int, int], int | None],
+        default_limit: int,
+        refresh_seconds: float = 60,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self._load_row = load_row
+        self._add_usage = add_usage
+        self.default_limit = default_limit
+        self.refresh_seconds = refresh_seconds
+        self.flush_interval = flush_interval
+        self._accounts: dict[tuple[str, str], _Account] = {}
+        # Committed tokens not yet applied to the row, by (user_id, usage_date).
+        self._pending: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer: threading.Thread | None = None
+
+    def _account(self, user_id: str, usage_date: str) -> _Account:
+        key = (user_id, usage_date)
+        with self._lock:
+            account = self._accounts.get(key)
+            if account and (
+                key in self._pending
+                or account.reserved
+                or time.monotonic() - account.loaded_at < self.refresh_seconds
+            ):
+                return account
+
+        try:
+            row = self._load_row(user_id, usage_date)
+        except Exception as exc:
+            with self._lock:
+                current = self._accounts.get(key)
+            if current is None:
+                raise LedgerUnavailable('Unable to load token usage.') from exc
+            # Keep serving the last known counts; retry on the next call.
+            return current
+
+        with self._lock:
+            current = self._accounts.get(key)
+            if current and (key in self._pending or current.reserved):
+                # Another request changed the account while we were loading.
+                return current
+            # No row for today yet; the first commit creates it.
+            used = int(row.get('tokens_used') or 0) if row else 0
+            limit = int(row.get('tokens_limit') or self.default_limit) if row else self.default_limit
+            if current is None:
+                current = self._accounts[key] = _Account(used=used, limit=limit)
+            else:
+                # Refreshed in place: callers may already hold this object.
+                current.used = used
+                current.limit = limit
+                current.loaded_at = time.monotonic()
+            self._prune_locked(usage_date)
+            return current
+
+    def _prune_locked(self, usage_date: str) -> None:
+        stale_keys = [
+            key for key, account in self._accounts.items()
+            if key[1] != usage_date and key not in self._pending and not account.reserved
+        ]
+        for key in stale_keys:
+            del self._accounts[key]
+
+    def status(self, user_id: str) -> dict[str, int]:
+        usage_date = date.today().isoformat()
+        account = self._account(user_id, usage_date)
+        self._ensure_writer()
+        with self._lock:
+            return {
+                'tokens_used': account.used,
+                'tokens_limit': account.limit,
+                'tokens_remaining': max(0, account.limit - account.used - account.reserved),
+            }
+
+    def reserve(self, user_id: str, cost: int) -> Reservation | None:
+        # Raises LedgerUnavailable when the user's usage cannot be read.
+        usage_date = date.today().isoformat()
+        account = self._account(user_id, usage_date)
+        self._ensure_writer()
+        with self._lock:
+            # Re-attach if the account was pruned after _account returned it.
+            account = self._accounts.setdefault((user_id, usage_date), account)
+            if account.used + account.reserved + cost > account.limit:
+                return None
+            account.reserved += cost
+        return Reservation(user_id=user_id, usage_date=usage_date, cost=cost)
+
+    def commit(self, reservation: Reservation) -> None:
+        # Works without a live account too (e.g. a job settled after a
+        # restart): the increment is still applied to the stored row.
+        key = (reservation.user_id, reservation.usage_date)
+        with self._lock:
+            account = self._accounts.get(key)
+            if account is not None:
+                account.reserved = max(0, account.reserved - reservation.cost)
+                account.used += reservation.cost
+            self._pending[key] = self._pending.get(key, 0) + reservation.cost
+        self._ensure_writer()
+        self._wake.set()
+
+    def refund(self, reservation: Reservation) -> None:
+        with self._lock:
+            account = self._accounts.get((reservation.user_id, reservation.usage_date))
+            if account is not None:
+                account.reserved = max(0, account.reserved - reservation.cost)
+
+    def flush(self, user_id: str | None = None) -> None:
+        with self._lock:
+            keys = [key for key in self._pending if user_id is None or key[0] == user_id]
+            pending = [(key, self._pending.pop(key)) for key in keys]
+
+        for (account_user, usage_date), amount in pending:
+            key = (account_user, usage_date)
+            with self._lock:
+                account = self._accounts.get(key)
+                limit = account.limit if account else self.default_limit
+            try:
+                total = self._add_usage(account_user, usage_date, amount, limit)
+            except Exception:
+                total = None
+            with self._lock:
+                if total is None:
+                    self._pending[key] = self._pending.get(key, 0) + amount
+                    continue
+                account = self._accounts.get(key)
+                if account is not None:
+                    # The stored total includes other processes' usage.
+                    account.used = int(total) + self._pending.get(key, 0)
+                    account.loaded_at = time.monotonic()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._run_writer, name='token-ledger-writer', daemon=True)
+            self._writer.start()
+        atexit.register(self.flush)
+
+    def _run_writer(self) -> None:
+        while True:
+            self._wake.wait(timeout=self.flush_interval)
+            self._wake.clear()
+            self.flush()
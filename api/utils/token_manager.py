@@ -2,147 +2,116 @@ import os
 from datetime import date
 from functools import wraps
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
-import requests
 from dotenv import load_dotenv
-from flask import jsonify
+from flask import g, jsonify
 
 from interfaces.database_routes import get_token_from_header, get_user_from_token
+from utils.batch_writer import BatchedInsertWriter
+from utils.subscription_cache import get_subscription, is_premium_subscription
+from utils.supabase_client import supabase, supabase_error_message
+from utils.token_ledger import LedgerUnavailable, Reservation, TokenLedger
 
 API_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
 load_dotenv(API_ENV_PATH)
 
-SUPABASE_URL = os.getenv('SUPABASE_URL', '').rstrip('/')
-SUPABASE_SECRET_KEY = os.getenv('SUPABASE_SECRET_KEY', '').strip()
-if not SUPABASE_SECRET_KEY:
-    SUPABASE_SECRET_KEY = os.getenv('SUPABASE_KEY', '').strip()
-
 DEFAULT_DAILY_LIMIT = int(os.getenv('FREE_DAILY_TOKEN_LIMIT', '5'))
-
-
-def _supabase_headers() -> dict[str, str]:
-    return {
-        'apikey': SUPABASE_SECRET_KEY,
-        'Authorization': f'Bearer {SUPABASE_SECRET_KEY}',
-        'Content-Type': 'application/json',
-    }
+TOKEN_LEDGER_REFRESH_SECONDS = float(os.getenv('TOKEN_LEDGER_REFRESH_SECONDS', '60'))
+TOKEN_USAGE_BATCH_SIZE = int(os.getenv('TOKEN_USAGE_BATCH_SIZE', '100'))
+TOKEN_USAGE_FLUSH_SECONDS = float(os.getenv('TOKEN_USAGE_FLUSH_SECONDS', '2'))
+TOKEN_USAGE_QUEUE_SIZE = int(os.getenv('TOKEN_USAGE_QUEUE_SIZE', '10000'))
+TOKEN_USAGE_SPILL_PATH = os.getenv(
+    'TOKEN_USAGE_SPILL_PATH',
+    str(Path(__file__).resolve().parent.parent / 'data' / 'token_usage_spill.jsonl'),
+).strip()
+# Responses marked `X-Cache: HIT` replay a stored AI result. By default they are
+# free: the reservation is refunded, and users at their daily limit still get them.
+TOKEN_CHARGE_CACHE_HITS = os.getenv('TOKEN_CHARGE_CACHE_HITS', 'false').strip().lower() in ('1', 'true', 'yes')
 
 
 def _is_configured() -> bool:
-    return bool(SUPABASE_URL and SUPABASE_SECRET_KEY)
-
-
-def _select_subscription(user_id: str) -> dict[str, Any] | None:
-    response = requests.get(
-        f'{SUPABASE_URL}/rest/v1/subscriptions',
-        headers=_supabase_headers(),
-        params={
-            'user_id': f'eq.{user_id}',
-            'select': 'plan,status',
-            'limit': '1',
-        },
-        timeout=15,
-    )
-    if not response.ok:
-        return None
-    rows = response.json() if response.content else []
-    return rows[0] if rows else None
+    return supabase.is_configured
 
 
 def _is_premium(user_id: str) -> bool:
     if not _is_configured():
         return False
     try:
-        row = _select_subscription(user_id)
-        if not row:
-            return False
-        return row.get('plan') == 'premium' and row.get('status') in ('active', 'trialing')
+        return is_premium_subscription(get_subscription(user_id))
     except Exception:
         return False
 
 
 def _select_today_tokens(user_id: str, usage_date: str) -> dict[str, Any] | None:
-    response = requests.get(
-        f'{SUPABASE_URL}/rest/v1/user_tokens',
-        headers=_supabase_headers(),
-        params={
+    response = supabase.select(
+        'user_tokens',
+        {
             'user_id': f'eq.{user_id}',
             'usage_date': f'eq.{usage_date}',
             'select': 'user_id,usage_date,tokens_used,tokens_limit',
             'limit': '1',
         },
-        timeout=15,
     )
     if not response.ok:
-        return None
+        raise RuntimeError(f'Failed to load token usage: {supabase_error_message(response)}')
     rows = response.json() if response.content else []
     return rows[0] if rows else None
 
 
-def _upsert_today_tokens(user_id: str, usage_date: str, tokens_used: int, tokens_limit: int) -> bool:
-    response = requests.post(
-        f'{SUPABASE_URL}/rest/v1/user_tokens',
-        headers={**_supabase_headers(), 'Prefer': 'resolution=merge-duplicates,return=representation'},
-        params={'on_conflict': 'user_id,usage_date'},
-        json={
-            'user_id': user_id,
-            'usage_date': usage_date,
-            'tokens_used': tokens_used,
-            'tokens_limit': tokens_limit,
+def _add_today_tokens(user_id: str, usage_date: str, amount: int, tokens_limit: int) -> int | None:
+    # add_user_tokens (api/sql/user_tokens_schema.sql) increments the row in
+    # place and returns the new tokens_used.
+    response = supabase.rpc(
+        'add_user_tokens',
+        {
+            'p_user_id': user_id,
+            'p_usage_date': usage_date,
+            'p_amount': amount,
+            'p_tokens_limit': tokens_limit,
         },
-        timeout=15,
     )
-    return response.ok
+    if not response.ok:
+        return None
+    return int(response.json())
 
 
-def _get_or_create_today_tokens(user_id: str) -> dict[str, Any]:
-    today = date.today().isoformat()
-    existing = _select_today_tokens(user_id, today)
-    if existing:
-        return existing
+token_ledger = TokenLedger(
+    load_row=_select_today_tokens,
+    add_usage=_add_today_tokens,
+    default_limit=DEFAULT_DAILY_LIMIT,
+    refresh_seconds=TOKEN_LEDGER_REFRESH_SECONDS,
+)
 
-    _upsert_today_tokens(user_id, today, 0, DEFAULT_DAILY_LIMIT)
-    return {
-        'user_id': user_id,
-        'usage_date': today,
-        'tokens_used': 0,
-        'tokens_limit': DEFAULT_DAILY_LIMIT,
-    }
 
+def _insert_usage_batch(rows: list[dict[str, Any]]) -> bool:
+    return supabase.insert('token_usage_log', rows, prefer='return=minimal').ok
 
-def _log_usage(user_id: str, feature: str, tokens_spent: int) -> None:
-    try:
-        requests.post(
-            f'{SUPABASE_URL}/rest/v1/token_usage_log',
-            headers={**_supabase_headers(), 'Prefer': 'return=minimal'},
-            json={
-                'user_id': user_id,
-                'feature': feature,
-                'tokens_spent': tokens_spent,
-            },
-            timeout=15,
-        )
-    except Exception:
-        pass
 
+usage_log_writer = BatchedInsertWriter(
+    insert_batch=_insert_usage_batch,
+    spill_path=TOKEN_USAGE_SPILL_PATH or None,
+    max_queue=TOKEN_USAGE_QUEUE_SIZE,
+    batch_size=TOKEN_USAGE_BATCH_SIZE,
+    flush_interval=TOKEN_USAGE_FLUSH_SECONDS,
+    name='token-usage-writer',
+)
 
-def _deduct_tokens(user_id: str, cost: int, feature: str) -> None:
-    row = _get_or_create_today_tokens(user_id)
-    current_used = int(row.get('tokens_used') or 0)
-    current_limit = int(row.get('tokens_limit') or DEFAULT_DAILY_LIMIT)
 
-    _upsert_today_tokens(
-        user_id=user_id,
-        usage_date=date.today().isoformat(),
-        tokens_used=current_used + cost,
-        tokens_limit=current_limit,
+def _log_usage(user_id: str, feature: str, tokens_spent: int) -> None:
+    usage_log_writer.submit(
+        {
+            'user_id': user_id,
+            'feature': feature,
+            'tokens_spent': tokens_spent,
+        }
     )
-    _log_usage(user_id=user_id, feature=feature, tokens_spent=cost)
 
 
-def get_token_status(user_id: str) -> dict[str, Any]:
-    if _is_premium(user_id):
+def get_token_status(user_id: str, is_premium: bool | None = None) -> dict[str, Any]:
+    if is_premium is None:
+        is_premium = _is_premium(user_id)
+    if is_premium:
         return {
             'plan': 'premium',
             'is_premium': True,
@@ -151,15 +120,10 @@ def get_token_status(user_id: str) -> dict[str, Any]:
             'tokens_remaining': None,
         }
 
-    row = _get_or_create_today_tokens(user_id)
-    used = int(row.get('tokens_used') or 0)
-    limit = int(row.get('tokens_limit') or DEFAULT_DAILY_LIMIT)
     return {
         'plan': 'free',
         'is_premium': False,
-        'tokens_used': used,
-        'tokens_limit': limit,
-        'tokens_remaining': max(0, limit - used),
+        **token_ledger.status(user_id),
     }
 
 
@@ -174,7 +138,51 @@ def _get_authenticated_user_id() -> str | None:
     return str(user_id) if user_id else None
 
 
-def require_tokens(cost: int = 1, feature: str = 'unknown'):
+def defer_token_charge() -> dict[str, Any] | None:
+    # Hands the current request's reservation to background work (a queued
+    # job). require_tokens then leaves it alone; the job settles it through
+    # settle_token_charge once it knows whether it succeeded. Returns None for
+    # premium users, who have nothing to settle.
+    reservation = g.get('token_reservation')
+    if reservation is None:
+        return None
+    g.token_charge_deferred = True
+    return {
+        'user_id': reservation.user_id,
+        'usage_date': reservation.usage_date,
+        'cost': reservation.cost,
+        'feature': g.get('token_feature', 'unknown'),
+    }
+
+
+def settle_token_charge(charge: dict[str, Any] | None, succeeded: bool, billable: bool = True) -> None:
+    if not charge:
+        return
+    # The job may finish in a later process than the one that reserved, so the
+    # charge is added to the stored row right away rather than relying on an
+    # in-memory account.
+    reservation = Reservation(user_id=charge['user_id'], usage_date=charge['usage_date'], cost=int(charge['cost']))
+    if succeeded and (billable or TOKEN_CHARGE_CACHE_HITS):
+        token_ledger.commit(reservation)
+        token_ledger.flush(reservation.user_id)
+        _log_usage(user_id=reservation.user_id, feature=charge.get('feature', 'unknown'), tokens_spent=reservation.cost)
+    else:
+        token_ledger.refund(reservation)
+
+
+def _is_cache_hit(response: Any) -> bool:
+    if TOKEN_CHARGE_CACHE_HITS:
+        return False
+    target = response[0] if isinstance(response, tuple) else response
+    code = response[1] if isinstance(response, tuple) and len(response) > 1 else getattr(target, 'status_code', 0)
+    headers = getattr(target, 'headers', None)
+    return bool(headers) and headers.get('X-Cache') == 'HIT' and 200 <= code < 300
+
+
+def require_tokens(cost: int = 1, feature: str = 'unknown', cached_response: Callable[[], Any] | None = None):
+    # cached_response looks the request up in the result cache without doing
+    # any work and returns a cached response or None. It is the only thing
+    # that runs for a user with no tokens left; the handler never does.
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
@@ -185,9 +193,17 @@ def require_tokens(cost: int = 1, feature: str = 'unknown'):
             if _is_premium(user_id):
                 return fn(*args, **kwargs)
 
-            status = get_token_status(user_id)
-            remaining = int(status.get('tokens_remaining') or 0)
-            if remaining < cost:
+            try:
+                reservation = token_ledger.reserve(user_id, cost)
+            except LedgerUnavailable:
+                return jsonify({'error': 'Unable to check your token balance, please try again shortly.'}), 503
+            if reservation is None:
+                if not TOKEN_CHARGE_CACHE_HITS and cached_response is not None:
+                    response = cached_response()
+                    if response is not None:
+                        return response
+
+                status = get_token_status(user_id, is_premium=False)
                 return (
                     jsonify(
                         {
@@ -201,10 +217,45 @@ def require_tokens(cost: int = 1, feature: str = 'unknown'):
                     429,
                 )
 
-            response = fn(*args, **kwargs)
+            g.token_reservation = reservation
+            g.token_feature = feature
+            g.token_charge_deferred = False
+            try:
+                response = fn(*args, **kwargs)
+            except Exception:
+                token_ledger.refund(reservation)
+                raise
+            finally:
+                g.token_reservation = None
+
+            if _is_cache_hit(response):
+                token_ledger.refund(reservation)
+                return response
+
             code = response[1] if isinstance(response, tuple) else response.status_code
+            if g.get('token_charge_deferred') and 200 <= code < 300:
+                # A queued job owns the reservation now.
+                return response
+
+            outcome = getattr(response, 'stream_outcome', None)
+            if outcome is not None and 200 <= code < 300:
+                # Streamed bodies are produced after we return; settle once the
+                # server closes the response (finished, failed or client gone).
+                def settle_stream() -> None:
+                    if outcome.completed:
+                        token_ledger.commit(reservation)
+                        _log_usage(user_id=user_id, feature=feature, tokens_spent=cost)
+                    else:
+                        token_ledger.refund(reservation)
+
+                response.call_on_close(settle_stream)
+                return response
+
             if 200 <= code < 300:
-                _deduct_tokens(user_id=user_id, cost=cost, feature=feature)
+                token_ledger.commit(reservation)
+                _log_usage(user_id=user_id, feature=feature, tokens_spent=cost)
+            else:
+                token_ledger.refund(reservation)
             return response
 
         return wrapper
@@ -6,10 +6,7 @@ import { ActivityIndicator, Pressable, StyleSheet, Text, View } from 'react-nati
 import { useAuth } from '@/app/features/auth/store/auth.context';
 import {
   buildDashboardStats,
-  fetchCounselorChecklists,
-  fetchCounselorDocuments,
-  fetchCounselorStudents,
-  fetchCounselorTasks,
+  fetchCounselorDashboard,
 } from '@/app/features/counselor-dashboard/services/counselor-dashboard.service';
 import {
   Checklist,
@@ -44,21 +41,18 @@ export default function CounselorDashboardScreen({
   const [documents, setDocuments] = useState<Document[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [sectionWarning, setSectionWarning] = useState<string | null>(null);
 
   const loadDashboard = useCallback(async () => {
     setIsLoading(true);
     setError(null);
     try {
-      const [studentsData, tasksData, checklistData, documentData] = await Promise.all([
-        fetchCounselorStudents(),
-        fetchCounselorTasks(),
-        fetchCounselorChecklists(),
-        fetchCounselorDocuments(),
-      ]);
-      setStudents(studentsData);
-      setTasks(tasksData);
-      setChecklists(checklistData);
-      setDocuments(documentData);
+      const dashboard = await fetchCounselorDashboard();
+      if (dashboard.students) setStudents(dashboard.students);
+      if (dashboard.tasks) setTasks(dashboard.tasks);
+      if (dashboard.checklists) setChecklists(dashboard.checklists);
+      if (dashboard.documents) setDocuments(dashboard.documents);
+      setSectionWarning(dashboard.errors.length ? dashboard.errors.join('\n') : null);
     } catch (loadError) {
       setError(
         loadError instanceof Error
@@ -259,7 +253,10 @@ export default function CounselorDashboardScreen({
           </Pressable>
         </View>
       ) : (
-        renderTabContent()
+        <>
+          {sectionWarning ? <Text style={styles.errorText}>{sectionWarning}</Text> : null}
+          {renderTabContent()}
+        </>
       )}
 
       {activeTab === 'overview' ? (
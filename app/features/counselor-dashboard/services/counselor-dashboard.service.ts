@@ -41,12 +41,139 @@ export async function fetchCounselorStudents(): Promise<Student[]> {
   return (payload.students || []).map(mapApiStudent);
 }
 
+type CounselorTasksPage = {
+  tasks?: Record<string, unknown>[];
+  next_cursor?: string | null;
+  synced_at?: string | null;
+};
+
+// Deltas never report deleted tasks or reassigned students, so fall back to a
+// full sync periodically.
+const TASK_FULL_SYNC_INTERVAL_MS = 10 * 60 * 1000;
+
+let taskSync: {
+  token: string;
+  tasks: Map<string, StudentTask>;
+  syncedAt: string | null;
+  fullSyncAt: number;
+} | null = null;
+
+function newerTimestamp(current: string | null, candidate?: string | null): string | null {
+  return candidate && (!current || candidate > current) ? candidate : current;
+}
+
+async function fetchTaskPages(updatedSince: string | null, startCursor: string | null = null) {
+  const rows: Record<string, unknown>[] = [];
+  let syncedAt = updatedSince;
+  let cursor: string | null = startCursor;
+
+  do {
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+    if (updatedSince) params.set('updated_since', updatedSince);
+    const query = params.toString();
+    const payload: CounselorTasksPage = await getJson<CounselorTasksPage>(
+      `/api/counselor/tasks${query ? `?${query}` : ''}`,
+      'Failed to fetch counselor tasks.',
+    );
+    rows.push(...(payload.tasks || []));
+    syncedAt = newerTimestamp(syncedAt, payload.synced_at);
+    cursor = payload.next_cursor || null;
+  } while (cursor);
+
+  return { rows, syncedAt };
+}
+
+async function taskSyncWindow() {
+  const now = Date.now();
+  const token = (await getAccessToken()) || '';
+  const updatedSince =
+    taskSync &&
+    taskSync.token === token &&
+    taskSync.syncedAt &&
+    now - taskSync.fullSyncAt < TASK_FULL_SYNC_INTERVAL_MS
+      ? taskSync.syncedAt
+      : null;
+  return { now, token, updatedSince };
+}
+
+function applyTaskRows(
+  syncWindow: { now: number; token: string; updatedSince: string | null },
+  rows: Record<string, unknown>[],
+  syncedAt: string | null,
+): StudentTask[] {
+  if (syncWindow.updatedSince && taskSync) {
+    for (const row of rows) {
+      const task = mapApiTask(row);
+      taskSync.tasks.set(task.id, task);
+    }
+    taskSync.syncedAt = syncedAt;
+    return Array.from(taskSync.tasks.values());
+  }
+
+  const tasks = rows.map(mapApiTask);
+  taskSync = {
+    token: syncWindow.token,
+    tasks: new Map(tasks.map((task) => [task.id, task])),
+    syncedAt,
+    fullSyncAt: syncWindow.now,
+  };
+  return tasks;
+}
+
 export async function fetchCounselorTasks(): Promise<StudentTask[]> {
-  const payload = await getJson<{ tasks?: Record<string, unknown>[] }>(
-    '/api/counselor/tasks',
-    'Failed to fetch counselor tasks.',
+  const syncWindow = await taskSyncWindow();
+  const { rows, syncedAt } = await fetchTaskPages(syncWindow.updatedSince);
+  return applyTaskRows(syncWindow, rows, syncedAt);
+}
+
+type CounselorDashboardPayload = {
+  students?: Record<string, unknown>[] | null;
+  tasks?: Record<string, unknown>[] | null;
+  next_cursor?: string | null;
+  synced_at?: string | null;
+  checklists?: Record<string, unknown>[] | null;
+  documents?: Record<string, unknown>[] | null;
+  errors?: Record<string, string>;
+};
+
+export type CounselorDashboardData = {
+  students: Student[] | null;
+  tasks: StudentTask[] | null;
+  checklists: Checklist[] | null;
+  documents: Document[] | null;
+  errors: string[];
+};
+
+// One request for the whole dashboard; sections that failed upstream come back
+// as null with a message in `errors`.
+export async function fetchCounselorDashboard(): Promise<CounselorDashboardData> {
+  const syncWindow = await taskSyncWindow();
+  const query = syncWindow.updatedSince ? `?updated_since=${encodeURIComponent(syncWindow.updatedSince)}` : '';
+  const payload = await getJson<CounselorDashboardPayload>(
+    `/api/counselor/dashboard${query}`,
+    'Failed to load counselor dashboard.',
   );
-  return (payload.tasks || []).map(mapApiTask);
+
+  let tasks: StudentTask[] | null = null;
+  if (payload.tasks) {
+    let rows = payload.tasks;
+    let syncedAt = newerTimestamp(syncWindow.updatedSince, payload.synced_at);
+    if (payload.next_cursor) {
+      const rest = await fetchTaskPages(syncWindow.updatedSince, payload.next_cursor);
+      rows = [...rows, ...rest.rows];
+      syncedAt = newerTimestamp(syncedAt, rest.syncedAt);
+    }
+    tasks = applyTaskRows(syncWindow, rows, syncedAt);
+  }
+
+  return {
+    students: payload.students ? payload.students.map(mapApiStudent) : null,
+    tasks,
+    checklists: payload.checklists ? payload.checklists.map(mapApiChecklist) : null,
+    documents: payload.documents ? payload.documents.map(mapApiDocument) : null,
+    errors: Object.values(payload.errors || {}),
+  };
 }
 
 export async function fetchCounselorChecklists(): Promise<Checklist[]> {
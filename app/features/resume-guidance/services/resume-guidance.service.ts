@@ -1,7 +1,12 @@
-import { ResumeFeedbackResponse } from '@/app/features/resume-guidance/types/resume-guidance.types';
+import {
+  ResumeFeedbackResponse,
+  ResumeJobResponse,
+} from '@/app/features/resume-guidance/types/resume-guidance.types';
 import { getAccessToken } from '@/app/features/auth/services/auth.service';
 
 const API_URL = process.env.EXPO_PUBLIC_API_URL || 'http://localhost:5001';
+const JOB_POLL_INTERVAL_MS = 1500;
+const JOB_POLL_TIMEOUT_MS = 3 * 60 * 1000;
 
 async function withAuthHeaders(contentType = true) {
   const token = await getAccessToken();
@@ -38,6 +43,35 @@ export async function analyzeResumeText(resumeText: string): Promise<ResumeFeedb
   return payload as ResumeFeedbackResponse;
 }
 
+function sleep(ms: number) {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+// Uploads are processed as background jobs: the submit call returns a job id
+// right away and we poll until the feedback is ready.
+async function waitForResumeJob(jobId: string): Promise<ResumeFeedbackResponse> {
+  const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+
+  while (Date.now() < deadline) {
+    await sleep(JOB_POLL_INTERVAL_MS);
+    const headers = await withAuthHeaders(false);
+    const response = await fetch(`${API_URL}/api/openai/jobs/${jobId}`, { headers });
+    const payload = (await response.json().catch(() => null)) as ResumeJobResponse | null;
+
+    if (!response.ok || !payload) {
+      throw new Error((payload as any)?.error || 'Failed to check resume analysis status.');
+    }
+    if (payload.status === 'succeeded' && payload.result?.feedback) {
+      return payload.result;
+    }
+    if (payload.status === 'failed') {
+      throw new Error(payload.error || 'Failed to analyze resume.');
+    }
+  }
+
+  throw new Error('Resume analysis is taking longer than expected. Please try again.');
+}
+
 export async function uploadResumeFile(file: {
   uri: string;
   name: string;
@@ -59,7 +93,7 @@ export async function uploadResumeFile(file: {
     );
   }
 
-  const response = await fetch(`${API_URL}/api/openai/upload-resume`, {
+  const response = await fetch(`${API_URL}/api/openai/jobs/upload-resume`, {
     method: 'POST',
     headers,
     body: formData,
@@ -67,9 +101,9 @@ export async function uploadResumeFile(file: {
 
   const payload = await response.json().catch(() => null);
 
-  if (!response.ok || !payload?.feedback) {
+  if (!response.ok || !payload?.job_id) {
     throw new Error(payload?.error || 'Failed to upload resume.');
   }
 
-  return payload as ResumeFeedbackResponse;
+  return waitForResumeJob(payload.job_id);
 }
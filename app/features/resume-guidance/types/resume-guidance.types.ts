@@ -1,3 +1,12 @@
 export type ResumeFeedbackResponse = {
   feedback: string;
 };
+
+export type ResumeJobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export type ResumeJobResponse = {
+  job_id: string;
+  status: ResumeJobStatus;
+  result?: ResumeFeedbackResponse;
+  error?: string | null;
+};
@@ -15,6 +15,55 @@ async function withAuthHeaders() {
   };
 }
 
+type TaskPageResponse = {
+  tasks?: Task[];
+  deleted?: { id: string; deleted_at: string }[];
+  full?: boolean;
+  next_cursor?: string | null;
+  synced_at?: string | null;
+  user_id?: string;
+};
+
+type TaskSyncState = {
+  userId: string;
+  etag: string | null;
+  syncedAt: string | null;
+  tasks: Map<string, Task>;
+};
+
+// Unfiltered lists are kept here and refreshed with delta syncs
+// (updated_since); an unchanged list costs a 304.
+let taskSync: TaskSyncState | null = null;
+
+function sortTasks(tasks: Iterable<Task>): Task[] {
+  return Array.from(tasks).sort(
+    (left, right) =>
+      (left.due_date || '\uffff').localeCompare(right.due_date || '\uffff') ||
+      (left.created_at || '').localeCompare(right.created_at || '') ||
+      left.id.localeCompare(right.id),
+  );
+}
+
+async function fetchTaskPage(
+  headers: Record<string, string>,
+  query: URLSearchParams,
+  etag?: string | null,
+): Promise<{ payload: TaskPageResponse | null; etag: string | null; notModified: boolean }> {
+  const suffix = query.toString() ? `?${query.toString()}` : '';
+  const response = await fetch(`${API_URL}/api/tasks${suffix}`, {
+    headers: etag ? { ...headers, 'If-None-Match': etag } : headers,
+  });
+  if (response.status === 304) {
+    return { payload: null, etag: etag ?? null, notModified: true };
+  }
+
+  const payload = (await response.json().catch(() => null)) as (TaskPageResponse & { error?: string }) | null;
+  if (!response.ok) {
+    throw new Error(payload?.error || 'Failed to fetch tasks.');
+  }
+  return { payload, etag: response.headers.get('ETag'), notModified: false };
+}
+
 export async function listTasks(filters?: {
   status?: string;
   college_id?: string;
@@ -28,13 +77,65 @@ export async function listTasks(filters?: {
     query.append('college_id', filters.college_id);
   }
 
-  const suffix = query.toString() ? `?${query.toString()}` : '';
-  const response = await fetch(`${API_URL}/api/tasks${suffix}`, { headers });
-  const payload = await response.json().catch(() => null);
-  if (!response.ok) {
-    throw new Error(payload?.error || 'Failed to fetch tasks.');
+  if (filters?.status || filters?.college_id) {
+    const tasks: Task[] = [];
+    let cursor: string | null | undefined = null;
+    do {
+      const pageQuery = new URLSearchParams(query);
+      if (cursor) {
+        pageQuery.append('cursor', cursor);
+      }
+      const { payload } = await fetchTaskPage(headers, pageQuery);
+      tasks.push(...(payload?.tasks || []));
+      cursor = payload?.next_cursor;
+    } while (cursor);
+    return tasks;
+  }
+
+  const previous = taskSync;
+  if (previous?.syncedAt) {
+    query.append('updated_since', previous.syncedAt);
+  }
+
+  const first = await fetchTaskPage(headers, query, previous?.etag);
+  if (first.notModified && previous) {
+    return sortTasks(previous.tasks.values());
+  }
+
+  const payload = first.payload;
+  // A different signed-in user, or a sync too old for the server's delete
+  // history, starts over from the full list.
+  if (previous && payload?.user_id && payload.user_id !== previous.userId) {
+    taskSync = null;
+    return listTasks();
   }
-  return (payload?.tasks || []) as Task[];
+
+  const tasks = new Map(payload?.full || !previous ? [] : previous.tasks);
+  let syncedAt = previous?.syncedAt ?? null;
+  let page = payload;
+  while (page) {
+    (page.deleted || []).forEach((item) => tasks.delete(item.id));
+    (page.tasks || []).forEach((task) => tasks.set(task.id, task));
+    if (page.synced_at && (!syncedAt || page.synced_at > syncedAt)) {
+      syncedAt = page.synced_at;
+    }
+    if (!page.next_cursor) {
+      break;
+    }
+    const pageQuery = new URLSearchParams(query);
+    pageQuery.append('cursor', page.next_cursor);
+    page = (await fetchTaskPage(headers, pageQuery)).payload;
+  }
+
+  taskSync = {
+    userId: payload?.user_id ?? previous?.userId ?? '',
+    // The ETag belongs to the old updated_since; once synced_at moves the
+    // next request has a different URL anyway.
+    etag: syncedAt === (previous?.syncedAt ?? null) ? first.etag : null,
+    syncedAt,
+    tasks,
+  };
+  return sortTasks(tasks.values());
 }
 
 export async function createTask(input: CreateTaskInput): Promise<Task> {